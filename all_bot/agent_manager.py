@@ -1,49 +1,520 @@
 import os
 import sys
 import importlib.util
+import multiprocessing
+import queue
+import random
+import signal
 import threading
+import time
+from base_bot.event_loop import get_shared_loop
+from base_bot.router import MessageRouter
+from base_bot.metrics import MetricsServer, get_metrics_registry, render_prometheus
+from base_bot.admin import AdminServer
 
-def load_and_start_bots(bot_type_dir='all_bot/bot_type'):
+
+def bot_name(bot):
+    return getattr(bot, 'config', {}).get('bot_name', str(bot))
+
+
+class BotRecord:
+    """Supervision state of one bot"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.status = "stopped"
+        self.started_at = None     # start of the current connected stretch
+        self.down_since = None     # when the bot last lost its connection
+        self.retry_at = None       # when the next start attempt is due
+        self.restarts = 0
+        self.failures = 0          # consecutive failed starts
+        self.last_error = None
+
+    def uptime(self):
+        return time.time() - self.started_at if self.started_at else 0.0
+
+
+class BotSupervisor:
+    """
+    Keeps a fleet of bots running from the main thread.
+
+    The main thread blocks on a queue of connection events published by the
+    bots (no busy waiting). A bot whose start() fails is retried with
+    jittered exponential backoff; a bot that loses its connection and does
+    not reconnect on its own within reconnect_grace seconds is restarted.
+    SIGINT/SIGTERM trigger a coordinated shutdown and SIGUSR1 prints the
+    status table.
+    """
+
+    def __init__(self, bots, shared_loop=None, workers=None, reconnect_grace=30, base_backoff=1, max_backoff=60):
+        self.records = [BotRecord(bot) for bot in bots]
+        self.shared_loop = shared_loop
+        self.workers = workers
+        self.reconnect_grace = reconnect_grace
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._events = queue.Queue()
+        self._stopping = threading.Event()
+        for record in self.records:
+            record.bot.on("connected", lambda record=record: self._events.put(("connected", record)))
+            record.bot.on("disconnected", lambda record=record: self._events.put(("disconnected", record)))
+
+    def run(self):
+        """Start every bot and supervise them until a shutdown is requested"""
+        self._install_signal_handlers()
+        if self.workers:
+            self.workers.start()
+        for record in self.records:
+            self._start(record)
+        print("All bots started. Press Ctrl+C to stop.")
+        while not self._stopping.is_set():
+            try:
+                event, record = self._events.get(timeout=self._next_timeout())
+                self._handle_event(event, record)
+            except queue.Empty:
+                pass
+            self._run_due_timers()
+            if self.workers and not self._stopping.is_set():
+                self.workers.poll()
+        self.shutdown()
+
+    def request_stop(self, *args):
+        self._stopping.set()
+        # Wake the main thread if it is waiting on the queue
+        self._events.put(("stop", None))
+
+    def _install_signal_handlers(self):
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *args: self.print_status())
+
+    def _start(self, record):
+        record.status = "starting"
+        record.retry_at = None
+        try:
+            record.bot.start()
+            if not record.bot.socket.connected:
+                raise ConnectionError("not connected after start()")
+        except Exception as e:
+            record.failures += 1
+            record.last_error = str(e)
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (record.failures - 1))
+            delay *= 0.5 + random.random() / 2
+            record.retry_at = time.time() + delay
+            record.status = "backoff"
+            print(f"Failed to start {bot_name(record.bot)} ({e}); retrying in {delay:.1f}s")
+            return
+        record.failures = 0
+        record.down_since = None
+        record.started_at = record.started_at or time.time()
+        record.status = "running"
+        print(f"Started bot: {bot_name(record.bot)}")
+
+    def _restart(self, record):
+        record.restarts += 1
+        record.started_at = None
+        print(f"Restarting {bot_name(record.bot)} (restart #{record.restarts})")
+        try:
+            # Stop any reconnection attempts still running on the old connection
+            record.bot.disconnect_socket()
+        except Exception:
+            pass
+        self._start(record)
+
+    def _handle_event(self, event, record):
+        if event == "connected":
+            record.down_since = None
+            record.started_at = record.started_at or time.time()
+            record.status = "running"
+        elif event == "disconnected" and not self._stopping.is_set():
+            record.down_since = time.time()
+            record.started_at = None
+            record.status = "reconnecting"
+
+    def _next_timeout(self):
+        # Sleep until the next retry or reconnect deadline (at most a second,
+        # so signals are handled promptly)
+        now = time.time()
+        deadlines = [r.retry_at for r in self.records if r.retry_at]
+        deadlines += [r.down_since + self.reconnect_grace for r in self.records if r.down_since]
+        if self.workers:
+            deadlines += self.workers.deadlines()
+        return max(0.0, min([1.0] + [d - now for d in deadlines]))
+
+    def _run_due_timers(self):
+        now = time.time()
+        for record in self.records:
+            if self._stopping.is_set():
+                return
+            if record.retry_at and record.retry_at <= now:
+                self._start(record)
+            elif record.down_since and now - record.down_since >= self.reconnect_grace:
+                self._restart(record)
+
+    def status(self):
+        """
+        Per-bot supervision status
+
+        Returns:
+            list: One dict per bot with name, status, uptime (seconds of the
+                current connected stretch), restarts, failures, last_error and
+                the bot's work queue counters
+        """
+        return [{
+            "bot_id": getattr(record.bot, 'config', {}).get('bot_id'),
+            "name": bot_name(record.bot),
+            "status": record.status,
+            "uptime": round(record.uptime(), 1),
+            "restarts": record.restarts,
+            "failures": record.failures,
+            "last_error": record.last_error,
+            "queue": record.bot.work_queue.stats() if hasattr(record.bot, 'work_queue') else None,
+        } for record in self.records]
+
+    def print_status(self):
+        print(f"{'bot':<36}{'status':<14}{'uptime':>10}{'restarts':>10}{'queued':>8}{'shed':>6}")
+        for entry in self.status():
+            queue_stats = entry['queue'] or {'depth': 0, 'shed': 0}
+            print(f"{entry['name']:<36}{entry['status']:<14}{entry['uptime']:>9.0f}s{entry['restarts']:>10}"
+                  f"{queue_stats['depth']:>8}{queue_stats['shed']:>6}")
+        router = next((r.bot.router for r in self.records if getattr(r.bot, 'router', None)), None)
+        if router:
+            stats = router.stats
+            print(f"Router: {stats['ingested']} messages, {stats['duplicates']} duplicates dropped, "
+                  f"{stats['delivered']} deliveries; listening: {router.listeners()}")
+        if self.workers:
+            self.workers.print_status()
+
+    def shutdown(self, timeout=10):
+        """Disconnect every bot (in parallel), then stop the shared event loop"""
+        print("\nShutting down all bots...")
+
+        def stop_bot(record):
+            print(f"Stopping {bot_name(record.bot)}...")
+            try:
+                record.bot.shutdown()
+            except Exception as e:
+                print(f"Error stopping {bot_name(record.bot)}: {e}")
+
+        threads = [threading.Thread(target=stop_bot, args=(record,), daemon=True) for record in self.records]
+        if self.workers:
+            threads.append(threading.Thread(target=self.workers.shutdown, args=(timeout,), daemon=True))
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.time()))
+        for record in self.records:
+            record.status = "stopped"
+            record.started_at = None
+        if self.shared_loop is not None:
+            self.shared_loop.stop()
+        self.print_status()
+        print("All bots have been stopped.")
+
+
+class WorkerRecord:
+    """One worker process hosting a single replica of a bot type"""
+
+    def __init__(self, module_name, replica, replica_count):
+        self.module_name = module_name
+        self.replica = replica
+        self.replica_count = replica_count
+        self.process = None
+        self.started_at = None
+        self.retry_at = None
+        self.restarts = 0
+        self.failures = 0          # consecutive short-lived runs
+        self.last_report = None    # latest health report from the worker
+        self.last_report_at = None
+
+    @property
+    def name(self):
+        return f"{self.module_name}[{self.replica + 1}/{self.replica_count}]"
+
+
+class WorkerPool:
+    """
+    Hosts bot types in separate worker processes.
+
+    placement maps a bot module name (file name in bot_type without .py) to
+    the number of worker processes running a replica of it. Each worker runs
+    its own BotSupervisor and event loop and sends a health report every
+    report_interval seconds. Workers that exit are restarted with the same
+    backoff policy as bots. Each worker has its own LLM rate limiter, holding
+    its share of LLM_RPM/LLM_TPM (see load_and_start_bots).
+    """
+
+    def __init__(self, bot_type_dir, placement, report_interval=5, base_backoff=1, max_backoff=60):
+        self.bot_type_dir = bot_type_dir
+        self.report_interval = report_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # spawn: the parent already runs threads (event loop, socket.io clients)
+        self._context = multiprocessing.get_context("spawn")
+        self._reports = self._context.Queue()
+        self.workers = [
+            WorkerRecord(module_name, replica, count)
+            for module_name, count in placement.items()
+            for replica in range(count)
+        ]
+
+    def start(self):
+        for worker in self.workers:
+            self._spawn(worker)
+
+    def _spawn(self, worker):
+        options = {"replica_index": worker.replica, "replica_count": worker.replica_count}
+        worker.process = self._context.Process(
+            target=run_worker,
+            args=(self.bot_type_dir, worker.module_name, options, self._reports, self.report_interval),
+            name=f"bot-worker-{worker.name}",
+            daemon=True,
+        )
+        worker.process.start()
+        worker.started_at = time.time()
+        worker.retry_at = None
+        print(f"Started worker {worker.name} (pid {worker.process.pid})")
+
+    def poll(self):
+        """Collect health reports and restart workers that exited"""
+        while True:
+            try:
+                report = self._reports.get_nowait()
+            except queue.Empty:
+                break
+            for worker in self.workers:
+                if worker.process and worker.process.pid == report.get("pid"):
+                    worker.last_report = report
+                    worker.last_report_at = time.time()
+        now = time.time()
+        for worker in self.workers:
+            if worker.retry_at:
+                if worker.retry_at <= now:
+                    worker.restarts += 1
+                    self._spawn(worker)
+            elif worker.process and not worker.process.is_alive():
+                # A worker that ran for a while starts a fresh backoff sequence
+                if now - worker.started_at >= self.max_backoff:
+                    worker.failures = 0
+                worker.failures += 1
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (worker.failures - 1))
+                delay *= 0.5 + random.random() / 2
+                worker.retry_at = now + delay
+                worker.started_at = None
+                print(f"Worker {worker.name} exited with code {worker.process.exitcode}; restarting in {delay:.1f}s")
+
+    def deadlines(self):
+        return [worker.retry_at for worker in self.workers if worker.retry_at]
+
+    def status(self):
+        """
+        Per-worker status
+
+        Returns:
+            list: One dict per worker with pid, alive, uptime, restarts and the
+                latest health report (its bots' status and event loop stats)
+        """
+        now = time.time()
+        return [{
+            "worker": worker.name,
+            "pid": worker.process.pid if worker.process else None,
+            "alive": bool(worker.process and worker.process.is_alive()),
+            "uptime": round(now - worker.started_at, 1) if worker.started_at else 0.0,
+            "restarts": worker.restarts,
+            # Reports older than three intervals mean the worker is wedged
+            "healthy": bool(worker.last_report_at and now - worker.last_report_at < 3 * self.report_interval),
+            "report": worker.last_report,
+        } for worker in self.workers]
+
+    def print_status(self):
+        for entry in self.status():
+            bots = (entry["report"] or {}).get("bots", [])
+            state = (", ".join(bot["status"] for bot in bots) or "alive") if entry["alive"] else "down"
+            print(f"{'worker ' + entry['worker']:<36}{state:<14}{entry['uptime']:>9.0f}s{entry['restarts']:>10}")
+
+    def shutdown(self, timeout=10):
+        """Ask every worker to stop (SIGTERM), killing those that don't exit in time"""
+        for worker in self.workers:
+            worker.retry_at = None
+            if worker.process and worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.time() + timeout
+        for worker in self.workers:
+            if worker.process:
+                worker.process.join(max(0.0, deadline - time.time()))
+                if worker.process.is_alive():
+                    worker.process.kill()
+            worker.started_at = None
+
+
+def run_worker(bot_type_dir, module_name, options, reports, report_interval):
+    """Entry point of a worker process: host one bot and report its health"""
+    shared_loop = get_shared_loop()
+    bots = load_bots(bot_type_dir, modules=[module_name], options=options)
+    attach_router(bots)
+    supervisor = BotSupervisor(bots, shared_loop=shared_loop)
+
+    def report_health():
+        while not supervisor._stopping.wait(report_interval):
+            reports.put({
+                "pid": os.getpid(),
+                "module": module_name,
+                "bots": supervisor.status(),
+                "loop": shared_loop.stats(),
+                "metrics": get_metrics_registry().snapshot(),
+                "time": time.time(),
+            })
+
+    threading.Thread(target=report_health, daemon=True).start()
+    supervisor.run()
+
+
+def parse_placement(spec):
+    """
+    Parse a worker placement like "math_calcy:2,website_search"
+
+    Returns:
+        dict: bot module name -> number of worker processes
+    """
+    placement = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        module_name, _, count = item.partition(":")
+        placement[module_name.strip()] = int(count or 1)
+    return placement
+
+
+def attach_router(bots):
+    """
+    Feed every bot's messages through one MessageRouter, unless BOT_ROUTER=0
+
+    Returns:
+        MessageRouter: The router, or None when routing is disabled
+    """
+    if not bots or os.getenv("BOT_ROUTER", "1").lower() in ("0", "false", "no"):
+        return None
+    router = MessageRouter()
+    for bot in bots:
+        router.attach(bot)
+    return router
+
+
+def start_metrics_server(supervisor):
+    """
+    Serve the metrics of every bot, including those in worker processes, on
+    http://BOT_METRICS_HOST:BOT_METRICS_PORT/metrics (127.0.0.1:9464 by
+    default; port 0 disables it)
+
+    Returns:
+        MetricsServer: The running server, or None
+    """
+    port = int(os.getenv("BOT_METRICS_PORT", "9464"))
+    if port <= 0:
+        return None
+    host = os.getenv("BOT_METRICS_HOST", "127.0.0.1")
+
+    def collect():
+        snapshots = get_metrics_registry().snapshot()
+        # Workers send their metrics with every health report
+        for entry in supervisor.workers.status() if supervisor.workers else []:
+            for snapshot in (entry["report"] or {}).get("metrics", []):
+                snapshots.append({**snapshot, "labels": {**snapshot["labels"], "worker": entry["worker"]}})
+        return render_prometheus(snapshots)
+
+    try:
+        server = MetricsServer(collect, host, port).start()
+    except OSError as e:
+        print(f"Metrics endpoint not started: {e}")
+        return None
+    print(f"Metrics: http://{host}:{server.address[1]}/metrics")
+    return server
+
+
+def start_admin_server(bots):
+    """
+    Serve the HTTP admin API for the bots in this process on
+    BOT_ADMIN_HOST:BOT_ADMIN_PORT. It is on by default (127.0.0.1:9465) in
+    daemon mode (BOT_DAEMON=1), where bots have no console, and off
+    otherwise; BOT_ADMIN_TOKEN makes it require a bearer token.
+
+    Returns:
+        AdminServer: The running server, or None
+    """
+    daemon = os.getenv("BOT_DAEMON", "false").lower() in ("1", "true", "yes")
+    port = int(os.getenv("BOT_ADMIN_PORT", "9465" if daemon else "0"))
+    if port <= 0 or not bots:
+        return None
+    host = os.getenv("BOT_ADMIN_HOST", "127.0.0.1")
+    try:
+        server = AdminServer(bots, host, port, token=os.getenv("BOT_ADMIN_TOKEN") or None).start()
+    except OSError as e:
+        print(f"Admin API not started: {e}")
+        return None
+    print(f"Admin API: http://{host}:{server.address[1]}/bots")
+    return server
+
+
+def load_bots(bot_type_dir='all_bot/bot_type', modules=None, exclude=(), options=None):
     bot_files = [f for f in os.listdir(bot_type_dir) if f.endswith('.py') and not f.startswith('__')]
     bots = []
     for bot_file in bot_files:
         module_name = bot_file[:-3]
+        if (modules is not None and module_name not in modules) or module_name in exclude:
+            continue
         bot_file_path = os.path.join(bot_type_dir, bot_file)
         spec = importlib.util.spec_from_file_location(module_name, bot_file_path)
         if spec is None:
             continue
+        started = time.perf_counter()
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
+        imported = time.perf_counter()
         bot_class = None
         for attr_name in dir(module):
             if attr_name.endswith('Bot'):
                 bot_class = getattr(module, attr_name)
                 break
         if bot_class:
-            bot_instance = bot_class()
+            bot_instance = bot_class(options)
             bots.append(bot_instance)
-            print(f"Loaded bot: {module_name}")
+            print(f"Loaded bot: {module_name} (import {(imported - started) * 1000:.0f} ms, "
+                  f"init {(time.perf_counter() - imported) * 1000:.0f} ms)")
+    return bots
 
-    # Start each bot in its own thread
-    for bot in bots:
-        t = threading.Thread(target=bot.start)
-        t.daemon = True
-        t.start()
-        print(f"Started bot: {getattr(bot, 'config', {}).get('bot_name', str(bot))}")
 
-    print("All bots started. Press Ctrl+C to stop.")
-    try:
-        while True:
-            pass  # Keep main thread alive
-    except KeyboardInterrupt:
-        print("\nCtrl+C detected! Shutting down all bots...")
-        for bot in bots:
-            bot_name = getattr(bot, 'config', {}).get('bot_name', str(bot))
-            print(f"Stopping {bot_name}...")
-            if hasattr(bot, 'cleanup'):
-                bot.cleanup()
-            print(f"{bot_name} stopped")
-        print("All bots have been stopped.")
+def load_and_start_bots(bot_type_dir='all_bot/bot_type', placement=None):
+    """
+    Load every bot type and supervise it until Ctrl+C
+
+    Args:
+        bot_type_dir (str): Directory with the bot modules
+        placement (dict): Bot module name -> number of worker processes; bot
+            types not listed run in this process. Defaults to the
+            BOT_WORKER_PROCESSES environment variable ("math_calcy:2,health")
+    """
+    if placement is None:
+        placement = parse_placement(os.getenv("BOT_WORKER_PROCESSES"))
+    # One event loop for the whole process; every bot schedules its replies on it
+    shared_loop = get_shared_loop()
+    # LLM_RPM/LLM_TPM are split between the processes that host bots (this
+    # one and every worker); workers inherit the environment when spawned
+    split_limits = placement and "LLM_LIMIT_PROCESSES" not in os.environ
+    if split_limits:
+        os.environ["LLM_LIMIT_PROCESSES"] = str(sum(placement.values()) + 1)
+    bots = load_bots(bot_type_dir, exclude=placement)
+    if split_limits and not bots:
+        os.environ["LLM_LIMIT_PROCESSES"] = str(sum(placement.values()))
+    attach_router(bots)
+    workers = WorkerPool(bot_type_dir, placement) if placement else None
+    supervisor = BotSupervisor(bots, shared_loop=shared_loop, workers=workers)
+    start_metrics_server(supervisor)
+    start_admin_server(bots)
+    supervisor.run()
+
 
 if __name__ == "__main__":
-    load_and_start_bots() 
\ No newline at end of file
+    load_and_start_bots()
@@ -0,0 +1,126 @@
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Console commands that make no sense over HTTP: stop the process with SIGTERM instead
+BLOCKED_COMMANDS = {"exit"}
+
+
+class AdminServer:
+    """
+    Local HTTP admin API driving every bot in the process, for daemon mode
+    where bots have no console.
+
+    GET  /bots               every bot's id, name, connection and channel
+    GET  /bots/<bot_id>      one bot, with the server's details of its channel
+    POST /command            {"command": "/join general", "bots": ["math"]}
+                             runs a console command on the listed bots (all
+                             bots when "bots" is left out); "/info" answers
+                             with each bot's channel details
+
+    When a token is set, requests must send "Authorization: Bearer <token>".
+
+    Example: curl -X POST localhost:9465/command -d '{"command": "/start general"}'
+    """
+
+    def __init__(self, bots, host="127.0.0.1", port=9465, token=None):
+        self.bots = {bot.config["bot_id"]: bot for bot in bots}
+        self.token = token
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.address = self._httpd.server_address
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="admin-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handle(self, request, method):
+        if self.token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {self.token}"):
+            return self._reply(request, 401, {"error": "unauthorized"})
+        path = request.path.split("?")[0].rstrip("/")
+        try:
+            if method == "GET" and path == "/bots":
+                return self._reply(request, 200, [self.describe(bot) for bot in self.bots.values()])
+            if method == "GET" and path.startswith("/bots/"):
+                bot = self.bots.get(path[len("/bots/"):])
+                if bot is None:
+                    return self._reply(request, 404, {"error": "unknown bot"})
+                return self._reply(request, 200, {**self.describe(bot), "channel": bot.channel_details()})
+            if method == "POST" and path == "/command":
+                length = int(request.headers.get("Content-Length") or 0)
+                body = json.loads(request.rfile.read(length) or b"{}")
+                status, result = self.run_command(body.get("command", ""), body.get("bots"))
+                return self._reply(request, status, result)
+        except (ValueError, TypeError) as e:
+            return self._reply(request, 400, {"error": str(e)})
+        except Exception as e:
+            return self._reply(request, 500, {"error": str(e)})
+        return self._reply(request, 404, {"error": "not found"})
+
+    def _reply(self, request, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def describe(self, bot):
+        """Summary of a bot's connection and channel state"""
+        return {
+            "bot_id": bot.config["bot_id"],
+            "name": bot.config["bot_name"],
+            "connected": bot.state["is_connected"],
+            "current_channel": bot.state["current_channel_id"],
+            "channel_states": dict(bot.state["channel_states"]),
+        }
+
+    def run_command(self, command, bot_ids=None):
+        """
+        Run a console command on some or all bots
+
+        Args:
+            command (str): e.g. "/join general"
+            bot_ids (list): Target bot ids; None for every bot
+
+        Returns:
+            tuple: HTTP status and JSON result
+        """
+        command = command.strip()
+        if not command.startswith("/"):
+            raise ValueError("command must start with /")
+        name = command[1:].split(" ")[0].lower()
+        if name in BLOCKED_COMMANDS:
+            return 400, {"error": f"/{name} is not available over the admin API"}
+        targets = list(self.bots) if bot_ids is None else list(bot_ids)
+        unknown = [bot_id for bot_id in targets if bot_id not in self.bots]
+        if unknown:
+            return 404, {"error": f"unknown bots: {', '.join(unknown)}"}
+        results = {}
+        for bot_id in targets:
+            bot = self.bots[bot_id]
+            if name == "info":
+                results[bot_id] = bot.channel_details()
+            else:
+                bot.process_command(command)
+                results[bot_id] = self.describe(bot)
+        return 200, {"command": command, "bots": results}
@@ -6,12 +6,24 @@ import os
 import time
 import json
 import threading
-import random
 import sys
 import signal
 import datetime
+import inspect
 from dotenv import load_dotenv
 
+from .event_loop import get_shared_loop
+from .response_cache import get_response_cache, normalize_prompt
+from .work_queue import WorkQueue
+from .pacing import make_pacing
+from .llm_clients import get_llm_client
+from .single_flight import get_single_flight
+from .batcher import MicroBatcher
+from .metrics import get_metrics_registry
+from .json_log import get_json_logger
+from .rate_limiter import get_rate_limiter, estimate_tokens, retry_status, retry_after, backoff_delay
+from .replicas import HashAssignment, make_coordinator, message_key, replica_identity
+
 
 class EventEmitter:
     def __init__(self):
@@ -29,6 +41,12 @@ class EventEmitter:
                 listener(*args, **kwargs)
                 
 class BaseBot(EventEmitter):
+    # LLM client, created on first use (see the llm property)
+    _llm = None
+    _llm_lock = threading.Lock()
+    # JSON-lines logger in headless mode
+    logger = None
+    
     def __init__(self, options=None):
         super().__init__()
         
@@ -48,7 +66,59 @@ class BaseBot(EventEmitter):
             "server_url": self.options.get("server_url", os.getenv("SERVER_URL", "http://localhost:3000")),
             "default_channel": self.options.get("default_channel", os.getenv("DEFAULT_CHANNEL", "general")),
             "max_reconnect_attempts": int(self.options.get("max_reconnect_attempts", os.getenv("MAX_RECONNECT_ATTEMPTS", "5"))),
+            # Use socketio.AsyncClient on the shared event loop instead of a blocking client
+            "async_mode": str(self.options.get("async_mode", os.getenv("BOT_ASYNC_MODE", "false"))).lower() in ("1", "true", "yes"),
+            # No console prompt; output goes to the buffered JSON-lines logger
+            "headless": str(self.options.get("headless", os.getenv("BOT_HEADLESS", "false"))).lower() in ("1", "true", "yes"),
+            # No console thread at all (implies headless); commands come from agent_manager's admin API
+            "daemon": str(self.options.get("daemon", os.getenv("BOT_DAEMON", "false"))).lower() in ("1", "true", "yes"),
+            # Streamed replies: minimum seconds between partial updates, and the
+            # amount of new text that forces an update sooner
+            "stream_update_interval": float(self.options.get("stream_update_interval", os.getenv("STREAM_UPDATE_INTERVAL", "0.5"))),
+            "stream_update_chars": int(self.options.get("stream_update_chars", os.getenv("STREAM_UPDATE_CHARS", "400"))),
+            # Seconds a cached LLM answer stays valid for this bot (0 disables caching)
+            "cache_ttl": float(self.options.get("cache_ttl", os.getenv("RESPONSE_CACHE_TTL", "3600"))),
+            # Cosine similarity at which a paraphrased question reuses a cached answer (0 disables)
+            "semantic_cache_threshold": float(self.options.get("semantic_cache_threshold", os.getenv("SEMANTIC_CACHE_THRESHOLD", "0"))),
+            # Mentions that address this bot ("@recipe"); the message router indexes them
+            "mentions": self.options.get("mentions", []),
+            # Per-bot work queue: messages that may wait, replies generated at once, and
+            # what gives way when the queue is full (drop_oldest, reject or coalesce)
+            "queue_size": int(self.options.get("queue_size", os.getenv("BOT_QUEUE_SIZE", "100"))),
+            "queue_workers": int(self.options.get("queue_workers", os.getenv("BOT_QUEUE_WORKERS", "4"))),
+            "overload_policy": self.options.get("overload_policy", os.getenv("BOT_OVERLOAD_POLICY", "drop_oldest")),
+            "busy_reply": self.options.get("busy_reply", os.getenv("BOT_BUSY_REPLY", "I'm busy with other questions right now, please ask again in a moment.")),
+            # Reply pacing: "none" sends replies when ready, "humanlike" holds a reply until
+            # a random pacing_min_delay..pacing_max_delay seconds after work on the question
+            # starts (queue wait not included)
+            "pacing": self.options.get("pacing", os.getenv("BOT_PACING", "none")),
+            "pacing_min_delay": float(self.options.get("pacing_min_delay", os.getenv("BOT_PACING_MIN_DELAY", "1"))),
+            "pacing_max_delay": float(self.options.get("pacing_max_delay", os.getenv("BOT_PACING_MAX_DELAY", "3"))),
+            # Chat model of this bot; the client is only created once a question needs it
+            "llm_model": self.options.get("llm_model", os.getenv("LLM_MODEL", "gpt-4-turbo")),
+            "llm_temperature": float(self.options.get("llm_temperature", os.getenv("LLM_TEMPERATURE", "0.2"))),
+            # Share one LLM request between concurrent identical prompts
+            "single_flight": str(self.options.get("single_flight", os.getenv("LLM_SINGLE_FLIGHT", "true"))).lower() in ("1", "true", "yes"),
+            # Place in line for the shared LLM rate limiter (lower goes first), retries on
+            # 429/5xx, and the completion size assumed when budgeting tokens
+            "llm_priority": int(self.options.get("llm_priority", os.getenv("BOT_LLM_PRIORITY", "5"))),
+            "llm_max_retries": int(self.options.get("llm_max_retries", os.getenv("LLM_MAX_RETRIES", "4"))),
+            "llm_expected_tokens": int(self.options.get("llm_expected_tokens", os.getenv("LLM_EXPECTED_TOKENS", "500"))),
+            # Collect prompts for up to llm_batch_window ms (0 = off) or llm_batch_size
+            # prompts and send them as one batch. Off by default: ChatOpenAI.abatch
+            # still sends one request per prompt, so only a true batch endpoint gains
+            "llm_batch_window": float(self.options.get("llm_batch_window", os.getenv("LLM_BATCH_WINDOW", "0"))),
+            "llm_batch_size": int(self.options.get("llm_batch_size", os.getenv("LLM_BATCH_SIZE", "8"))),
+            # Replicas of one bot type split the tagged messages between them
+            "replica_index": int(self.options.get("replica_index", os.getenv("BOT_REPLICA_INDEX", "0"))),
+            "replica_count": int(self.options.get("replica_count", os.getenv("BOT_REPLICA_COUNT", "1"))),
+            # "claim": first replica to claim a message answers it; "hash": static split by message id
+            "replica_mode": self.options.get("replica_mode", os.getenv("BOT_REPLICA_MODE", "claim")),
+            # Where claims are made: "server", "local" (same process) or "sqlite:<path>" (same host)
+            "replica_coordinator": self.options.get("replica_coordinator", os.getenv("BOT_REPLICA_COORDINATOR", "server")),
         })
+        if self.config["daemon"]:
+            self.config["headless"] = True
         # self.config.update(options)
         # Current state
         self.state = {
@@ -77,6 +147,64 @@ class BaseBot(EventEmitter):
         
         #Thread management END
         
+        # Process-wide event loop that runs generate_response for every bot
+        self.event_loop = self.options.get("event_loop") or get_shared_loop()
+        
+        # Process-wide cache of LLM answers, shared by every bot
+        self.response_cache = self.options.get("response_cache") or get_response_cache()
+        self.semantic_cache = self.options.get("semantic_cache")
+        if self.semantic_cache is None and self.config["semantic_cache_threshold"] > 0:
+            # Imported lazily so bots without a semantic cache don't load numpy
+            from .semantic_cache import get_semantic_cache
+            self.semantic_cache = get_semantic_cache()
+        
+        # Requests and tokens per minute, shared by every bot using the same API key and model
+        self.rate_limiter = self.options.get("rate_limiter") or get_rate_limiter(
+            os.environ.get("OPENAI_API_KEY"), self.config["llm_model"]
+        )
+        
+        # Identical prompts in flight at the same time share one request
+        self.single_flight = (self.options.get("single_flight_group") or get_single_flight()) if self.config["single_flight"] else None
+        
+        # Micro-batching of this bot's LLM requests
+        self.batcher = self.options.get("batcher")
+        if self.batcher is None and self.config["llm_batch_window"] > 0:
+            self.batcher = MicroBatcher(self.config["llm_batch_window"] / 1000, self.config["llm_batch_size"])
+        
+        # Work sharing between replicas of this bot
+        self.replica_id = replica_identity(self.config["bot_id"], self.config["replica_index"])
+        self.replica_assignment = HashAssignment(self.config["replica_index"], self.config["replica_count"])
+        self.replica_coordinator = None
+        if self.config["replica_count"] > 1 and self.config["replica_mode"] == "claim":
+            self.replica_coordinator = self.options.get("coordinator") or make_coordinator(self.config["replica_coordinator"], self)
+        self.replica_stats = {"handled": 0, "skipped": 0}
+        
+        # MessageRouter that feeds this bot when it runs under agent_manager
+        self.router = None
+        # When replies may be sent; options may pass any object with begin(message)
+        pacing = self.options.get("pacing_policy")
+        self.pacing = pacing if pacing is not None else make_pacing(
+            self.config["pacing"], self.config["pacing_min_delay"], self.config["pacing_max_delay"]
+        )
+        
+        # Structured output in headless mode (see print_message)
+        self.logger = (self.options.get("logger") or get_json_logger()) if self.config["headless"] else None
+        
+        # Counters and stage timings, served by agent_manager's metrics endpoint
+        self.metrics = get_metrics_registry().bot(self.config["bot_id"], self.config["bot_name"])
+        
+        # Messages waiting for a reply
+        self.work_queue = WorkQueue(
+            self._handle_queued,
+            max_size=self.config["queue_size"],
+            workers=self.config["queue_workers"],
+            policy=self.config["overload_policy"],
+            on_reject=self._reply_busy,
+            on_wait=lambda seconds: self.metrics.observe("queue", seconds)
+        )
+        self.metrics.gauge("queue_depth", lambda: self.work_queue.stats()["depth"])
+        self.metrics.gauge("queue_shed", lambda: self.work_queue.stats()["shed"])
+        
         # Initialize the bot
         self.init()
         
@@ -96,7 +224,10 @@ class BaseBot(EventEmitter):
         
     def initSocket(self):
         """Initialize the Socket.IO client"""
-        self.socket = socketio.Client(
+        # In async mode the client lives on the shared event loop, so a bot
+        # needs no engine.io threads of its own
+        client_class = socketio.AsyncClient if self.config["async_mode"] else socketio.Client
+        self.socket = client_class(
             reconnection=True,
             reconnection_attempts=self.config["max_reconnect_attempts"],
             reconnection_delay=1,
@@ -107,6 +238,50 @@ class BaseBot(EventEmitter):
         self.server_url = self.config["server_url"]
         self.server_path = '/api/socket'
         
+    def connect_socket(self):
+        """Connect to the server with whichever client initSocket created"""
+        if not self.config["async_mode"]:
+            self.socket.connect(url=self.server_url, socketio_path=self.server_path)
+            return
+        coro = self.socket.connect(url=self.server_url, socketio_path=self.server_path)
+        if self.event_loop.in_loop_thread():
+            self.event_loop.spawn(coro)
+        else:
+            self.event_loop.run(coro)
+            
+    def disconnect_socket(self):
+        """Disconnect from the server"""
+        if not self.config["async_mode"]:
+            self.socket.disconnect()
+            return
+        coro = self.socket.disconnect()
+        if self.event_loop.in_loop_thread():
+            self.event_loop.spawn(coro)
+        else:
+            self.event_loop.run(coro, timeout=5)
+            
+    def socket_emit(self, event, data=None, callback=None):
+        """
+        Emit an event to the server from any thread
+        
+        In async mode the emit is scheduled on the shared event loop.
+        
+        Args:
+            event (str): Event name
+            data: Event payload
+            callback (callable): Optional acknowledgement callback
+        """
+        if not self.config["async_mode"]:
+            return self.socket.emit(event, data, callback=callback)
+        return self.event_loop.spawn(self.socket.emit(event, data, callback=callback))
+        
+    async def socket_emit_async(self, event, data=None, callback=None):
+        """Emit an event to the server from a coroutine on the shared event loop"""
+        if self.config["async_mode"]:
+            await self.socket.emit(event, data, callback=callback)
+        else:
+            self.socket.emit(event, data, callback=callback)
+        
     def setupSocketHandlers(self):
         """Set up Socket.IO event handlers"""
         # Connection events
@@ -117,7 +292,7 @@ class BaseBot(EventEmitter):
             self.print_message("Connected to server")
             
             # Register the bot
-            self.socket.emit("register", {
+            self.socket_emit("register", {
                 "botId": self.config["bot_id"],
                 "name": self.config["bot_name"],
                 "type": self.config["bot_type"],
@@ -134,6 +309,8 @@ class BaseBot(EventEmitter):
         @self.socket.event
         def disconnect():
             self.state["is_connected"] = False
+            if self.router is not None:
+                self.router.forget(self)
             self.print_message("Disconnected from server")
             self.display_prompt()
             
@@ -143,7 +320,7 @@ class BaseBot(EventEmitter):
         @self.socket.event
         def connect_error(error):
             self.state["connection_attempts"] += 1
-            self.print_message(f'Connection error: {str(error)}')
+            self.print_message(f'Connection error: {str(error)}', level="warning", event="connect_error")
             
             if self.state["connection_attempts"] < self.config["max_reconnect_attempts"]:
                 self.print_message(f'Reconnection attempt {self.state["connection_attempts"]}/{self.config["max_reconnect_attempts"]}...')
@@ -165,64 +342,16 @@ class BaseBot(EventEmitter):
                 
         @self.socket.on("new_message")
         def on_new_message(message):
+            if self.router is not None:
+                # The router matches the message once for every bot in the process
+                self.router.ingest(message)
             # Don't show our own messages again
-            if message.get("senderId") != self.config["bot_id"]:
-                self.print_message(f"{message.get('senderName')}: {message.get('content')}")
+            elif message.get("senderId") != self.config["bot_id"]:
+                self.metrics.count("messages_seen")
+                self.print_message(f"{message.get('senderName')}: {message.get('content')}", event="message_seen")
                 
                 if self.should_respond_to(message):
-                    # Create a delay to seem more human-like
-                    delay = 1 + random.random() * 2  # 1-3 seconds
-                    
-                    def delayed_response():
-                        time.sleep(delay)
-                        
-                        if not self.state["is_connected"]:
-                            self.print_message("Cannot respond to message: Not connected to server")
-                            self.display_prompt()
-                            return
-                        
-                        # Check if the channel is active before responding
-                        if self.state["channel_states"].get(message.get("channelId")) is False:
-                            self.print_message(f"Cannot respond to message: Channel {message.get('channelId')} is inactive")
-                            self.display_prompt()
-                            return
-                        
-                        try:
-                            
-                            json = self.extract_json_block(message.get("content"))
-                            if json:
-                                message["json"] = json
-                            
-                            # Create a new event loop for this thread
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            
-                            # Run the async generate_response method
-                            try:
-                                response = loop.run_until_complete(self.generate_response(message))
-                            except Exception as e:
-                                self.print_message(f"Error generating response x01: {str(e)}")
-                                response = "Error generating response x01"
-                            finally:
-                                # Clean up
-                                loop.close()    
-                            
-                            # Send the response
-                            self.socket.emit("message", {
-                                "channelId": message.get("channelId"),
-                                "content": response
-                            })
-                            
-                            self.print_message(f"You responded to {message.get('senderName')}: {response}")
-                        except Exception as e:
-                            self.print_message(f"Error generating response x02: {str(e)}")
-                        finally:
-                            self.display_prompt()
-                    
-                    # Start a thread for the delayed response
-                    response_thread = threading.Thread(target=delayed_response)
-                    response_thread.daemon = True
-                    response_thread.start()
+                    self.deliver(message)
             
             self.display_prompt()
             
@@ -264,7 +393,7 @@ class BaseBot(EventEmitter):
             self.print_message(f"Channel started: {data.get('channelId')}")
             
             # Update channel state to active
-            self.state["channel_states"][data.get("channelId")] = True
+            self.set_channel_state(data.get("channelId"), True)
             
             self.display_prompt()
             
@@ -276,7 +405,7 @@ class BaseBot(EventEmitter):
             self.print_message(f"Channel stopped: {data.get('channelId')}")
             
             # Update channel state to inactive
-            self.state["channel_states"][data.get("channelId")] = False
+            self.set_channel_state(data.get("channelId"), False)
             
             self.display_prompt()
             
@@ -295,6 +424,424 @@ class BaseBot(EventEmitter):
                 print('----------------autojoining channel', self.options.get('autojoin_channel', None))
                 self.process_command(f"/join {self.options.get('autojoin_channel', None)}")
 
+    def deliver(self, message):
+        """
+        Queue a message this bot should answer (thread-safe)
+        
+        Args:
+            message (dict): Message object
+        """
+        self.metrics.count("messages_matched")
+        self.event_loop.call_soon(self.work_queue.put, message)
+        
+    async def _handle_queued(self, message):
+        # Queue workers reply through the shared loop, within its concurrency limit
+        await asyncio.wrap_future(self.event_loop.submit(self.respond_to_message(message)))
+        
+    def _reply_busy(self, message):
+        self.event_loop.spawn(self.socket_emit_async("message", {
+            "channelId": message.get("channelId"),
+            "content": self.config["busy_reply"]
+        }))
+            
+    def set_channel_state(self, channel_id, active):
+        """Record whether a channel is active, for every bot sharing this bot's router"""
+        if self.router is not None:
+            self.router.set_channel_state(channel_id, active)
+        else:
+            self.state["channel_states"][channel_id] = active
+            
+    def join_channel(self, channel_id):
+        """Join a channel; under a router, only one bot per channel receives its messages"""
+        if self.router is None or self.router.should_listen(self, channel_id):
+            self.socket_emit("join_channel", channel_id)
+        else:
+            self.socket_emit("join_channel", (channel_id, {"listen": False}))
+            
+    def listen_to_channel(self, channel_id):
+        """Start receiving a channel's messages after joining it muted"""
+        self.socket_emit("join_channel", channel_id)
+        
+    def leave_channel(self, channel_id):
+        """Leave a channel"""
+        if self.router is not None:
+            self.router.leave(self, channel_id)
+        self.socket_emit("leave_channel", channel_id)
+    
+    async def respond_to_message(self, message):
+        """
+        Generate and send a reply to a message (runs on the shared event loop)
+        
+        Args:
+            message (dict): Message object
+        """
+        started = time.perf_counter()
+        with self.metrics.span("claim"):
+            claimed = await self.claim_message(message)
+        if not claimed:
+            return
+        
+        # The pacing delay (if any) runs while the reply is generated
+        pace = self.pacing.begin(message)
+        
+        if not self.state["is_connected"]:
+            self.print_message("Cannot respond to message: Not connected to server")
+            self.display_prompt()
+            return
+        
+        # Check if the channel is active before responding
+        if self.state["channel_states"].get(message.get("channelId")) is False:
+            self.print_message(f"Cannot respond to message: Channel {message.get('channelId')} is inactive")
+            self.display_prompt()
+            return
+        
+        try:
+            with self.metrics.span("extract"):
+                # The router has already looked for a JSON block
+                json_block = message.get("json") or self.extract_json_block(message.get("content"))
+            if json_block:
+                message["json"] = json_block
+            
+            try:
+                with self.metrics.span("generate"):
+                    result = self.generate_response(message)
+                    if inspect.isasyncgen(result):
+                        # Streaming bot: the reply is sent while it is being generated
+                        response = await self.stream_response(message, result, pace)
+                        self.metrics.count("replies_sent")
+                        self.metrics.observe("reply", time.perf_counter() - started)
+                        self.print_message(f"You responded to {message.get('senderName')}: {response}", event="reply")
+                        return
+                    response = await result
+            except Exception as e:
+                self.metrics.count("reply_errors")
+                self.print_message(f"Error generating response x01: {str(e)}", level="error", event="error")
+                response = "Error generating response x01"
+            
+            with self.metrics.span("pace"):
+                await pace.wait()
+            
+            # Send the response
+            with self.metrics.span("emit"):
+                await self.socket_emit_async("message", {
+                    "channelId": message.get("channelId"),
+                    "content": response
+                })
+            self.metrics.count("replies_sent")
+            self.metrics.observe("reply", time.perf_counter() - started)
+            
+            self.print_message(f"You responded to {message.get('senderName')}: {response}", event="reply")
+        except Exception as e:
+            self.metrics.count("reply_errors")
+            self.print_message(f"Error generating response x02: {str(e)}", level="error", event="error")
+        finally:
+            self.display_prompt()
+
+    async def claim_message(self, message):
+        """
+        Decide whether this replica handles a message. Always True for a
+        bot without replicas.
+        
+        Args:
+            message (dict): Message object
+            
+        Returns:
+            bool: True if this replica should answer the message
+        """
+        if self.config["replica_count"] <= 1:
+            return True
+        key = message_key(message)
+        if self.replica_coordinator is None:
+            handled = self.replica_assignment.owns(key)
+        else:
+            try:
+                handled = await self.replica_coordinator.claim(self.config["bot_id"], key, self.replica_id)
+            except Exception as e:
+                self.print_message(f"Error claiming message: {str(e)}", level="error", event="error")
+                handled = self.replica_assignment.owns(key)
+        self.replica_stats["handled" if handled else "skipped"] += 1
+        return handled
+    
+    async def stream_response(self, message, chunks, pace=None):
+        """
+        Send a reply while it is being generated: one message as soon as the
+        first text arrives, then partial updates to that message. Chunks are
+        coalesced so updates go out at most every stream_update_interval
+        seconds, or sooner once stream_update_chars of new text are pending.
+        
+        Args:
+            message (dict): Message being replied to
+            chunks (async generator): Reply text chunks from generate_response
+            pace: Pacing handle from self.pacing.begin(); the first message
+                waits for it
+            
+        Returns:
+            str: The complete reply
+        """
+        channel_id = message.get("channelId")
+        loop = asyncio.get_running_loop()
+        message_id = loop.create_future()
+        
+        def set_message_id(data):
+            if not message_id.done():
+                message_id.set_result((data or {}).get("id"))
+        
+        def on_ack(data=None):
+            # The server acknowledges with the id of the message it created
+            loop.call_soon_threadsafe(set_message_id, data)
+        
+        response = ""
+        sent_length = 0
+        last_sent = 0.0
+        started = loop.time()
+        try:
+            async for chunk in chunks:
+                response += chunk
+                now = loop.time()
+                if not sent_length:
+                    if response.strip():
+                        self.metrics.observe("first_text", now - started)
+                        if pace is not None:
+                            await pace.wait()
+                        await self.socket_emit_async("message", {
+                            "channelId": channel_id,
+                            "content": response
+                        }, callback=on_ack)
+                        sent_length, last_sent = len(response), now
+                elif message_id.done() and message_id.result() and (
+                    now - last_sent >= self.config["stream_update_interval"]
+                    or len(response) - sent_length >= self.config["stream_update_chars"]
+                ):
+                    await self.socket_emit_async("update_message", {
+                        "channelId": channel_id,
+                        "messageId": message_id.result(),
+                        "content": response,
+                        "done": False
+                    })
+                    sent_length, last_sent = len(response), now
+        except Exception as e:
+            self.metrics.count("reply_errors")
+            self.print_message(f"Error streaming response: {str(e)}", level="error", event="error")
+            response += f"\n\n- ❌ Response interrupted: {e}"
+        
+        if not sent_length:
+            if pace is not None:
+                await pace.wait()
+            await self.socket_emit_async("message", {
+                "channelId": channel_id,
+                "content": response
+            })
+            return response
+        
+        try:
+            final_id = await asyncio.wait_for(asyncio.shield(message_id), timeout=5)
+        except asyncio.TimeoutError:
+            final_id = None
+        if final_id:
+            await self.socket_emit_async("update_message", {
+                "channelId": channel_id,
+                "messageId": final_id,
+                "content": response,
+                "done": True
+            })
+        else:
+            # Server did not return a message id; send the full reply instead
+            await self.socket_emit_async("message", {
+                "channelId": channel_id,
+                "content": response
+            })
+        return response
+    
+    @property
+    def llm(self):
+        """
+        The bot's chat model client. It comes from the process-wide registry,
+        so bots with the same model and temperature share one client and its
+        warm connections. It is fetched on first access, so bots that never
+        get a question don't pay for importing langchain.
+        """
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm = get_llm_client(self.config["llm_model"], self.config["llm_temperature"])
+        return self._llm
+    
+    @llm.setter
+    def llm(self, client):
+        self._llm = client
+    
+    async def get_llm(self):
+        """Return the LLM client, creating it off the event loop on first use"""
+        if self._llm is None:
+            # The first import of langchain takes most of a second; don't stall other bots
+            return await asyncio.to_thread(lambda: self.llm)
+        return self._llm
+    
+    async def ask_llm(self, prompt, query=None):
+        """
+        Send a prompt to the bot's LLM without blocking the event loop
+        
+        Args:
+            prompt (str): Prompt text
+            query (str): The user's question on its own; enables the
+                semantic cache for paraphrases of earlier questions
+            
+        Returns:
+            str: The completion text
+        """
+        cached = await self.get_cached_answer(prompt, query)
+        if cached is not None:
+            return cached
+        llm = await self.get_llm()
+        answer = await self._ask_upstream(llm, prompt)
+        self.cache_answer(prompt, answer, query)
+        return answer
+    
+    async def _ask_upstream(self, llm, prompt):
+        if self.single_flight is not None:
+            return await self.single_flight.do(self._flight_key(llm, prompt), lambda: self._complete(llm, prompt))
+        return await self._complete(llm, prompt)
+    
+    def _flight_key(self, llm, prompt):
+        # The client instance stands for model and temperature (see llm_clients)
+        return (id(llm), normalize_prompt(prompt))
+    
+    async def _complete(self, llm, prompt):
+        # One completion request, through the rate limiter and with retries
+        estimated = estimate_tokens(prompt, self.config["llm_expected_tokens"])
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(estimated, self.config["llm_priority"])
+            self.metrics.count("llm_requests")
+            try:
+                with self.metrics.span("llm"):
+                    if self.batcher is not None:
+                        result = await self.batcher.submit(llm, prompt)
+                    else:
+                        result = await llm.ainvoke(prompt)
+                break
+            except Exception as e:
+                self.metrics.count("llm_errors")
+                attempt += 1
+                await self._wait_to_retry(e, attempt)
+        usage = (getattr(result, "response_metadata", None) or {}).get("token_usage") or {}
+        self.rate_limiter.record_usage(estimated, usage.get("total_tokens"))
+        return result.content
+    
+    async def _wait_to_retry(self, error, attempt):
+        """
+        Back off before retrying a failed LLM request, or re-raise the error
+        when it is not a 429/5xx or the retries are used up
+        """
+        status = retry_status(error)
+        if status is None or attempt > self.config["llm_max_retries"]:
+            raise error
+        delay = retry_after(error) or backoff_delay(attempt)
+        self.rate_limiter.count_retry()
+        if status == 429:
+            # The whole account is over its limit: hold every bot, not just this one
+            self.rate_limiter.pause(delay)
+        else:
+            await asyncio.sleep(delay)
+        self.print_message(f"LLM request failed with {status}, retry {attempt}/{self.config['llm_max_retries']} in {delay:.1f}s", level="warning", event="llm_retry")
+    
+    async def get_cached_answer(self, prompt, query=None):
+        """Return this bot's cached answer to a prompt (or a close paraphrase of query), or None"""
+        if self.config["cache_ttl"] <= 0:
+            return None
+        # The SQLite tier (if any) is read off the shared loop
+        cached = await self.response_cache.aget(self.config["bot_id"], prompt)
+        if cached is None and query and self.semantic_cache is not None:
+            # The lookup scans every cached question: keep it off the shared loop
+            cached = await asyncio.to_thread(self.semantic_cache.get, self.config["bot_id"], query, self.config["semantic_cache_threshold"])
+        self.metrics.count("cache_misses" if cached is None else "cache_hits")
+        return cached
+    
+    def cache_answer(self, prompt, answer, query=None):
+        """Store an LLM answer for this bot's cache_ttl"""
+        if self.config["cache_ttl"] <= 0 or not answer:
+            return
+        self.response_cache.set(self.config["bot_id"], prompt, answer, self.config["cache_ttl"])
+        if query and self.semantic_cache is not None:
+            self.semantic_cache.set(self.config["bot_id"], query, answer, self.config["cache_ttl"])
+    
+    async def _llm_chunks(self, prompt, query=None):
+        # Answer text chunks: a cached answer in one piece, or the live stream
+        cached = await self.get_cached_answer(prompt, query)
+        if cached is not None:
+            yield cached
+            return
+        llm = await self.get_llm()
+        if self.batcher is not None:
+            # Batched requests can't stream: the answer arrives in one piece
+            answer = await self._ask_upstream(llm, prompt)
+            self.cache_answer(prompt, answer, query)
+            yield answer
+            return
+        answer = ""
+        if self.single_flight is not None:
+            chunks = self.single_flight.stream(self._flight_key(llm, prompt), lambda: self._stream_completion(llm, prompt))
+        else:
+            chunks = self._stream_completion(llm, prompt)
+        async for chunk in chunks:
+            answer += chunk
+            yield chunk
+        self.cache_answer(prompt, answer, query)
+    
+    async def _stream_completion(self, llm, prompt):
+        # One streamed completion, through the rate limiter and with retries
+        estimated = estimate_tokens(prompt, self.config["llm_expected_tokens"])
+        attempt = 0
+        sent = False
+        while True:
+            await self.rate_limiter.acquire(estimated, self.config["llm_priority"])
+            self.metrics.count("llm_requests")
+            started = time.perf_counter()
+            try:
+                async for chunk in llm.astream(prompt):
+                    if chunk.content:
+                        sent = True
+                        yield chunk.content
+                self.metrics.observe("llm", time.perf_counter() - started)
+                return
+            except Exception as e:
+                self.metrics.count("llm_errors")
+                if sent:
+                    # Part of the answer is already out; it can't be retried
+                    raise
+                attempt += 1
+                await self._wait_to_retry(e, attempt)
+    
+    async def stream_llm(self, prompt, heading=None, separator="\n", query=None):
+        """
+        Stream the bot's LLM answer as it is generated
+        
+        Args:
+            prompt (str): Prompt text
+            heading (str): Optional heading the answer must start with; it is
+                added (followed by separator) if the model leaves it out
+            separator (str): Text placed between an added heading and the answer
+            query (str): The user's question on its own (see ask_llm)
+            
+        Yields:
+            str: Completion text chunks
+        """
+        head = "" if heading else None
+        async for text in self._llm_chunks(prompt, query):
+            if head is None:
+                yield text
+                continue
+            # Hold back text until we know whether the model wrote the heading
+            head += text
+            stripped = head.lstrip()
+            if len(stripped) < len(heading) and heading.startswith(stripped):
+                continue
+            yield stripped if stripped.startswith(heading) else f"{heading}{separator}{stripped}"
+            head = None
+        if head:
+            stripped = head.lstrip()
+            yield stripped if stripped.startswith(heading) else f"{heading}{separator}{stripped}"
+
     def extract_json_block(self, content):
         """Extract JSON block from content"""
         try:
@@ -330,7 +877,7 @@ class BaseBot(EventEmitter):
             while self._running and not self._exit_flag.is_set():
                 try:
                     # Use a timeout to allow checking for exit flag
-                    char = input(f'[{self.config["bot_name"]}] enter details. /exit to quit: ')
+                    char = input('' if self.config["headless"] else f'[{self.config["bot_name"]}] enter details. /exit to quit: ')
                     if char == '/exit':
                         self.cleanup_and_exit()
                         break
@@ -350,18 +897,18 @@ class BaseBot(EventEmitter):
         try:
              # Start the socket.io connection
             if not self.state["is_connected"]:
-                self.socket.connect(
-                    url=self.server_url,
-                    socketio_path=self.server_path
-                )
+                self.connect_socket()
                 
             """Start the parent process"""
             if self._exit_flag.is_set():
                 self._exit_flag.clear()
             self._running = True
-            self._thread = threading.Thread(target=self.runUntilStopped)
-            self._thread.daemon = True  # Make threads daemon to auto-exit on main thread exit
-            self._thread.start()
+            # start() may be called again to recover a failed connection;
+            # keep a single console thread (none in daemon mode)
+            if not self.config["daemon"] and (not self._thread or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self.runUntilStopped)
+                self._thread.daemon = True  # Make threads daemon to auto-exit on main thread exit
+                self._thread.start()
             
         except Exception as e:
             print(f"Error starting bot: {e}")
@@ -384,6 +931,8 @@ class BaseBot(EventEmitter):
         try:
             if self._thread and self._thread.is_alive():
                 self._thread.join(timeout)
+            elif self.config["daemon"]:
+                self._completed.wait(timeout)
             
             # if you need child also to have its own thread aside the parent, uncomment below 
             # if self._child_thread and self._child_thread.is_alive():
@@ -419,13 +968,20 @@ class BaseBot(EventEmitter):
     #         self.cleanup_and_exit()
     
    
-    def cleanup_and_exit(self):
-        """Clean up resources and exit gracefully"""
+    def shutdown(self):
+        """Leave the current channel and disconnect, without exiting the process"""
+        self._exit_flag.set()
+        self._running = False
+        self._completed.set()
         if self.state["current_channel_id"] and self.state["is_connected"]:
-            self.socket.emit("leave_channel", self.state["current_channel_id"])
+            self.leave_channel(self.state["current_channel_id"])
         if self.state["is_connected"]:
-            self.socket.disconnect()
+            self.disconnect_socket()
         self.running = False
+    
+    def cleanup_and_exit(self):
+        """Clean up resources and exit gracefully"""
+        self.shutdown()
         self.print_message("Exiting bot")
         sys.exit(0)
     
@@ -471,7 +1027,7 @@ class BaseBot(EventEmitter):
                 if not self.state["is_connected"]:
                     self.print_message("Not connected to server. Cannot join channel.")
                     return
-                self.socket.emit("join_channel", join_channel_id)
+                self.join_channel(join_channel_id)
                 self.state["current_channel_id"] = join_channel_id
                 
                 # When joining a channel, request its status to update our state
@@ -480,7 +1036,7 @@ class BaseBot(EventEmitter):
                         self.state["channel_states"][join_channel_id] = data.get("active")
                         self.print_message(f"Channel {join_channel_id} is {'active' if data.get('active') else 'inactive'}")
                 
-                self.socket.emit("get_channel_details", join_channel_id, callback=on_channel_details)
+                self.socket_emit("get_channel_details", join_channel_id, callback=on_channel_details)
                 
                 self.print_message(f"Joining channel: {join_channel_id}")
                 
@@ -491,7 +1047,7 @@ class BaseBot(EventEmitter):
                 if not self.state["is_connected"]:
                     self.print_message("Not connected to server. Cannot leave channel.")
                     return
-                self.socket.emit("leave_channel", self.state["current_channel_id"])
+                self.leave_channel(self.state["current_channel_id"])
                 self.print_message(f'Leaving channel: {self.state["current_channel_id"]}')
                 self.state["current_channel_id"] = None
                 
@@ -503,7 +1059,7 @@ class BaseBot(EventEmitter):
                 if not start_channel_id:
                     self.print_message("Error: No channel specified and not in a channel")
                     return
-                self.socket.emit("start_channel", start_channel_id)
+                self.socket_emit("start_channel", start_channel_id)
                 self.state["current_channel_id"] = start_channel_id
                 
                 # When starting a channel, set its state to active
@@ -518,7 +1074,7 @@ class BaseBot(EventEmitter):
                 if not self.state["is_connected"]:
                     self.print_message("Not connected to server. Cannot stop channel.")
                     return
-                self.socket.emit("stop_channel", self.state["current_channel_id"])
+                self.socket_emit("stop_channel", self.state["current_channel_id"])
                 
                 # When stopping a channel, set its state to inactive
                 self.state["channel_states"][self.state["current_channel_id"]] = False
@@ -543,7 +1099,7 @@ class BaseBot(EventEmitter):
                             self.state["channel_states"][new_channel_id] = data.get("active")
                             self.print_message(f"Channel {new_channel_id} is {'active' if data.get('active') else 'inactive'}")
                     
-                    self.socket.emit("get_channel_details", new_channel_id, callback=on_channel_details)
+                    self.socket_emit("get_channel_details", new_channel_id, callback=on_channel_details)
                 
                 self.print_message(f"Switched to channel: {new_channel_id}")
                 
@@ -553,10 +1109,7 @@ class BaseBot(EventEmitter):
                     return
                 self.print_message("Attempting to reconnect to server...")
                 try:
-                    self.socket.connect(
-                        url=self.server_url,
-                        socketio_path=self.server_path
-                    )
+                    self.connect_socket()
                 except Exception as e:
                     self.print_message(f"Reconnection error: {str(e)}")
                 
@@ -578,7 +1131,7 @@ class BaseBot(EventEmitter):
                     self.print_message(f'Participants: {len(data.get("participants", []))}')
                     self.print_message(f"Message count: {data.get('messageCount')}")
                 
-                self.socket.emit("get_channel_details", self.state["current_channel_id"], callback=on_channel_details)
+                self.socket_emit("get_channel_details", self.state["current_channel_id"], callback=on_channel_details)
                 
             elif command == 'messages':
                 if not self.state["current_channel_id"]:
@@ -601,15 +1154,38 @@ class BaseBot(EventEmitter):
                             time_str = timestamp.strftime("%H:%M:%S")
                             self.print_message(f'[{time_str}] {msg.get("senderName")}: {msg.get("content")}')
                 
-                self.socket.emit("get_channel_messages", self.state["current_channel_id"], callback=on_channel_messages)
+                self.socket_emit("get_channel_messages", self.state["current_channel_id"], callback=on_channel_messages)
+                
+            elif command == 'stats':
+                stats = self.event_loop.stats()
+                self.print_message(f"Event loop: {stats['running']} running, {stats['queued']} queued (peak {stats['max_queued']}), limit {stats['max_concurrency']}")
+                self.print_message(f"Replies: {stats['submitted']} submitted, {stats['completed']} completed, {stats['failed']} failed")
+                cache_stats = self.response_cache.stats(self.config["bot_id"])
+                self.print_message(f"Answer cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entries in memory")
+                if self.semantic_cache is not None:
+                    semantic_stats = self.semantic_cache.stats(self.config["bot_id"])
+                    self.print_message(f"Semantic cache: {semantic_stats['hits']} hits, {semantic_stats['misses']} misses ({semantic_stats['hit_rate']:.0%}), {semantic_stats['entries']} entries")
+                limiter_stats = self.rate_limiter.stats()
+                self.print_message(f"LLM limiter: {limiter_stats['acquired']} requests, {limiter_stats['waiting']} waiting, wait {limiter_stats['wait_mean'] * 1000:.0f} ms mean / {limiter_stats['wait_max'] * 1000:.0f} ms max, {limiter_stats['throttled']} throttled, {limiter_stats['retries']} retries")
+                if self.single_flight is not None:
+                    flight_stats = self.single_flight.stats()
+                    self.print_message(f"Single-flight: {flight_stats['upstream']} LLM requests sent, {flight_stats['saved']} saved by sharing one in flight")
+                if self.batcher is not None:
+                    batch_stats = self.batcher.stats()
+                    self.print_message(f"LLM batches: {batch_stats['batches']} sent, {batch_stats['mean_size']:.1f} prompts each, {batch_stats['full']} full / {batch_stats['timed_out']} at end of window")
+                queue_stats = self.work_queue.stats()
+                self.print_message(f"Work queue: {queue_stats['depth']}/{queue_stats['max_size']} waiting (peak {queue_stats['max_depth']}), {queue_stats['active']}/{queue_stats['workers']} workers busy, wait {queue_stats['wait_mean'] * 1000:.0f} ms mean / {queue_stats['wait_max'] * 1000:.0f} ms max")
+                self.print_message(f"Shed ({queue_stats['policy']}): {queue_stats['dropped_oldest']} dropped, {queue_stats['rejected']} rejected, {queue_stats['coalesced']} coalesced")
+                if self.config["replica_count"] > 1:
+                    self.print_message(f"Replica {self.config['replica_index'] + 1}/{self.config['replica_count']} ({self.config['replica_mode']}): {self.replica_stats['handled']} handled, {self.replica_stats['skipped']} left to other replicas")
                 
             elif command == 'help':
                 self.show_help()
                 
             elif command == 'exit':
                 if self.state["current_channel_id"] and self.state["is_connected"]:
-                    self.socket.emit("leave_channel", self.state["current_channel_id"])
-                self.socket.disconnect()
+                    self.leave_channel(self.state["current_channel_id"])
+                self.disconnect_socket()
                 self.running = False
                 self.print_message("Exiting bot")
                 sys.exit(0)
@@ -631,7 +1207,7 @@ class BaseBot(EventEmitter):
                 self.display_prompt()
                 return
             
-            self.socket.emit("message", {
+            self.socket_emit("message", {
                 "channelId": self.state["current_channel_id"],
                 "content": trimmed_input
             })
@@ -666,6 +1242,7 @@ class BaseBot(EventEmitter):
         self.print_message("/info - Get information about the current channel")
         self.print_message("/messages - Show recent messages in the current channel")
         self.print_message("/reconnect - Attempt to reconnect to the server")
+        self.print_message("/stats - Show event loop, work queue and answer cache statistics")
         self.print_message("/exit - Exit the bot")
         self.print_message("/help - Show this help message")
         
@@ -674,18 +1251,25 @@ class BaseBot(EventEmitter):
         
         self.print_message("To send a message, just type it and press enter")
     
-    def print_message(self, message):
+    def print_message(self, message, level="info", event="log"):
         """
-        Print a message with timestamp
+        Print a message with timestamp, or log it as a JSON line in headless mode
         
         Args:
             message (str): Message to print
+            level (str): "debug", "info", "warning" or "error"
+            event (str): Record type for the JSON log, used for sampling
         """
+        if self.logger is not None:
+            self.logger.log(level, event, message, bot=self.config["bot_id"])
+            return
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         print(f'[{timestamp}] {message}')
     
     def display_prompt(self):
         """Display prompt to the user"""
+        if self.config["headless"]:
+            return
         channel_status = f'({self.config["bot_id"]})[{self.state["current_channel_id"]}]' if self.state["current_channel_id"] else "[no channel]"
         
         channel_active = ""
@@ -726,7 +1310,9 @@ class BaseBot(EventEmitter):
     async def generate_response(self, message):
         """
         Generate a response to a message
-        This method should be overridden by derived classes
+        This method should be overridden by derived classes.
+        Derived classes may instead implement it as an async generator that
+        yields text chunks; the reply is then streamed (see stream_response).
         
         Args:
             message (dict): Message object
@@ -760,6 +1346,35 @@ class BaseBot(EventEmitter):
         # Base implementation: no custom help
         pass
     
+    def channel_details(self, channel_id=None, timeout=5):
+        """
+        Ask the server for a channel's details and wait for the answer
+        (blocking; not for use on the event loop thread)
+        
+        Args:
+            channel_id (str): Defaults to the current channel
+            timeout (float): Seconds to wait for the server
+            
+        Returns:
+            dict: The server's channel details (active, participants,
+                messageCount, ...), or None when not connected, not in a
+                channel or the server did not answer
+        """
+        channel_id = channel_id or self.state["current_channel_id"]
+        if not channel_id or not self.state["is_connected"]:
+            return None
+        answered = threading.Event()
+        details = {}
+        
+        def on_channel_details(data):
+            details.update(data or {})
+            if isinstance(details.get("active"), bool):
+                self.state["channel_states"][channel_id] = details["active"]
+            answered.set()
+        
+        self.socket_emit("get_channel_details", channel_id, callback=on_channel_details)
+        return details if answered.wait(timeout) else None
+    
     def is_channel_active(self, channel_id):
         """
         Check if a channel is active
@@ -0,0 +1,78 @@
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Collects a bot's LLM prompts for a short window and sends them together
+    through the client's abatch(), fanning each result (or error) back to
+    the caller that asked for it.
+
+    A batch goes out when max_size prompts are waiting or `window` seconds
+    after its first prompt, whichever comes first. Prompts for different
+    clients are batched separately.
+
+    Must be used from a single event loop (the bots' shared loop).
+    """
+
+    def __init__(self, window=0.02, max_size=8):
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._pending = {}  # id(llm) -> (llm, [(prompt, future)], timer)
+        self._stats = {"batches": 0, "items": 0, "full": 0, "timed_out": 0}
+
+    async def submit(self, llm, prompt):
+        """
+        Add a prompt to the current batch and wait for its completion
+
+        Args:
+            llm: Chat model client with abatch()
+            prompt (str): Prompt text
+
+        Returns:
+            The completion message
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = id(llm)
+        if key not in self._pending:
+            timer = loop.call_later(self.window, self._flush, key, "timed_out")
+            self._pending[key] = (llm, [], timer)
+        items = self._pending[key][1]
+        items.append((prompt, future))
+        if len(items) >= self.max_size:
+            self._flush(key, "full")
+        return await future
+
+    def _flush(self, key, reason):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        llm, items, timer = pending
+        timer.cancel()
+        self._stats["batches"] += 1
+        self._stats["items"] += len(items)
+        self._stats[reason] += 1
+        asyncio.ensure_future(self._send(llm, items))
+
+    async def _send(self, llm, items):
+        try:
+            results = await llm.abatch([prompt for prompt, _ in items], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(items)
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue  # the caller gave up
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        """
+        Returns:
+            dict: batches sent, items batched, mean_size, and how many
+                batches went out full or when the window ended
+        """
+        snapshot = dict(self._stats)
+        snapshot["mean_size"] = snapshot["items"] / snapshot["batches"] if snapshot["batches"] else 0.0
+        return snapshot
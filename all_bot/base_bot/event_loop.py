@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+
+
+class SharedEventLoop:
+    """
+    Long-lived asyncio event loop running in a background daemon thread.
+
+    Every bot in the process schedules its coroutines here instead of
+    creating (and tearing down) a new event loop per message. The number of
+    coroutines running at once is bounded by a semaphore; the rest wait on
+    the loop and are reported as queued.
+    """
+
+    def __init__(self, max_concurrency=None, name="bot-event-loop"):
+        self.max_concurrency = int(max_concurrency or os.getenv("BOT_LOOP_MAX_CONCURRENCY", "32"))
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._semaphore = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "running": 0,
+            "queued": 0,
+            "max_queued": 0,
+        }
+
+    def start(self):
+        """Start the loop thread if it is not already running"""
+        with self._lock:
+            if self.is_running():
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop_thread(self):
+        """Whether the caller is running on the loop thread"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the shared loop (thread-safe)
+
+        Args:
+            coro (coroutine): Coroutine to run
+
+        Returns:
+            concurrent.futures.Future: Future resolving to the coroutine result
+        """
+        self.start()
+        with self._stats_lock:
+            self._stats["submitted"] += 1
+            self._stats["queued"] += 1
+            self._stats["max_queued"] = max(self._stats["max_queued"], self._stats["queued"])
+        return asyncio.run_coroutine_threadsafe(self._guarded(coro), self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the shared loop and block until it finishes"""
+        if self.in_loop_thread():
+            raise RuntimeError("SharedEventLoop.run() cannot be called from the loop thread")
+        return self.submit(coro).result(timeout)
+
+    def spawn(self, coro):
+        """
+        Schedule a short coroutine (e.g. socket I/O) outside the concurrency
+        limit and the reply counters. Safe to call from any thread.
+        """
+        self.start()
+        if self.in_loop_thread():
+            return self.loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Schedule a plain callback on the loop (thread-safe)"""
+        self.start()
+        return self.loop.call_soon_threadsafe(callback, *args)
+
+    async def _guarded(self, coro):
+        started = False
+        try:
+            async with self._semaphore:
+                started = True
+                self._update_stats(queued=-1, running=1)
+                try:
+                    result = await coro
+                except Exception:
+                    self._update_stats(failed=1)
+                    raise
+                finally:
+                    self._update_stats(running=-1, completed=1)
+                return result
+        finally:
+            if not started:
+                # Cancelled while waiting for a slot
+                self._update_stats(queued=-1)
+                coro.close()
+
+    def _update_stats(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def stats(self):
+        """
+        Snapshot of loop activity
+
+        Returns:
+            dict: submitted/completed/failed totals, currently running and
+                queued coroutines, and the highest queue depth seen
+        """
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot["max_concurrency"] = self.max_concurrency
+        snapshot["alive"] = self.is_running()
+        return snapshot
+
+    def stop(self, timeout=5):
+        """Stop the loop, cancelling anything still pending"""
+        with self._lock:
+            if not self.is_running():
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_shared_loop = None
+_shared_loop_lock = threading.Lock()
+
+
+def get_shared_loop():
+    """Return the process-wide SharedEventLoop, starting it on first use"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = SharedEventLoop()
+        return _shared_loop.start()
@@ -0,0 +1,148 @@
+import atexit
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+
+class JsonLogger:
+    """
+    Structured logger for headless bots: one JSON object per line.
+
+    log() only filters, samples and appends to an in-memory buffer, so the
+    socket.io threads and the event loop never wait on stdout. A writer
+    thread formats and writes the buffered records in batches, every
+    flush_interval seconds or as soon as batch_size records are waiting.
+    When the buffer is full the oldest records are dropped and counted.
+
+    sample maps an event name to the share of its records to keep (e.g.
+    {"message_seen": 0.01} keeps one in a hundred); warnings and errors are
+    never sampled out.
+    """
+
+    def __init__(self, stream=None, level="info", sample=None, max_buffer=10000, batch_size=256, flush_interval=0.2):
+        self.stream = stream or sys.stdout
+        self.level = LEVELS.get(str(level).lower(), LEVELS["info"])
+        self.every = {event: max(1, round(1 / rate)) for event, rate in (sample or {}).items() if rate > 0}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=max_buffer)
+        self._seen = {}  # event -> records offered, for sampling
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._stats = {"written": 0, "dropped": 0, "sampled_out": 0}
+        self._thread = threading.Thread(target=self._run, name="json-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, level, event, message=None, **fields):
+        """
+        Queue a record (thread-safe, never blocks)
+
+        Args:
+            level (str): "debug", "info", "warning" or "error"
+            event (str): Short record type, e.g. "message_seen" or "reply"
+            message (str): Human-readable text
+            **fields: Extra JSON fields, e.g. bot="geography"
+        """
+        severity = LEVELS.get(level, LEVELS["info"])
+        if severity < self.level:
+            return
+        every = self.every.get(event)
+        if every and severity < LEVELS["warning"]:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+            if seen % every:
+                self._stats["sampled_out"] += 1
+                return
+        if len(self._buffer) == self._buffer.maxlen:
+            self._stats["dropped"] += 1
+        self._buffer.append((time.time(), level, event, message, fields))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._write()
+
+    def _write(self):
+        lines = []
+        while self._buffer:
+            try:
+                created, level, event, message, fields = self._buffer.popleft()
+            except IndexError:
+                break
+            record = {
+                "ts": datetime.datetime.fromtimestamp(created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+                "level": level,
+                "event": event,
+            }
+            if message is not None:
+                record["msg"] = message
+            record.update(fields)
+            lines.append(json.dumps(record, default=str, ensure_ascii=False))
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self._stats["written"] += len(lines)
+        except (OSError, ValueError):
+            self._stats["dropped"] += len(lines)
+
+    def close(self):
+        """Write out what is buffered and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=2)
+        self._write()
+
+    def stats(self):
+        """
+        Returns:
+            dict: written, dropped (buffer full or write failed),
+                sampled_out and buffered record counts
+        """
+        snapshot = dict(self._stats)
+        snapshot["buffered"] = len(self._buffer)
+        return snapshot
+
+
+def parse_sample(spec):
+    """Parse a sampling spec like "message_seen=0.01,reply=0.5" into {event: rate}"""
+    sample = {}
+    for item in (spec or "").split(","):
+        event, _, rate = item.partition("=")
+        if event.strip() and rate.strip():
+            sample[event.strip()] = float(rate)
+    return sample
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_json_logger():
+    """
+    Return the process-wide JsonLogger, configured from BOT_LOG_LEVEL,
+    BOT_LOG_SAMPLE and BOT_LOG_FILE (stdout when unset)
+    """
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            path = os.getenv("BOT_LOG_FILE")
+            _logger = JsonLogger(
+                stream=open(path, "a", encoding="utf-8", buffering=1 << 16) if path else sys.stdout,
+                level=os.getenv("BOT_LOG_LEVEL", "info"),
+                sample=parse_sample(os.getenv("BOT_LOG_SAMPLE")),
+            )
+        return _logger
@@ -0,0 +1,114 @@
+import os
+import threading
+
+# Imported on first use: openai and langchain take most of a second to load
+
+
+class LLMClientRegistry:
+    """
+    Process-wide chat model clients.
+
+    Every (model, temperature) pair gets one ChatOpenAI instance, and all of
+    them share one OpenAI client per API key and base URL. That client
+    keeps an HTTP keep-alive connection pool, so bots reuse warm
+    connections instead of each opening their own.
+
+    The OpenAI clients don't retry by default: BaseBot retries 429s and
+    5xx errors itself, through the shared rate limiter.
+
+    The async client's connections belong to the event loop that first
+    uses them; bots only call it from the shared event loop.
+    """
+
+    def __init__(self, max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0, timeout=60.0, max_retries=0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._openai_clients = {}  # (api_key, base_url) -> (OpenAI, AsyncOpenAI)
+        self._chat_models = {}  # (model, temperature, api_key, base_url) -> ChatOpenAI
+        self._lock = threading.Lock()
+
+    def _limits(self):
+        import httpx
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def _openai_client(self, api_key, base_url):
+        key = (api_key, base_url)
+        if key not in self._openai_clients:
+            import httpx
+            import openai
+            self._openai_clients[key] = (
+                openai.OpenAI(
+                    api_key=api_key, base_url=base_url, timeout=self.timeout, max_retries=self.max_retries,
+                    http_client=httpx.Client(limits=self._limits(), timeout=self.timeout),
+                ),
+                openai.AsyncOpenAI(
+                    api_key=api_key, base_url=base_url, timeout=self.timeout, max_retries=self.max_retries,
+                    http_client=httpx.AsyncClient(limits=self._limits(), timeout=self.timeout),
+                ),
+            )
+        return self._openai_clients[key]
+
+    def get(self, model, temperature, api_key=None, base_url=None):
+        """
+        Return the shared chat model client for a model and temperature
+
+        Args:
+            model (str): Model name, e.g. "gpt-4-turbo"
+            temperature (float): Sampling temperature
+            api_key (str): Defaults to OPENAI_API_KEY
+            base_url (str): Defaults to OPENAI_API_BASE (the OpenAI API when unset)
+
+        Returns:
+            ChatOpenAI: Client shared by every bot asking for the same settings
+        """
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        base_url = base_url or os.environ.get("OPENAI_API_BASE") or None
+        key = (model, float(temperature), api_key, base_url)
+        with self._lock:
+            if key not in self._chat_models:
+                from langchain_community.chat_models import ChatOpenAI
+                sync_client, async_client = self._openai_client(api_key, base_url)
+                self._chat_models[key] = ChatOpenAI(
+                    model_name=model,
+                    temperature=temperature,
+                    openai_api_key=api_key,
+                    openai_api_base=base_url,
+                    client=sync_client.chat.completions,
+                    async_client=async_client.chat.completions,
+                )
+            return self._chat_models[key]
+
+    def stats(self):
+        """Number of chat model clients and of HTTP connection pools"""
+        with self._lock:
+            return {"clients": len(self._chat_models), "pools": len(self._openai_clients)}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry():
+    """Return the process-wide LLMClientRegistry, configured from the environment"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "10")),
+                keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60")),
+                timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "60")),
+            )
+        return _registry
+
+
+def get_llm_client(model, temperature):
+    """Shortcut for get_llm_registry().get(model, temperature)"""
+    return get_llm_registry().get(model, temperature)
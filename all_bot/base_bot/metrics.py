@@ -0,0 +1,243 @@
+import bisect
+import contextlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COUNTERS = {
+    "messages_seen": "Messages received from the server",
+    "messages_matched": "Messages the bot decided to answer",
+    "replies_sent": "Replies sent",
+    "reply_errors": "Replies that failed or carry an error text",
+    "cache_hits": "LLM answers served from the answer caches",
+    "cache_misses": "Answer cache lookups that missed",
+    "llm_requests": "Requests sent to the LLM API",
+    "llm_errors": "LLM API requests that failed",
+}
+
+STAGES = {
+    "queue": "waiting in the bot's work queue",
+    "claim": "deciding which replica answers",
+    "extract": "looking for a [json] block",
+    "generate": "generate_response, until the whole reply text is ready",
+    "first_text": "generate_response, until the first streamed text",
+    "pace": "pacing delay left once the reply was ready",
+    "emit": "sending the reply over the socket",
+    "reply": "respond_to_message end to end",
+    "llm": "one LLM API request",
+}
+
+PREFIX = "smarthub_bot"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative, total = [], 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return {"buckets": list(self.buckets), "cumulative": cumulative, "sum": self.sum, "count": self.count}
+
+
+class BotMetrics:
+    """
+    Counters and per-stage latency histograms of one bot.
+
+    Safe to update from any thread: the socket.io thread counts incoming
+    messages, the event loop times the reply pipeline.
+    """
+
+    def __init__(self, bot_id, name=None):
+        self.labels = {"bot_id": bot_id, "bot": name or bot_id}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        """Time the enclosed block into the stage's histogram"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def gauge(self, name, read):
+        """Report read() as a gauge each time the metrics are collected"""
+        self._gauges[name] = read
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: labels, counters, gauges, and histograms by stage (plain
+                data, so it can be sent between processes)
+        """
+        gauges = {}
+        for name, read in list(self._gauges.items()):
+            try:
+                gauges[name] = float(read())
+            except Exception:
+                continue
+        with self._lock:
+            return {
+                "labels": dict(self.labels),
+                "counters": dict(self.counters),
+                "gauges": gauges,
+                "histograms": {stage: histogram.snapshot() for stage, histogram in self.histograms.items()},
+            }
+
+
+class MetricsRegistry:
+    """Every bot's metrics in this process"""
+
+    def __init__(self):
+        self._bots = {}
+        self._lock = threading.Lock()
+
+    def bot(self, bot_id, name=None):
+        """Return the metrics of a bot, creating them on first use"""
+        with self._lock:
+            if bot_id not in self._bots:
+                self._bots[bot_id] = BotMetrics(bot_id, name)
+            return self._bots[bot_id]
+
+    def snapshot(self):
+        with self._lock:
+            bots = list(self._bots.values())
+        return [metrics.snapshot() for metrics in bots]
+
+
+def _labels(labels, **extra):
+    items = {**labels, **extra}
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in items.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(items, escaped)) + "}"
+
+
+def render_prometheus(snapshots):
+    """
+    Render bot metric snapshots in the Prometheus text exposition format
+
+    Args:
+        snapshots (list): BotMetrics.snapshot() dicts
+
+    Returns:
+        str: The exposition text
+    """
+    families = {}  # metric name -> (type, help, [lines])
+
+    def add(name, kind, help_text, line):
+        families.setdefault(name, (kind, help_text, []))[2].append(line)
+
+    for snapshot in snapshots:
+        labels = snapshot["labels"]
+        for counter, value in snapshot["counters"].items():
+            name = f"{PREFIX}_{counter}_total"
+            add(name, "counter", COUNTERS.get(counter, counter), f"{name}{_labels(labels)} {value}")
+        for gauge, value in snapshot["gauges"].items():
+            name = f"{PREFIX}_{gauge}"
+            add(name, "gauge", gauge.replace("_", " "), f"{name}{_labels(labels)} {value:g}")
+        name = f"{PREFIX}_stage_seconds"
+        help_text = "Time spent per reply pipeline stage: " + "; ".join(f"{stage}: {text}" for stage, text in STAGES.items())
+        for stage, histogram in snapshot["histograms"].items():
+            for bound, count in zip(histogram["buckets"] + ["+Inf"], histogram["cumulative"]):
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                add(name, "histogram", help_text, f"{name}_bucket{_labels(labels, stage=stage, le=le)} {count}")
+            add(name, "histogram", help_text, f"{name}_sum{_labels(labels, stage=stage)} {histogram['sum']:.6f}")
+            add(name, "histogram", help_text, f"{name}_count{_labels(labels, stage=stage)} {histogram['count']}")
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving GET /metrics for Prometheus, from a daemon
+    thread
+
+    Args:
+        collect (function): Returns the exposition text on each scrape
+        host (str): Interface to bind (loopback by default)
+        port (int): Port to listen on (0 picks a free one)
+    """
+
+    def __init__(self, collect, host="127.0.0.1", port=9464):
+        self.collect = collect
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                try:
+                    body = server.collect().encode("utf-8")
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood the console
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.address = self._httpd.server_address
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry():
+    """Return the process-wide MetricsRegistry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
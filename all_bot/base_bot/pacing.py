@@ -0,0 +1,65 @@
+import asyncio
+import random
+import time
+
+
+class NoPacing:
+    """Send replies as soon as they are ready"""
+
+    def begin(self, message):
+        return self
+
+    async def wait(self):
+        pass
+
+
+class _Deadline:
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    async def wait(self):
+        remaining = self.deadline - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+
+class HumanlikePacing:
+    """
+    Make replies look typed: a reply is not sent sooner than a random
+    min_delay..max_delay seconds after the bot starts working on the
+    message (begin() is called once it leaves the work queue, so time spent
+    queued is not counted). The delay runs while the reply is generated, so
+    it only adds latency when generation is faster than the drawn delay.
+    """
+
+    def __init__(self, min_delay=1.0, max_delay=3.0):
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+
+    def begin(self, message):
+        """
+        Start pacing the reply to a message
+
+        Args:
+            message (dict): Message being answered
+
+        Returns:
+            Object whose async wait() returns once the reply may be sent
+        """
+        return _Deadline(time.monotonic() + random.uniform(self.min_delay, self.max_delay))
+
+
+def make_pacing(mode, min_delay=1.0, max_delay=3.0):
+    """
+    Build a pacing policy from its configuration name
+
+    Args:
+        mode (str): "none" or "humanlike"
+        min_delay (float): Shortest humanlike delay in seconds
+        max_delay (float): Longest humanlike delay in seconds
+    """
+    if mode in ("none", "", None):
+        return NoPacing()
+    if mode == "humanlike":
+        return HumanlikePacing(min_delay, max_delay)
+    raise ValueError(f"Unknown pacing mode: {mode}")
@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Bucket refilled continuously at per_minute units per minute, holding at most one minute's worth"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount):
+        """Seconds until amount units are available (0 if they are now)"""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for one API key and
+    model, shared by every bot in the process.
+
+    Callers wait in line instead of failing; lower priority numbers go
+    first, callers with equal priority in arrival order. A 429 from the
+    API pauses the whole line for the time the API asked for. Waiting
+    times are recorded for the metrics.
+
+    acquire() must be awaited on the event loop that runs the bots.
+    """
+
+    def __init__(self, rpm=0, tpm=0):
+        """
+        Args:
+            rpm (int): Requests per minute (0 = unlimited)
+            tpm (int): Tokens per minute (0 = unlimited)
+        """
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._waiters = []  # heap of (priority, seq, tokens, future)
+        self._seq = itertools.count()
+        self._timer = None
+        self._paused_until = 0.0
+        self._stats = {
+            "acquired": 0,
+            "waited": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+            "throttled": 0,
+            "retries": 0,
+        }
+
+    async def acquire(self, tokens=1, priority=5):
+        """
+        Wait until a request of about `tokens` tokens may be sent
+
+        Args:
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower goes first
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), tokens, future))
+        self._dispatch()
+        await future
+        waited = time.monotonic() - started
+        self._stats["acquired"] += 1
+        self._stats["wait_total"] += waited
+        self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+        if waited > 0.001:
+            self._stats["waited"] += 1
+        return waited
+
+    def _dispatch(self):
+        now = time.monotonic()
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.refill(now)
+        while self._waiters:
+            priority, seq, tokens, future = self._waiters[0]
+            if future.done():
+                # The caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(
+                self._paused_until - now,
+                self.requests.delay(1) if self.requests else 0.0,
+                self.tokens.delay(tokens) if self.tokens else 0.0,
+            )
+            if delay > 0:
+                # Wake up when the first caller in line can go
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            if self.requests:
+                self.requests.level -= 1
+            if self.tokens:
+                self.tokens.level -= tokens
+            future.set_result(None)
+
+    def record_usage(self, estimated, actual):
+        """Correct the token bucket once a response reports its real token usage"""
+        if self.tokens is not None and actual:
+            self.tokens.level -= actual - estimated
+
+    def pause(self, seconds):
+        """Hold every waiting request for a while, e.g. after a 429"""
+        self._stats["throttled"] += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def count_retry(self):
+        self._stats["retries"] += 1
+
+    def stats(self):
+        """
+        Limiter counters
+
+        Returns:
+            dict: acquired, waited (requests that had to wait), waiting
+                (in line now), wait_mean and wait_max in seconds, throttled
+                (429s seen) and retries
+        """
+        snapshot = dict(self._stats)
+        snapshot["waiting"] = sum(1 for waiter in self._waiters if not waiter[3].done())
+        snapshot["wait_mean"] = snapshot.pop("wait_total") / snapshot["acquired"] if snapshot["acquired"] else 0.0
+        return snapshot
+
+
+def retry_status(error):
+    """HTTP status of an LLM API error if it is worth retrying (429 or 5xx), else None"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429 or (isinstance(status, int) and 500 <= status < 600):
+        return status
+    return None
+
+
+def retry_after(error):
+    """Seconds the API asked us to wait (Retry-After header), or None"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Full-jitter exponential backoff for a retry attempt (1, 2, ...)"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def estimate_tokens(prompt, completion_tokens=500):
+    """Rough token count of a request: about 4 characters per prompt token plus the expected completion"""
+    return len(prompt) // 4 + completion_tokens
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def process_share(limit, processes):
+    """One process's part of a per-minute limit split evenly across processes (0 stays unlimited)"""
+    if limit <= 0:
+        return limit
+    return max(1, limit // max(1, processes))
+
+
+def get_rate_limiter(api_key, model):
+    """
+    Return the process-wide limiter for an API key and model, configured
+    from the environment:
+
+        LLM_RPM: Requests per minute for the whole deployment (default 0,
+            unlimited)
+        LLM_TPM: Tokens per minute, estimated with estimate_tokens() before
+            a request and corrected from the usage it reports (default 0,
+            unlimited)
+        LLM_LIMIT_PROCESSES: Processes sharing those limits, each getting an
+            even share (agent_manager sets it when it starts worker
+            processes; default 1)
+
+    Set them to the account's limits for the model to queue requests
+    before the API answers 429.
+    """
+    key = (hashlib.sha256((api_key or "").encode("utf-8")).hexdigest(), model)
+    processes = int(os.getenv("LLM_LIMIT_PROCESSES", "1"))
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(
+                rpm=process_share(int(os.getenv("LLM_RPM", "0")), processes),
+                tpm=process_share(int(os.getenv("LLM_TPM", "0")), processes),
+            )
+        return _limiters[key]
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+
+def message_key(message):
+    """
+    Stable identifier of a chat message, the same for every replica that receives it
+
+    Args:
+        message (dict): Message object
+
+    Returns:
+        str: The server-assigned id, or a digest of the message fields
+    """
+    if message.get("id"):
+        return str(message["id"])
+    fields = "|".join(str(message.get(k, "")) for k in ("channelId", "senderId", "timestamp", "content"))
+    return hashlib.sha256(fields.encode("utf-8")).hexdigest()
+
+
+def rendezvous_owner(key, replica_count):
+    """
+    Pick the replica responsible for a key with rendezvous (highest random
+    weight) hashing. When the replica count changes, only the keys of the
+    added or removed replica move.
+
+    Args:
+        key (str): Message key
+        replica_count (int): Number of replicas
+
+    Returns:
+        int: Index of the owning replica
+    """
+    def weight(index):
+        return hashlib.blake2b(f"{key}:{index}".encode("utf-8"), digest_size=8).digest()
+    return max(range(replica_count), key=weight)
+
+
+def replica_identity(bot_id, replica_index):
+    """Unique name of one replica: bot id, replica index, host and process"""
+    return f"{bot_id}#{replica_index}@{socket.gethostname()}:{os.getpid()}"
+
+
+class HashAssignment:
+    """
+    Static work split: each replica handles the messages whose key hashes to
+    it. Needs no coordination, but a message owned by a replica that is down
+    goes unanswered until it is back.
+    """
+
+    def __init__(self, replica_index, replica_count):
+        self.replica_index = replica_index
+        self.replica_count = max(1, replica_count)
+
+    def owns(self, key):
+        return rendezvous_owner(key, self.replica_count) == self.replica_index
+
+
+class LocalCoordinator:
+    """
+    In-memory claim table. Grants each (bot, message) to the first replica
+    that asks; claims expire after ttl seconds. Covers replicas that share a
+    process, and stands in for the server when testing offline.
+    """
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._claims = {}  # (bot_id, message_key) -> (replica_id, expires_at)
+        self._lock = threading.Lock()
+
+    async def claim(self, bot_id, key, replica_id):
+        """
+        Try to take a message
+
+        Args:
+            bot_id (str): Bot the replicas belong to
+            key (str): Message key
+            replica_id (str): Replica asking for the message
+
+        Returns:
+            bool: True if this replica should handle the message
+        """
+        now = time.time()
+        with self._lock:
+            owner = self._claims.get((bot_id, key))
+            if owner is not None and owner[1] > now and owner[0] != replica_id:
+                return False
+            self._claims[(bot_id, key)] = (replica_id, now + self.ttl)
+            if len(self._claims) > 10000:
+                self._claims = {k: v for k, v in self._claims.items() if v[1] > now}
+            return True
+
+
+class SQLiteCoordinator:
+    """
+    Claim table in a SQLite file, for replicas in separate processes on one
+    host. The primary key makes the first INSERT win.
+    """
+
+    def __init__(self, db_path, ttl=600):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS claims ("
+            "bot_id TEXT, message_key TEXT, replica_id TEXT, expires_at REAL, "
+            "PRIMARY KEY (bot_id, message_key))"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _claim(self, bot_id, key, replica_id):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "DELETE FROM claims WHERE bot_id = ? AND message_key = ? AND expires_at <= ?",
+                    (bot_id, key, now),
+                )
+                self._db.execute(
+                    "INSERT OR IGNORE INTO claims (bot_id, message_key, replica_id, expires_at) VALUES (?, ?, ?, ?)",
+                    (bot_id, key, replica_id, now + self.ttl),
+                )
+                owner = self._db.execute(
+                    "SELECT replica_id FROM claims WHERE bot_id = ? AND message_key = ?", (bot_id, key)
+                ).fetchone()[0]
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._db.execute("DELETE FROM claims WHERE expires_at <= ?", (now,))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return owner == replica_id
+
+    async def claim(self, bot_id, key, replica_id):
+        """Try to take a message (see LocalCoordinator.claim)"""
+        return await asyncio.to_thread(self._claim, bot_id, key, replica_id)
+
+
+class ServerCoordinator:
+    """
+    Claims messages through the chat server's 'claim_message' event, so
+    replicas on any host agree. When the server does not answer in time the
+    static hash split decides instead.
+    """
+
+    def __init__(self, bot, timeout=2):
+        self.bot = bot
+        self.timeout = timeout
+
+    async def claim(self, bot_id, key, replica_id):
+        """Try to take a message (see LocalCoordinator.claim)"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def set_granted(data):
+            if not granted.done():
+                granted.set_result(bool((data or {}).get("granted")))
+
+        def on_ack(data=None):
+            loop.call_soon_threadsafe(set_granted, data)
+
+        await self.bot.socket_emit_async("claim_message", {
+            "botId": bot_id,
+            "messageId": key,
+            "replicaId": replica_id
+        }, callback=on_ack)
+        try:
+            return await asyncio.wait_for(granted, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return self.bot.replica_assignment.owns(key)
+
+
+_local_coordinator = None
+_local_coordinator_lock = threading.Lock()
+
+
+def get_local_coordinator():
+    """Return the process-wide LocalCoordinator"""
+    global _local_coordinator
+    with _local_coordinator_lock:
+        if _local_coordinator is None:
+            _local_coordinator = LocalCoordinator()
+        return _local_coordinator
+
+
+def make_coordinator(spec, bot):
+    """
+    Build a claim coordinator from its configuration string
+
+    Args:
+        spec (str): "server", "local" or "sqlite:<path>"
+        bot (BaseBot): Bot whose connection the server coordinator uses
+
+    Returns:
+        Coordinator with an async claim(bot_id, key, replica_id) method
+    """
+    if spec == "local":
+        return get_local_coordinator()
+    if spec.startswith("sqlite:"):
+        return SQLiteCoordinator(spec[len("sqlite:"):])
+    if spec == "server":
+        return ServerCoordinator(bot)
+    raise ValueError(f"Unknown replica coordinator: {spec}")
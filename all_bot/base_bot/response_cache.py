@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """Lower-case and collapse whitespace so trivially different prompts share an entry"""
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+class ResponseCache:
+    """
+    Cache of LLM answers keyed on bot id plus normalized prompt.
+
+    Entries live in an in-memory LRU tier and, when db_path is set, in a
+    SQLite tier that survives restarts. Every entry carries its own expiry,
+    so each bot can use a different TTL.
+
+    Writes to the SQLite tier go through one writer thread, which commits
+    whatever queued up in a single transaction; set() and clear() never
+    wait for the disk. Coroutines read through aget(), which looks in the
+    memory tier inline and in SQLite from a worker thread.
+    """
+
+    def __init__(self, max_entries=1000, db_path=None, max_db_entries=10000):
+        self.max_entries = max_entries
+        self.max_db_entries = max_db_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+        self._counters = {}  # bot_id -> {"hits": n, "misses": n}
+        self._evictions = 0
+        self._db = None
+        self._db_writes = 0
+        self._writes = None  # (sql, params) waiting for the writer thread
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, bot_id TEXT, response TEXT, expires_at REAL, created_at REAL)"
+            )
+            self._db.commit()
+            self._writes = queue.Queue()
+            threading.Thread(target=self._write_db, name="response-cache-writer", daemon=True).start()
+
+    @staticmethod
+    def make_key(bot_id, prompt):
+        digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"{bot_id}:{digest}"
+
+    def get(self, bot_id, prompt):
+        """
+        Look up a cached answer
+
+        Args:
+            bot_id (str): Bot the answer belongs to
+            prompt (str): Prompt that produced it
+
+        Returns:
+            str: The cached answer, or None on a miss
+        """
+        key = self.make_key(bot_id, prompt)
+        now = time.time()
+        with self._lock:
+            response = self._get_memory(key, now)
+            if response is None and self._db is not None:
+                response = self._get_db(key, now)
+            self._count(bot_id, "hits" if response is not None else "misses")
+            return response
+
+    async def aget(self, bot_id, prompt):
+        """get() for coroutines: a miss in memory is looked up in SQLite off the event loop"""
+        if self._db is None:
+            return self.get(bot_id, prompt)
+        key = self.make_key(bot_id, prompt)
+        with self._lock:
+            response = self._get_memory(key, time.time())
+            if response is not None:
+                self._count(bot_id, "hits")
+                return response
+        return await asyncio.to_thread(self.get, bot_id, prompt)
+
+    def set(self, bot_id, prompt, response, ttl):
+        """
+        Store an answer
+
+        Args:
+            bot_id (str): Bot the answer belongs to
+            prompt (str): Prompt that produced it
+            response (str): The answer
+            ttl (float): Seconds the entry stays valid
+        """
+        if ttl <= 0:
+            return
+        key = self.make_key(bot_id, prompt)
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._put_memory(key, response, expires_at)
+            if self._db is not None:
+                self._writes.put((
+                    "INSERT OR REPLACE INTO responses (key, bot_id, response, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, bot_id, response, expires_at, now),
+                ))
+                self._db_writes += 1
+                if self._db_writes % 100 == 0:
+                    self._trim_db(now)
+
+    def _write_db(self):
+        while True:
+            statements = [self._writes.get()]
+            while True:
+                try:
+                    statements.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                try:
+                    for sql, params in statements:
+                        self._db.execute(sql, params)
+                    self._db.commit()
+                except sqlite3.Error:
+                    # A failed write only loses cache entries
+                    self._db.rollback()
+            for _ in statements:
+                self._writes.task_done()
+
+    def flush(self):
+        """Wait until every queued write has reached the SQLite tier"""
+        if self._writes is not None:
+            self._writes.join()
+
+    def _get_memory(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _put_memory(self, key, response, expires_at):
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _get_db(self, key, now):
+        row = self._db.execute(
+            "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        response, expires_at = row
+        if expires_at <= now:
+            self._writes.put(("DELETE FROM responses WHERE key = ? AND expires_at <= ?", (key, now)))
+            return None
+        # Promote to the memory tier
+        self._put_memory(key, response, expires_at)
+        return response
+
+    def _trim_db(self, now):
+        self._writes.put(("DELETE FROM responses WHERE expires_at <= ?", (now,)))
+        self._writes.put((
+            "DELETE FROM responses WHERE key NOT IN "
+            "(SELECT key FROM responses ORDER BY created_at DESC LIMIT ?)",
+            (self.max_db_entries,),
+        ))
+
+    def _count(self, bot_id, counter):
+        counters = self._counters.setdefault(bot_id, {"hits": 0, "misses": 0})
+        counters[counter] += 1
+
+    def clear(self, bot_id=None):
+        """Drop every entry, or only those of one bot"""
+        with self._lock:
+            if bot_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k.startswith(f"{bot_id}:")]:
+                    del self._entries[key]
+            if self._db is not None:
+                # Queued behind earlier writes, so none of them survives it
+                if bot_id is None:
+                    self._writes.put(("DELETE FROM responses", ()))
+                else:
+                    self._writes.put(("DELETE FROM responses WHERE bot_id = ?", (bot_id,)))
+
+    def stats(self, bot_id=None):
+        """
+        Hit/miss counters and sizes
+
+        Args:
+            bot_id (str): Limit the counters to one bot
+
+        Returns:
+            dict: hits, misses, hit_rate, entries, evictions (and db_entries
+                when the SQLite tier is enabled)
+        """
+        with self._lock:
+            if bot_id is None:
+                hits = sum(c["hits"] for c in self._counters.values())
+                misses = sum(c["misses"] for c in self._counters.values())
+            else:
+                counters = self._counters.get(bot_id, {"hits": 0, "misses": 0})
+                hits, misses = counters["hits"], counters["misses"]
+            snapshot = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "entries": len(self._entries),
+                "evictions": self._evictions,
+            }
+            if self._db is not None:
+                snapshot["db_entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return snapshot
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide ResponseCache, configured from the environment"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1000")),
+                db_path=os.getenv("RESPONSE_CACHE_DB") or None,
+                max_db_entries=int(os.getenv("RESPONSE_CACHE_DB_SIZE", "10000")),
+            )
+        return _response_cache
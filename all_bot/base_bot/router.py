@@ -0,0 +1,200 @@
+import re
+import threading
+from collections import OrderedDict
+
+
+class MentionIndex:
+    """
+    One compiled pattern over the mentions of every registered bot.
+
+    A single scan of the message text finds all mentioned bots, instead of
+    one substring test per bot. Matching is case-insensitive and, like the
+    bots' own checks, not limited to whole words: "@mathematics" mentions
+    "@math".
+    """
+
+    def __init__(self):
+        self._owners = {}  # lower-case mention -> set of bots
+        self._prefixes = {}  # mention -> shorter mentions it starts with
+        self._pattern = None
+
+    def add(self, mention, bot):
+        self._owners.setdefault(mention.lower(), set()).add(bot)
+        self._compile()
+
+    def remove_bot(self, bot):
+        for mention in list(self._owners):
+            self._owners[mention].discard(bot)
+            if not self._owners[mention]:
+                del self._owners[mention]
+        self._compile()
+
+    def _compile(self):
+        mentions = sorted(self._owners, key=len, reverse=True)
+        # The scan reports the longest mention at each position; remember the
+        # shorter ones it also contains ("@mathbot" also mentions "@math")
+        self._prefixes = {m: [p for p in mentions if p != m and m.startswith(p)] for m in mentions}
+        self._pattern = re.compile("|".join(re.escape(m) for m in mentions), re.IGNORECASE) if mentions else None
+
+    def match(self, text):
+        """
+        Bots mentioned in a text
+
+        Args:
+            text (str): Message content
+
+        Returns:
+            set: Mentioned bots
+        """
+        bots = set()
+        if self._pattern is None or not text:
+            return bots
+        for found in {m.lower() for m in self._pattern.findall(text)}:
+            bots |= self._owners[found]
+            for prefix in self._prefixes[found]:
+                bots |= self._owners[prefix]
+        return bots
+
+
+class MessageRouter:
+    """
+    In-process dispatcher for the bots of one agent_manager process.
+
+    Every attached bot hands its incoming messages to ingest(). Each message
+    is handled once: duplicates that arrive over several sockets are
+    dropped, the mention index picks the candidate bots in one scan, and
+    each candidate that accepts the message (should_respond_to) gets it in
+    its own queue via deliver(). Bots without declared mentions are asked
+    about every message.
+
+    The router also picks one listening bot per channel. The other bots
+    join it muted, so the server sends each channel message to the
+    process once instead of once per bot.
+    """
+
+    def __init__(self, dedupe_size=2000):
+        self.bots = []
+        self.index = MentionIndex()
+        self._unindexed = []  # bots that must see every message
+        self._seen = OrderedDict()
+        self._dedupe_size = dedupe_size
+        self._listeners = {}  # channel_id -> bot receiving the channel's messages
+        self._members = {}  # channel_id -> attached bots in the channel
+        self._lock = threading.RLock()
+        self.stats = {"ingested": 0, "duplicates": 0, "routed": 0, "delivered": 0}
+
+    def attach(self, bot):
+        """Route messages for a bot; its config["mentions"] go into the index"""
+        with self._lock:
+            self.bots.append(bot)
+            mentions = bot.config.get("mentions") or []
+            for mention in mentions:
+                self.index.add(mention, bot)
+            if not mentions:
+                self._unindexed.append(bot)
+            bot.router = self
+
+    def detach(self, bot):
+        with self._lock:
+            if bot in self.bots:
+                self.bots.remove(bot)
+            if bot in self._unindexed:
+                self._unindexed.remove(bot)
+            self.index.remove_bot(bot)
+            self.forget(bot)
+            bot.router = None
+
+    def ingest(self, message):
+        """
+        Route one incoming message to the bots that should answer it
+
+        Args:
+            message (dict): Message as received from the server
+
+        Returns:
+            list: Bots the message was delivered to
+        """
+        with self._lock:
+            key = message.get("id")
+            if key is not None:
+                if key in self._seen:
+                    self.stats["duplicates"] += 1
+                    return []
+                self._seen[key] = True
+                if len(self._seen) > self._dedupe_size:
+                    self._seen.popitem(last=False)
+            self.stats["ingested"] += 1
+            candidates = self.index.match(message.get("content", "")) | set(self._unindexed)
+            # Keep attach order so replies go out in a stable order
+            bots = list(self.bots)
+            candidates = [bot for bot in bots if bot in candidates]
+
+        sender_id = message.get("senderId")
+        for bot in bots:
+            if bot.config["bot_id"] != sender_id:
+                bot.metrics.count("messages_seen")
+        targets = [
+            bot for bot in candidates
+            if bot.config["bot_id"] != sender_id and bot.should_respond_to(message)
+        ]
+        if targets:
+            self.stats["routed"] += 1
+            json_block = targets[0].extract_json_block(message.get("content") or "")
+            for bot in targets:
+                # Each bot gets its own copy; respond_to_message annotates it
+                copy = dict(message)
+                if json_block:
+                    copy["json"] = json_block
+                bot.deliver(copy)
+            self.stats["delivered"] += len(targets)
+        return targets
+
+    def should_listen(self, bot, channel_id):
+        """
+        Record that a bot joins a channel and decide whether it receives the
+        channel's messages itself
+
+        Returns:
+            bool: True if the bot should join listening, False to join muted
+        """
+        with self._lock:
+            self._members.setdefault(channel_id, set()).add(bot)
+            listener = self._listeners.get(channel_id)
+            if listener is None or listener is bot or not listener.state["is_connected"]:
+                self._listeners[channel_id] = bot
+                return True
+            return False
+
+    def leave(self, bot, channel_id):
+        """Record that a bot left a channel, handing its listening role to another member"""
+        with self._lock:
+            self._members.get(channel_id, set()).discard(bot)
+            if self._listeners.get(channel_id) is bot:
+                self._reassign(channel_id)
+
+    def forget(self, bot):
+        """Drop a bot from every channel, e.g. after it disconnected"""
+        with self._lock:
+            for channel_id in list(self._members):
+                self._members[channel_id].discard(bot)
+            for channel_id, listener in list(self._listeners.items()):
+                if listener is bot:
+                    self._reassign(channel_id)
+
+    def _reassign(self, channel_id):
+        del self._listeners[channel_id]
+        for member in self._members.get(channel_id, ()):
+            if member.state["is_connected"] and not member._exit_flag.is_set():
+                self._listeners[channel_id] = member
+                member.listen_to_channel(channel_id)
+                return
+
+    def set_channel_state(self, channel_id, active):
+        """Share a channel's active state with every attached bot, muted ones included"""
+        for bot in list(self.bots):
+            bot.state["channel_states"][channel_id] = active
+
+    def listeners(self):
+        """Channel id -> name of the bot receiving that channel's messages"""
+        with self._lock:
+            return {channel_id: bot.config["bot_name"] for channel_id, bot in self._listeners.items()}
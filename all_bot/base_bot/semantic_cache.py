@@ -0,0 +1,249 @@
+import itertools
+import math
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Words that carry no meaning for matching questions against each other
+STOPWORDS = frozenset("""
+a an and are as at be can could do does for from give how i in is it me my of on or
+please show tell that the to what whats which who why with would you your
+""".split())
+
+
+# Rows sharing a query's rarest term that are checked besides the best
+# cosine matches
+TERM_CANDIDATES = 32
+
+
+def content_words(text):
+    """
+    The words of a question that carry its meaning, in order: no mentions
+    or stopwords, plural "s" dropped
+    """
+    words = (w for w in re.findall(r"[@\w']+", text.lower()) if not w.startswith("@") and w not in STOPWORDS)
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+
+
+def content_terms(text):
+    """content_words of a question as a set"""
+    return frozenset(content_words(text))
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedder: hashes word unigrams, bigrams and
+    character trigrams into a fixed-size, L2-normalized vector.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def tokens(self, text):
+        words = content_words(text)
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"<{word}>"
+            features += [f"#{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self.tokens(text):
+            # Character trigrams only nudge the match; whole words dominate
+            weight = 0.25 if feature.startswith("#") else 1.0
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dim] += weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    """Embedder backed by a local sentence-transformers model (CPU)"""
+
+    def __init__(self, model_name):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("SEMANTIC_CACHE_MODEL requires the sentence-transformers package") from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, text):
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+class SemanticCache:
+    """
+    Near-duplicate answer cache.
+
+    Questions are embedded and kept as rows of one preallocated float32
+    matrix; a lookup is a single matrix-vector product followed by a cosine
+    threshold. When the matrix is full, expired rows are reused first, then
+    the least recently used one.
+
+    Cosine alone can't tell "chicken curry" from a cached "chicken soup",
+    so a hit also needs its content_terms to overlap the cached question's
+    by at least term_overlap, with words weighted by how rare they are
+    among the cached questions (squared inverse document frequency). Words most questions share ("recipe",
+    "make") count for little and the ones that name the subject ("butter",
+    "curry") for a lot: "how do I make butter chicken" still finds "butter
+    chicken recipe please". 0 turns the check off, 1 needs the same terms.
+    A common modifier still slips through: "vegan chocolate cake recipe"
+    finds "chocolate cake recipe" when many cached questions say "vegan".
+
+    Every lookup scans all `capacity` rows (about 13 ms at 100k rows of 256
+    dimensions), so it should run off the event loop.
+    """
+
+    def __init__(self, embedder=None, capacity=10000, term_overlap=0.75):
+        self.embedder = embedder or HashingEmbedder()
+        self.capacity = capacity
+        self.term_overlap = term_overlap
+        self._vectors = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        self._bot_codes = np.full(capacity, -1, dtype=np.int32)
+        self._expires_at = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._answers = [None] * capacity
+        self._terms = [None] * capacity
+        self._rows_by_term = {}  # term -> rows of the cached questions holding it
+        self._size = 0
+        self._bot_ids = {}  # bot_id -> code
+        self._counters = {}  # bot_id -> {"hits": n, "misses": n}
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def _bot_code(self, bot_id):
+        return self._bot_ids.setdefault(bot_id, len(self._bot_ids))
+
+    def _overlap(self, terms, cached_terms):
+        # Weighted Jaccard of two term sets, each term weighted by its
+        # inverse document frequency among the cached questions
+        if terms == cached_terms:
+            return 1.0
+        rows_by_term = self._rows_by_term
+        rows = self._size + 1
+
+        def weight(term):
+            return math.log(rows / (len(rows_by_term.get(term, ())) + 0.5)) ** 2
+
+        shared = sum(weight(term) for term in terms & cached_terms)
+        total = sum(weight(term) for term in terms | cached_terms)
+        return shared / total if total > 0 else 0.0
+
+    def get(self, bot_id, query, threshold):
+        """
+        Find the answer to the most similar cached question
+
+        Args:
+            bot_id (str): Bot the answer belongs to
+            query (str): The user's question
+            threshold (float): Minimum cosine similarity for a hit
+
+        Returns:
+            str: The cached answer, or None on a miss
+        """
+        vector = self.embedder.embed(query)
+        terms = content_terms(query)
+        now = time.time()
+        with self._lock:
+            answer = None
+            if self._size and vector.any():
+                scores = self._vectors[:self._size] @ vector
+                valid = (self._bot_codes[:self._size] == self._bot_ids.get(bot_id, -2)) & (self._expires_at[:self._size] > now)
+                scores[~valid] = -1.0
+                # Candidates: the best few by cosine, and some questions sharing
+                # the query's rarest term, which a cosine over common words
+                # ("how do I make ...") can rank far down. Highest score
+                # first, the first one over the threshold whose terms overlap
+                # enough is the hit
+                top = min(8, len(scores))
+                candidates = set(np.argpartition(scores, len(scores) - top)[-top:].tolist())
+                if self.term_overlap:
+                    posted = [self._rows_by_term[term] for term in terms if term in self._rows_by_term]
+                    if posted:
+                        candidates.update(itertools.islice(min(posted, key=len), TERM_CANDIDATES))
+                for best in sorted(candidates, key=scores.__getitem__, reverse=True):
+                    if scores[best] < threshold:
+                        break
+                    if not self.term_overlap or self._overlap(terms, self._terms[best]) >= self.term_overlap:
+                        self._last_used[best] = now
+                        answer = self._answers[best]
+                        break
+            counters = self._counters.setdefault(bot_id, {"hits": 0, "misses": 0})
+            counters["hits" if answer is not None else "misses"] += 1
+            return answer
+
+    def set(self, bot_id, query, answer, ttl):
+        """
+        Store the answer to a question
+
+        Args:
+            bot_id (str): Bot the answer belongs to
+            query (str): The user's question
+            answer (str): The answer
+            ttl (float): Seconds the entry stays valid
+        """
+        vector = self.embedder.embed(query)
+        if ttl <= 0 or not vector.any():
+            return
+        now = time.time()
+        with self._lock:
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._expires_at <= now)
+                slot = int(expired[0]) if len(expired) else int(np.argmin(self._last_used))
+                self._evictions += 1
+            self._vectors[slot] = vector
+            self._bot_codes[slot] = self._bot_code(bot_id)
+            self._expires_at[slot] = now + ttl
+            self._last_used[slot] = now
+            self._answers[slot] = answer
+            for term in self._terms[slot] or ():
+                self._rows_by_term[term].discard(slot)
+                if not self._rows_by_term[term]:
+                    del self._rows_by_term[term]
+            self._terms[slot] = content_terms(query)
+            for term in self._terms[slot]:
+                self._rows_by_term.setdefault(term, set()).add(slot)
+
+    def stats(self, bot_id=None):
+        """Hit/miss counters, entry count and evictions"""
+        with self._lock:
+            counters = list(self._counters.values()) if bot_id is None else [self._counters.get(bot_id, {"hits": 0, "misses": 0})]
+            hits = sum(c["hits"] for c in counters)
+            misses = sum(c["misses"] for c in counters)
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "entries": self._size,
+                "evictions": self._evictions,
+            }
+
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """
+    Return the process-wide SemanticCache, configured from the environment
+    """
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            model_name = os.getenv("SEMANTIC_CACHE_MODEL")
+            embedder = SentenceTransformerEmbedder(model_name) if model_name else HashingEmbedder(int(os.getenv("SEMANTIC_CACHE_DIM", "256")))
+            _semantic_cache = SemanticCache(
+                embedder,
+                capacity=int(os.getenv("SEMANTIC_CACHE_SIZE", "10000")),
+                term_overlap=float(os.getenv("SEMANTIC_CACHE_TERM_OVERLAP", "0.75")),
+            )
+        return _semantic_cache
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+
+class _StreamFlight:
+    """One in-flight streamed completion, replayed to every caller that joins it"""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def run(self, chunks):
+        try:
+            async for chunk in chunks:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    async def follow(self):
+        i = 0
+        while True:
+            while i < len(self.chunks):
+                yield self.chunks[i]
+                i += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class SingleFlight:
+    """
+    Request coalescing for identical LLM calls.
+
+    While a call for a key is in flight, further callers with the same key
+    wait for it and share its result instead of sending their own request.
+    Streamed calls are shared the same way: a caller that joins late gets
+    the chunks received so far, then the rest as they arrive.
+
+    Must be used from a single event loop (the bots' shared loop).
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> asyncio.Future
+        self._streams = {}  # key -> _StreamFlight
+        self._stats = {"upstream": 0, "saved": 0}
+
+    async def do(self, key, call):
+        """
+        Run call() once for every concurrent caller with the same key
+
+        Args:
+            key: Hashable identity of the request
+            call (coroutine function): Makes the upstream request
+
+        Returns:
+            The call's result (errors are raised to every caller)
+        """
+        future = self._calls.get(key)
+        if future is None:
+            self._stats["upstream"] += 1
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._calls.pop(key, None) if self._calls.get(key) is done else None)
+        else:
+            self._stats["saved"] += 1
+        # A cancelled caller must not cancel the request the others wait for
+        return await asyncio.shield(future)
+
+    async def stream(self, key, call):
+        """
+        Stream call() once for every concurrent caller with the same key
+
+        Args:
+            key: Hashable identity of the request
+            call (async generator function): Streams the upstream response
+
+        Yields:
+            The streamed chunks
+        """
+        flight = self._streams.get(key)
+        if flight is None:
+            self._stats["upstream"] += 1
+            flight = _StreamFlight()
+            self._streams[key] = flight
+            task = asyncio.ensure_future(flight.run(call()))
+            task.add_done_callback(lambda _: self._streams.pop(key, None) if self._streams.get(key) is flight else None)
+        else:
+            self._stats["saved"] += 1
+        async for chunk in flight.follow():
+            yield chunk
+
+    def stats(self):
+        """
+        Returns:
+            dict: upstream (requests sent), saved (requests avoided by
+                sharing one in flight) and in_flight
+        """
+        snapshot = dict(self._stats)
+        snapshot["in_flight"] = len(self._calls) + len(self._streams)
+        return snapshot
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the process-wide SingleFlight"""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
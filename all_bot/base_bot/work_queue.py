@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import deque
+
+OVERLOAD_POLICIES = ("drop_oldest", "reject", "coalesce")
+
+
+class WorkQueue:
+    """
+    Bounded queue of messages waiting for a bot's reply, drained by a fixed
+    number of worker tasks on the shared event loop.
+
+    When the queue is full the overload policy decides what gives way:
+      - drop_oldest: the longest-waiting message is discarded
+      - reject: the new message is answered with a short "busy" reply
+      - coalesce: a sender's new message replaces the one they already
+        have waiting in the same channel (the oldest message is dropped if
+        they have none). Coalescing applies before the queue is full too,
+        so one sender can't fill the queue with repeats.
+
+    All methods except stats() must be called on the event loop thread.
+    """
+
+    def __init__(self, handler, max_size=100, workers=4, policy="drop_oldest", on_reject=None, on_wait=None):
+        """
+        Args:
+            handler (coroutine function): Called with each message
+            max_size (int): Messages that may wait at once
+            workers (int): Messages handled concurrently
+            policy (str): One of OVERLOAD_POLICIES
+            on_reject (callable): Called with a message the reject policy turned away
+            on_wait (callable): Called with the seconds each message waited
+        """
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.handler = handler
+        self.max_size = max(1, max_size)
+        self.workers = max(1, workers)
+        self.policy = policy
+        self.on_reject = on_reject
+        self.on_wait = on_wait
+        self._items = deque()  # (message, enqueued_at)
+        self._ready = None
+        self._tasks = []
+        self._stats = {
+            "enqueued": 0,
+            "processed": 0,
+            "active": 0,
+            "max_depth": 0,
+            "dropped_oldest": 0,
+            "rejected": 0,
+            "coalesced": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    def put(self, message):
+        """
+        Queue a message, applying the overload policy
+
+        Returns:
+            bool: False if the message was turned away
+        """
+        if self._ready is None:
+            self._ready = asyncio.Semaphore(0)
+            self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+        now = time.monotonic()
+        if self.policy == "coalesce":
+            for i, (waiting, _) in enumerate(self._items):
+                if waiting.get("senderId") == message.get("senderId") and waiting.get("channelId") == message.get("channelId"):
+                    # Keep the waiting message's place in line
+                    self._items[i] = (message, self._items[i][1])
+                    self._stats["coalesced"] += 1
+                    return True
+        if len(self._items) >= self.max_size:
+            if self.policy == "reject":
+                self._stats["rejected"] += 1
+                if self.on_reject is not None:
+                    self.on_reject(message)
+                return False
+            self._items.popleft()
+            self._stats["dropped_oldest"] += 1
+        else:
+            self._ready.release()
+        self._items.append((message, now))
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], len(self._items))
+        return True
+
+    async def _work(self):
+        while True:
+            await self._ready.acquire()
+            if not self._items:
+                continue
+            message, enqueued_at = self._items.popleft()
+            waited = time.monotonic() - enqueued_at
+            self._stats["wait_total"] += waited
+            self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+            if self.on_wait is not None:
+                self.on_wait(waited)
+            self._stats["active"] += 1
+            try:
+                await self.handler(message)
+            except Exception:
+                pass  # the handler reports its own errors
+            finally:
+                self._stats["active"] -= 1
+                self._stats["processed"] += 1
+
+    def stats(self):
+        """
+        Queue counters
+
+        Returns:
+            dict: depth, max_depth, active, enqueued, processed, the shed
+                counters (dropped_oldest, rejected, coalesced, shed) and
+                the mean and max wait in seconds
+        """
+        snapshot = dict(self._stats)
+        snapshot["depth"] = len(self._items)
+        snapshot["shed"] = snapshot["dropped_oldest"] + snapshot["rejected"] + snapshot["coalesced"]
+        processed = snapshot["processed"] + snapshot["active"]
+        snapshot["wait_mean"] = snapshot.pop("wait_total") / processed if processed else 0.0
+        snapshot.update(max_size=self.max_size, workers=self.workers, policy=self.policy)
+        return snapshot
+
+    def cancel(self):
+        """Stop the workers and forget waiting messages"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._items.clear()
+        self._ready = None
@@ -0,0 +1,28 @@
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+
+BOT_TYPE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bot_type'))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+
+def load_module(module_name):
+    """Execute a bot module from bot_type and return its bot class"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(BOT_TYPE_DIR, f"{module_name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return next(getattr(module, name) for name in dir(module) if name.endswith('Bot') and name != 'BaseBot')
+
+
+def load_bot(module_name, options=None):
+    """Load a bot class from bot_type and build an instance with console output muted"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = load_module(module_name)(options)
+    # Keep the benchmark output readable
+    bot.print_message = lambda message, **kwargs: None
+    bot.display_prompt = lambda: None
+    return bot
@@ -0,0 +1,94 @@
+"""
+MathCalcyBot expression evaluation: the old parse-and-walk safe_eval vs
+the compiled expression cache (math_engine.expression).
+
+Times repeated evaluation of a few typical expressions (the steady state of
+a busy channel, served from the cache), a cold compile, and one expression
+evaluated over many variable bindings with batch().
+
+Usage: python all_bot/benchmarks/expression_eval.py [--repeat 20000] [--rows 100000]
+"""
+import argparse
+import ast
+import math
+import random
+import time
+
+import bench_utils  # noqa: F401 (puts all_bot on the path)
+from math_engine.expression import CompiledExpression, compile_expression
+
+EXPRESSIONS = ["2 + 2", "(3.5 * 4 - 1) / 7", "sqrt(16) + sin(0.5) ** 2", "round(log(1000, 10) * pi, 3) % 2"]
+
+
+def old_safe_eval(expr, bindings=None):
+    # What MathCalcyBot.safe_eval used to do, with variables added for batch
+    allowed_names = {k: v for k, v in math.__dict__.items() if not k.startswith("__")}
+    allowed_names["abs"] = abs
+    allowed_names["round"] = round
+    allowed_names.update(bindings or {})
+    node = ast.parse(expr, mode='eval')
+
+    def _eval(node):
+        if isinstance(node, ast.Expression):
+            return _eval(node.body)
+        elif isinstance(node, ast.BinOp):
+            left = _eval(node.left)
+            right = _eval(node.right)
+            if isinstance(node.op, ast.Add): return left + right
+            if isinstance(node.op, ast.Sub): return left - right
+            if isinstance(node.op, ast.Mult): return left * right
+            if isinstance(node.op, ast.Div): return left / right
+            if isinstance(node.op, ast.Pow): return left ** right
+            if isinstance(node.op, ast.Mod): return left % right
+            raise ValueError("Unsupported operator")
+        elif isinstance(node, ast.UnaryOp):
+            operand = _eval(node.operand)
+            if isinstance(node.op, ast.UAdd): return +operand
+            if isinstance(node.op, ast.USub): return -operand
+            raise ValueError("Unsupported unary operator")
+        elif isinstance(node, ast.Constant):
+            return node.value
+        elif isinstance(node, ast.Call):
+            return allowed_names[node.func.id](*[_eval(arg) for arg in node.args])
+        elif isinstance(node, ast.Name):
+            return allowed_names[node.id]
+        raise ValueError("Unsupported expression")
+    return _eval(node)
+
+
+def per_call(repeat, function, *args):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(*args)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'expression':<36}{'old us':>8}{'cached us':>11}{'cold us':>9}{'speedup':>9}")
+    for expr in EXPRESSIONS:
+        assert old_safe_eval(expr) == compile_expression(expr)()
+        old = per_call(args.repeat, old_safe_eval, expr)
+        cached = per_call(args.repeat, lambda: compile_expression(expr)())
+        cold = per_call(max(1, args.repeat // 10), CompiledExpression, expr)
+        print(f"{expr:<36}{old * 1e6:>8.2f}{cached * 1e6:>11.2f}{cold * 1e6:>9.2f}{old / cached:>8.1f}x")
+
+    expr = "a * x ** 2 + b * x + sqrt(abs(x))"
+    columns = {name: [random.uniform(-10, 10) for _ in range(args.rows)] for name in ("a", "b", "x")}
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    started = time.perf_counter()
+    expected = [old_safe_eval(expr, row) for row in rows]
+    old = time.perf_counter() - started
+    started = time.perf_counter()
+    got = compile_expression(expr, ("a", "b", "x")).batch(columns)
+    batched = time.perf_counter() - started
+    assert got == expected
+    print(f"\nbatch of {args.rows} bindings: old {old * 1000:.1f} ms, batch() {batched * 1000:.1f} ms ({old / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
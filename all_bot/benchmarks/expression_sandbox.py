@@ -0,0 +1,75 @@
+"""
+Hostile expressions against the MathCalcyBot sandbox (math_engine.sandbox).
+
+First times how fast the static limits reject expressions that used to pin
+a core (9**9**9, factorial(10**7), ...). Then turns the static limits off
+and sends the same expressions to a worker pool while another thread keeps
+evaluating ordinary expressions, to show the wall-clock budget killing the
+runaway workers without stalling the ordinary ones.
+
+Usage: python all_bot/benchmarks/expression_sandbox.py [--workers 2] [--timeout 0.5]
+"""
+import argparse
+import os
+import threading
+import time
+
+import bench_utils  # noqa: F401 (puts all_bot on the path)
+
+HOSTILE = ["9**9**9", "factorial(10**7)", "comb(10**7, 5*10**6)", "perm(10**6)", "(2**9000) * (2**9000)", "1" + "+1" * 500]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    from math_engine import expression
+    print(f"{'expression':<24}{'rejected in ms':>16}  error")
+    for text in HOSTILE:
+        started = time.perf_counter()
+        try:
+            expression.CompiledExpression(text)()
+            error = "(accepted)"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        print(f"{text[:22]:<24}{(time.perf_counter() - started) * 1000:>16.2f}  {error}")
+
+    # Without static limits, only the pool's wall-clock budget stands in the way
+    os.environ["MATH_MAX_INT_BITS"] = str(10 ** 12)
+    os.environ["MATH_MAX_NODES"] = str(10 ** 6)
+    expression.MAX_INT_BITS, expression.MAX_NODES = 10 ** 12, 10 ** 6
+    from math_engine.sandbox import EvaluationPool
+    pool = EvaluationPool(args.workers, args.timeout)
+
+    latencies = []
+    stop = threading.Event()
+
+    def ordinary():
+        while not stop.is_set():
+            started = time.perf_counter()
+            pool.evaluate("sqrt(16) + 2 * pi")
+            latencies.append(time.perf_counter() - started)
+
+    thread = threading.Thread(target=ordinary)
+    thread.start()
+    started = time.perf_counter()
+    for text in HOSTILE[:4]:
+        try:
+            pool.evaluate(text)
+        except TimeoutError:
+            pass
+    elapsed = time.perf_counter() - started
+    stop.set()
+    thread.join()
+    pool.close()
+
+    latencies.sort()
+    print(f"\npool: {len(HOSTILE[:4])} hostile expressions in {elapsed:.2f}s, workers killed: {pool.stats()['killed']}")
+    print(f"ordinary evaluations meanwhile: {len(latencies)}, p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
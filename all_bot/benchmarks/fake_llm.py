@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """
+    Stand-in for ChatOpenAI with a fixed per-call latency, so the bot
+    pipeline can be benchmarked offline.
+
+    With `capacity` set, at most that many requests are served at once
+    (like a model server with a fixed number of slots).
+
+    abatch() behaves like ChatOpenAI.abatch: one request per prompt, sent
+    concurrently, each taking its own slot. With `batch_endpoint` set it
+    instead models a server that takes the whole batch as one request: one
+    slot, latency plus per_item seconds for each extra prompt.
+    """
+
+    def __init__(self, latency=0.5, reply="Paris is the capital of France.", chunks=20, capacity=0, per_item=0.0,
+                 batch_endpoint=False):
+        self.latency = latency
+        self.reply = reply
+        self.chunks = chunks
+        self.capacity = capacity
+        self.per_item = per_item
+        self.batch_endpoint = batch_endpoint
+        self.calls = 0
+        self.batches = 0
+        self._slots = None
+
+    async def _serve(self, seconds):
+        if not self.capacity:
+            await asyncio.sleep(seconds)
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        async with self._slots:
+            await asyncio.sleep(seconds)
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        return FakeMessage(self.reply)
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await self._serve(self.latency)
+        return FakeMessage(self.reply)
+
+    async def abatch(self, prompts, return_exceptions=False):
+        self.batches += 1
+        if not self.batch_endpoint:
+            return await asyncio.gather(*(self.ainvoke(prompt) for prompt in prompts))
+        self.calls += 1
+        await self._serve(self.latency + self.per_item * (len(prompts) - 1))
+        return [FakeMessage(self.reply) for _ in prompts]
+
+    async def astream(self, prompt):
+        self.calls += 1
+        words = self.reply.split(" ")
+        step = max(1, len(words) // self.chunks)
+        pieces = [" ".join(words[i:i + step]) + " " for i in range(0, len(words), step)]
+        for piece in pieces:
+            await asyncio.sleep(self.latency / len(pieces))
+            yield FakeMessage(piece)
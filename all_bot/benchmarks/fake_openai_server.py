@@ -0,0 +1,102 @@
+"""
+Local stand-in for the OpenAI chat completions API, for offline benchmarks.
+
+Serves POST /v1/chat/completions (plain and streamed) with a fixed latency
+and counts requests and TCP connections. A new connection can be made to
+pay a one-off setup delay, standing in for the TCP + TLS handshake of the
+real API, and a share of requests can fail with 429 or 503 to exercise
+retries. GET /stats returns the counters.
+
+Usage: python all_bot/benchmarks/fake_openai_server.py [--port 8765] [--latency 0.2] [--handshake-delay 0.1] [--error-rate 0]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from aiohttp import web
+
+
+class FakeOpenAI:
+    def __init__(self, latency=0.2, handshake_delay=0.1, error_rate=0.0, retry_after=0.5,
+                 reply="This is a canned answer from the fake OpenAI server."):
+        self.latency = latency
+        self.handshake_delay = handshake_delay
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.reply = reply
+        self.requests = 0
+        self.errors = 0
+        self.connections = set()
+
+    async def completions(self, request):
+        self.requests += 1
+        connection = id(request.transport)
+        if connection not in self.connections:
+            self.connections.add(connection)
+            await asyncio.sleep(self.handshake_delay)
+        body = await request.json()
+        if random.random() < self.error_rate:
+            self.errors += 1
+            if random.random() < 0.5:
+                return web.json_response(
+                    {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                    status=429, headers={"Retry-After": str(self.retry_after)},
+                )
+            return web.json_response({"error": {"message": "The server is overloaded", "type": "server_error"}}, status=503)
+        model = body.get("model", "gpt-4-turbo")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        words = self.reply.split(" ")
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(self.latency)
+            return web.json_response({
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words), "total_tokens": prompt_tokens + len(words)},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            chunk = {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else f" {word}"}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def stats(self, request):
+        return web.json_response({"requests": self.requests, "errors": self.errors, "connections": len(self.connections)})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.completions)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per completion")
+    parser.add_argument("--handshake-delay", type=float, default=0.1, help="Extra seconds on a connection's first request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429 or 503")
+    args = parser.parse_args()
+    server = FakeOpenAI(args.latency, args.handshake_delay, args.error_rate)
+    web.run_app(server.app(), host="127.0.0.1", port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Throughput/latency tradeoff of micro-batching a bot's LLM requests.
+
+Sends distinct prompts through a bot's ask_llm at a Poisson arrival rate,
+against a fake LLM with a fixed number of server slots, once without
+batching and once per batch window and size. Reports the achieved
+throughput and the p50/p95 time to answer.
+
+By default the fake LLM's abatch() sends one request per prompt, as
+ChatOpenAI.abatch does, so batching can only add the window to the
+latency. --batch-endpoint models a server that takes a whole batch as one
+request (one slot, plus --per-item seconds per extra prompt); that curve
+is hypothetical until measured against a real batch endpoint, which is why
+llm_batch_window defaults to 0.
+
+Usage: python all_bot/benchmarks/llm_batching.py [--bot health] [--rates 10,25,50,100] [--windows 10,20,50] [--sizes 4,8,16] [--batch-endpoint]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from bench_utils import load_bot
+from fake_llm import FakeLLM
+from base_bot.rate_limiter import RateLimiter
+
+
+def parse_list(text, kind=float):
+    return [kind(value) for value in text.split(",") if value]
+
+
+async def run_load(bot, rate, requests):
+    """Ask `requests` distinct questions at `rate` per second; return elapsed seconds and latencies"""
+    latencies = []
+
+    async def ask(i):
+        started = time.perf_counter()
+        await bot.ask_llm(f"Question {i}: what are the benefits of walking {random.random()}")
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(requests):
+        tasks.append(asyncio.ensure_future(ask(i)))
+        await asyncio.sleep(random.expovariate(rate))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bot", default="health")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rates", default="10,25,50,100", help="Arrival rates to try, requests per second")
+    parser.add_argument("--windows", default="10,20,50", help="Batch windows to try, ms")
+    parser.add_argument("--sizes", default="4,8,16", help="Batch sizes to try")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per LLM request")
+    parser.add_argument("--per-item", type=float, default=0.01, help="Extra seconds per additional prompt in a batch (--batch-endpoint only)")
+    parser.add_argument("--capacity", type=int, default=8, help="Requests the fake LLM serves at once")
+    parser.add_argument("--batch-endpoint", action="store_true", help="Model a server that takes a whole batch as one request")
+    args = parser.parse_args()
+
+    if args.batch_endpoint:
+        print("abatch: one request per batch (assumes a true batch endpoint; ChatOpenAI.abatch does not do this)")
+    else:
+        print("abatch: one request per prompt (as ChatOpenAI.abatch)")
+    configs = [(0, 1)] + [(window, size) for window in parse_list(args.windows) for size in parse_list(args.sizes, int)]
+    print(f"{'rate':>6}{'window ms':>11}{'size':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'calls':>7}")
+    for rate in parse_list(args.rates):
+        for window, size in configs:
+            bot = load_bot(args.bot, {
+                "cache_ttl": 0,
+                "single_flight": False,
+                "llm_batch_window": window,
+                "llm_batch_size": size,
+                "rate_limiter": RateLimiter(),
+            })
+            bot.llm = FakeLLM(latency=args.latency, capacity=args.capacity, per_item=args.per_item,
+                              batch_endpoint=args.batch_endpoint)
+            elapsed, latencies = asyncio.run(run_load(bot, rate, args.requests))
+            latencies.sort()
+            p50 = statistics.median(latencies)
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            label = f"{window:g}" if window else "off"
+            print(f"{rate:>6g}{label:>11}{size if window else '-':>6}{args.requests / elapsed:>9.1f}"
+                  f"{p50 * 1000:>9.0f}{p95 * 1000:>9.0f}{bot.llm.calls:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Concurrent questions to one bot: blocking llm.invoke vs the async LLM path.
+
+Reports total wall time, throughput and the mean time until the first reply
+text is available (streaming bots produce it before the completion ends).
+
+Usage: python all_bot/benchmarks/llm_concurrency.py [--requests 20] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import inspect
+import time
+
+from bench_utils import load_bot
+from fake_llm import FakeLLM
+
+BOTS = {
+    "geography": "@geography capital of France",
+    "health": "@health benefits of walking",
+    "food_recipe": "@recipe butter chicken",
+    "math_calcy": "@math what is a derivative",
+    "website_search": "@website python asyncio",
+}
+
+
+async def blocking_ask_llm(bot, prompt, **kwargs):
+    # The pre-async code path: a synchronous call inside the coroutine
+    return bot.llm.invoke(prompt).content
+
+
+async def blocking_stream_llm(bot, prompt, **kwargs):
+    yield bot.llm.invoke(prompt).content
+
+
+def check(text):
+    # A bot turns exceptions into a reply; timing those would be meaningless
+    if "Sorry, I couldn't" in text:
+        raise RuntimeError(f"The bot answered with an error: {text}")
+
+
+async def answer(bot, message, started):
+    """Run generate_response to completion; return seconds until the first text"""
+    result = bot.generate_response(message)
+    if not inspect.isasyncgen(result):
+        check(await result)
+        return time.perf_counter() - started
+    first = None
+    text = ""
+    async for chunk in result:
+        if first is None:
+            first = time.perf_counter() - started
+        text += chunk
+    check(text)
+    return first
+
+
+async def run_batch(bot, content, count):
+    message = {"content": content, "channelId": "general", "senderName": "bench"}
+    started = time.perf_counter()
+    firsts = await asyncio.gather(*(answer(bot, dict(message), started) for _ in range(count)))
+    return time.perf_counter() - started, sum(firsts) / len(firsts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'bot':<16}{'mode':<10}{'seconds':>10}{'req/s':>10}{'first (s)':>12}")
+    for module_name, content in BOTS.items():
+        bot = load_bot(module_name)
+        bot.llm = FakeLLM(latency=args.latency)
+        async_ask_llm, async_stream_llm = bot.ask_llm, bot.stream_llm
+        for mode in ("blocking", "async"):
+            if mode == "blocking":
+                bot.ask_llm = lambda prompt, bot=bot, **kwargs: blocking_ask_llm(bot, prompt, **kwargs)
+                bot.stream_llm = lambda prompt, bot=bot, **kwargs: blocking_stream_llm(bot, prompt)
+            else:
+                bot.ask_llm, bot.stream_llm = async_ask_llm, async_stream_llm
+            elapsed, first = asyncio.run(run_batch(bot, content, args.requests))
+            print(f"{module_name:<16}{mode:<10}{elapsed:>10.2f}{args.requests / elapsed:>10.1f}{first:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
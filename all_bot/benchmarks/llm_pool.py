@@ -0,0 +1,101 @@
+"""
+Per-bot LLM clients vs the shared client registry, against a local fake
+OpenAI endpoint.
+
+Questions arrive for random bots one after another with short idle gaps,
+the way a chat channel spreads them out. Per-bot clients each open their
+own connections, paying the handshake again for every bot, while the
+shared registry keeps reusing a few warm ones. Reports latency and the
+number of connections the server saw.
+
+Usage: python all_bot/benchmarks/llm_pool.py [--bots 5] [--requests 100] [--handshake-delay 0.1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+import bench_utils  # noqa: F401  (puts base_bot on sys.path)
+from base_bot.llm_clients import LLMClientRegistry
+
+
+def start_server(port, latency, handshake_delay):
+    server = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_openai_server.py"),
+        "--port", str(port), "--latency", str(latency), "--handshake-delay", str(handshake_delay),
+    ])
+    for _ in range(100):
+        try:
+            server_stats(port)
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("fake OpenAI server did not start")
+
+
+def server_stats(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=1) as response:
+        return json.load(response)
+
+
+def per_bot_clients(count, base_url):
+    # What every bot did before: its own ChatOpenAI, with its own connection pool
+    from langchain_community.chat_models import ChatOpenAI
+    return [ChatOpenAI(model_name="gpt-4-turbo", temperature=0.2, openai_api_base=base_url) for _ in range(count)]
+
+
+def shared_clients(count, base_url):
+    registry = LLMClientRegistry()
+    return [registry.get("gpt-4-turbo", 0.2, base_url=base_url) for _ in range(count)]
+
+
+async def workload(clients, requests, gap, seed=3):
+    rng = random.Random(seed)
+    latencies = []
+
+    async def ask(client, i):
+        started = time.perf_counter()
+        await client.ainvoke(f"question {i}")
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    for i in range(requests):
+        tasks.append(asyncio.ensure_future(ask(rng.choice(clients), i)))
+        await asyncio.sleep(rng.expovariate(1 / gap))
+    await asyncio.gather(*tasks)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[int(len(latencies) * 0.95)], latencies[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bots", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--gap", type=float, default=0.05, help="Mean seconds between questions")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--handshake-delay", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    server = start_server(args.port, args.latency, args.handshake_delay)
+    try:
+        print(f"{'clients':<10}{'mean ms':>9}{'p95 ms':>9}{'max ms':>9}{'connections':>13}")
+        for label, build in (("per-bot", per_bot_clients), ("shared", shared_clients)):
+            before = server_stats(args.port)["connections"]
+            clients = build(args.bots, base_url)
+            mean, p95, worst = asyncio.run(workload(clients, args.requests, args.gap))
+            connections = server_stats(args.port)["connections"] - before
+            print(f"{label:<10}{mean * 1000:>9.0f}{p95 * 1000:>9.0f}{worst * 1000:>9.0f}{connections:>13}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Cost of bot output for the calling threads: console print_message and
+display_prompt vs the headless JSON-lines logger.
+
+Several threads (standing in for the bots' socket.io threads) each log a
+burst of incoming-message lines. Output goes to a file so the terminal
+doesn't dominate the numbers; run with stdout redirected to a pipe or a
+slow terminal for the worst case.
+
+Usage: python all_bot/benchmarks/logging_throughput.py [--threads 5] [--messages 20000] [--sample 0.01]
+"""
+import argparse
+import contextlib
+import tempfile
+import threading
+import time
+
+from bench_utils import load_bot
+from base_bot.json_log import JsonLogger
+
+
+def burst(bot, threads, messages):
+    """Log from several threads at once; return elapsed seconds"""
+    def run():
+        for i in range(messages):
+            bot.print_message(f"user: message number {i}", event="message_seen")
+            bot.display_prompt()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=20000, help="Lines per thread")
+    parser.add_argument("--sample", type=float, default=0.01, help="Share of message_seen lines kept when sampling")
+    args = parser.parse_args()
+    total = args.threads * args.messages
+
+    print(f"{'mode':<22}{'seconds':>10}{'lines/s':>12}{'us/line':>10}{'written':>10}")
+    for mode in ("console", "headless", "headless+sampling"):
+        with tempfile.TemporaryFile("w+") as output:
+            if mode == "console":
+                bot = load_bot("geography")
+                del bot.print_message, bot.display_prompt  # use the real console output
+                with contextlib.redirect_stdout(output):
+                    elapsed = burst(bot, args.threads, args.messages)
+                written = total
+            else:
+                sample = {"message_seen": args.sample} if mode.endswith("sampling") else None
+                logger = JsonLogger(stream=output, sample=sample, max_buffer=total)
+                bot = load_bot("geography", {"headless": True, "logger": logger})
+                del bot.print_message, bot.display_prompt
+                elapsed = burst(bot, args.threads, args.messages)
+                logger.close()
+                written = logger.stats()["written"]
+        print(f"{mode:<22}{elapsed:>10.2f}{total / elapsed:>12.0f}{elapsed / total * 1e6:>10.1f}{written:>10}")
+
+
+if __name__ == "__main__":
+    main()
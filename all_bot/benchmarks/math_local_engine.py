@@ -0,0 +1,58 @@
+"""
+MathCalcyBot's exact local engine (math_engine.solver): how many typical
+questions it answers without an LLM round trip, and how fast.
+
+Runs generate_response over a mix of equations, percentages, unit
+conversions and arithmetic with the LLM replaced by a stub that counts
+calls and returns at once, so the timings are the bot's own work.
+
+Usage: python all_bot/benchmarks/math_local_engine.py [--repeat 200]
+"""
+import argparse
+import asyncio
+import time
+
+from bench_utils import load_bot
+
+QUESTIONS = {
+    "equation": ["@math solve x^2 = 4", "@math 2x + 3 = 7", "@math x^2 - 5x + 6 = 0", "@math roots of x^2 - 2", "@math solve 3(y + 1) = 2y for y"],
+    "percentage": ["@math what is 15% of 80?", "@math what percent of 80 is 12", "@math 80 + 15%", "@math percent change from 80 to 92"],
+    "conversion": ["@math convert 5 km to miles", "@math 100 f to c", "@math how many cm in 2 ft", "@math 90 minutes to hours", "@math 60 mph to km/h"],
+    "arithmetic": ["@math 2^10", "@math what is 3 plus 4 squared", "@math sqrt(16) + 2", "@math (2+3)*4", "@math 5 minus 3"],
+    "other": ["@math what is the integral of sin(x)", "@math x^3 = 8", "@math is pi irrational?"],
+}
+
+
+async def run(bot, questions, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for question in questions:
+            await bot.generate_response({"content": question})
+    return (time.perf_counter() - started) / (repeat * len(questions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    bot = load_bot("math_calcy")
+    calls = []
+
+    async def ask_llm(prompt):
+        calls.append(prompt)
+        return "stub answer"
+
+    bot.ask_llm = ask_llm
+
+    print(f"{'category':<12}{'questions':>10}{'no LLM':>8}{'us/question':>13}")
+    for category, questions in QUESTIONS.items():
+        before = len(calls)
+        asyncio.run(run(bot, questions, 1))
+        local = len(questions) - (len(calls) - before)
+        per_question = asyncio.run(run(bot, questions, args.repeat))
+        print(f"{category:<12}{len(questions):>10}{local:>8}{per_question * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
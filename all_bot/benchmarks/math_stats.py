@@ -0,0 +1,74 @@
+"""
+MathCalcyBot statistics: the per-keyword list code vs the one-sweep NumPy
+engine (math_engine.stats).
+
+For each data size, asks for every aggregate the bot has always answered
+(average, median, mode, sum, min, max, product, range, std) and times both
+implementations, then times the engine with the new aggregates added.
+
+Usage: python all_bot/benchmarks/math_stats.py [--sizes 1000,100000,1000000] [--repeat 3]
+"""
+import argparse
+import random
+import statistics
+import time
+from array import array
+
+import bench_utils  # noqa: F401 (puts all_bot on the path)
+from math_engine.stats import AGGREGATES, describe
+
+CLASSIC = ["mean", "median", "mode", "sum", "min", "max", "product", "range", "std"]
+
+
+def list_stats(numbers):
+    # What MathCalcyBot.generate_response used to do: one pass per keyword
+    result = {"mean": sum(numbers) / len(numbers), "median": statistics.median(numbers)}
+    result["mode"] = statistics.mode(numbers)
+    result["sum"] = sum(numbers)
+    result["min"] = min(numbers)
+    result["max"] = max(numbers)
+    product = 1
+    for n in numbers:
+        product *= n
+    result["product"] = product
+    result["range"] = max(numbers) - min(numbers)
+    result["std"] = statistics.stdev(numbers)
+    return result
+
+
+def best_of(repeat, function, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'values':>10}{'list ms':>10}{'engine ms':>11}{'speedup':>9}{'engine, all ms':>16}{'from array ms':>15}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        # Spreadsheet-like data: two decimals, many repeats, product stays finite
+        numbers = [round(random.uniform(0.5, 1.5), 2) for _ in range(size)]
+        buffer = array("d", numbers)
+
+        expected = list_stats(numbers)
+        got = describe(numbers, CLASSIC)
+        assert got["mode"] == expected["mode"] and got["median"] == expected["median"]
+        assert abs(got["std"] - expected["std"]) < 1e-9 * max(1.0, expected["std"])
+
+        classic = best_of(args.repeat, list_stats, numbers)
+        engine = best_of(args.repeat, describe, numbers, CLASSIC)
+        everything = best_of(args.repeat, describe, numbers, AGGREGATES)
+        from_array = best_of(args.repeat, describe, buffer, CLASSIC)
+        print(f"{size:>10}{classic * 1000:>10.1f}{engine * 1000:>11.1f}{classic / engine:>8.1f}x"
+              f"{everything * 1000:>16.1f}{from_array * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Parsing large pasted datasets: MathCalcyBot's old re.findall + list of
+floats vs the streaming parser (math_engine.number_parser).
+
+For each format, reports parse throughput (MB/s) and the peak memory
+allocated while parsing, not counting the input text itself. The
+"stream" row keeps no values at all and only feeds RunningStats.
+
+Usage: python all_bot/benchmarks/number_parsing.py [--values 1000000]
+"""
+import argparse
+import random
+import re
+import time
+import tracemalloc
+
+import bench_utils  # noqa: F401 (puts all_bot on the path)
+from math_engine.number_parser import parse_numbers
+from math_engine.stats import RunningStats
+
+
+def make_text(kind, count):
+    if kind == "plain":
+        return ", ".join(f"{random.uniform(0, 1000):.2f}" for _ in range(count))
+    if kind == "signed/exp":
+        return "\n".join(f"{random.uniform(-1, 1) * 10 ** random.randint(-5, 5):.4e}" for _ in range(count))
+    if kind == "thousands":
+        return "; ".join(f"{random.uniform(-1e7, 1e7):,.2f}" for _ in range(count))
+    return "@math average of " + " ".join(f"value {i} is {random.uniform(0, 100):.1f}," for i in range(count // 2))
+
+
+def old_parse(text):
+    return [float(n) for n in re.findall(r'\d+(?:\.\d+)?', text)]
+
+
+def stream_stats(text):
+    stats = RunningStats()
+    parse_numbers(text, keep=False, on_values=stats.update)
+    return stats
+
+
+def measure(function, text):
+    started = time.perf_counter()
+    result = function(text)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    function(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    count = result.count if isinstance(result, RunningStats) else len(result)
+    return elapsed, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"{'format':<12}{'MB':>6}{'parser':>8}{'values':>10}{'MB/s':>8}{'peak MB':>9}")
+    for kind in ("plain", "signed/exp", "thousands", "prose"):
+        text = make_text(kind, args.values)
+        megabytes = len(text) / 1e6
+        for name, function in (("old", old_parse), ("new", parse_numbers), ("stream", stream_stats)):
+            elapsed, peak, count = measure(function, text)
+            print(f"{kind:<12}{megabytes:>6.1f}{name:>8}{count:>10}{megabytes / elapsed:>8.1f}{peak / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
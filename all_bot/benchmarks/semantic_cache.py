@@ -0,0 +1,151 @@
+"""
+Semantic cache hit rate and lookup latency at 10k and 100k cached questions.
+
+Each run fills a cache with recipe-bot style questions ("how do I make
+spicy tofu", "easy greek lentil recipe for two", ...), plus the cached
+side of hand-written question pairs, then looks up:
+
+- paraphrases: real rewordings of a cached question ("how do I make butter
+  chicken" for "butter chicken recipe please"), a hit only counts if it
+  returns that question's answer
+- near misses: close wording, different answer ("chicken curry" against a
+  cached "chicken soup"); every hit is wrong
+- other dishes: the fill's questions about dishes that were never cached
+  ("spicy lentil" when only "spicy tofu" is); every hit is wrong
+
+A second table sweeps the cosine threshold and the term overlap on a 10k
+cache.
+
+Usage: python all_bot/benchmarks/semantic_cache.py [--sizes 10000 100000] [--lookups 2000]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from base_bot.semantic_cache import HashingEmbedder, SemanticCache
+
+# (cached question, new question): the same question reworded
+PARAPHRASES = [
+    ("butter chicken recipe please", "how do I make butter chicken"),
+    ("how do I make pancakes", "pancake recipe"),
+    ("chocolate chip cookies recipe", "how do you make chocolate chip cookies"),
+    ("easy lasagna recipe", "how to make lasagna"),
+    ("guacamole recipe", "how do you make guacamole at home"),
+    ("how to cook salmon", "best way to cook salmon"),
+    ("tiramisu recipe", "homemade tiramisu"),
+    ("how to make hummus", "quick hummus recipe"),
+    ("how long to bake banana bread", "banana bread: how long in the oven"),
+    ("what goes with pulled pork", "what to serve with pulled pork"),
+    ("how do I make french toast", "french toast recipe for two"),
+    ("shakshuka recipe", "how to cook shakshuka"),
+]
+
+# (cached question, new question): close wording, different answer
+NEAR_MISSES = [
+    ("how to make chicken soup", "how to make chicken curry"),
+    ("chocolate cake recipe", "vegan chocolate cake recipe"),
+    ("butter chicken recipe please", "butter paneer recipe please"),
+    ("how to cook white rice", "how to cook wild rice"),
+    ("banana bread recipe", "banana bread recipe without eggs"),
+    ("how do I make pancakes", "how do I make crepes"),
+    ("easy lasagna recipe", "easy moussaka recipe"),
+    ("how long to bake banana bread", "how long to bake pumpkin bread"),
+    ("what goes with pulled pork", "what goes with pulled jackfruit"),
+    ("guacamole recipe", "salsa verde recipe"),
+]
+
+# The fill: templates a recipe bot sees a lot, over dishes named with words
+# the pairs above don't use
+TEMPLATES = [
+    "how do I make {}", "{} recipe", "easy {} recipe", "how to cook {}", "best way to cook {}",
+    "homemade {}", "how do you make {}", "how long to bake {}", "what goes with {}", "how to make {} at home",
+    "quick {} recipe", "vegan {}", "{} without eggs", "healthy {} recipe", "how to make {}",
+]
+SUFFIXES = ["", " for 4 people", " for two", " for a party", " in the oven", " on the grill", " in an instant pot", " for dinner", " for kids"]
+STYLES = [
+    "thai", "korean", "greek", "moroccan", "cajun", "teriyaki", "garlic", "lemon", "honey", "smoky",
+    "spicy", "creamy", "roasted", "grilled", "braised", "crispy", "sesame", "ginger", "pesto", "tandoori",
+    "jerk", "szechuan", "miso", "harissa", "chipotle", "herb", "maple", "coconut", "peanut", "balsamic",
+]
+BASES = [
+    "tofu", "lentil", "quinoa", "beef", "lamb", "shrimp", "cod", "turkey", "duck", "mushroom",
+    "eggplant", "zucchini", "spinach", "broccoli", "cauliflower", "chickpea", "barley", "couscous", "polenta", "noodle",
+    "dumpling", "taco", "burrito", "risotto", "omelette", "frittata", "quiche", "casserole", "stew", "meatball",
+]
+
+
+def fill_questions(rng):
+    """The fill's questions in random order, and questions about dishes kept out of it"""
+    dishes = [f"{style} {base}" for style in STYLES for base in BASES]
+    rng.shuffle(dishes)
+    held_out, dishes = dishes[:len(dishes) // 10], dishes[len(dishes) // 10:]
+    questions = [template.format(dish) + suffix for dish, template, suffix in itertools.product(dishes, TEMPLATES, SUFFIXES)]
+    rng.shuffle(questions)
+    other = [rng.choice(TEMPLATES).format(dish) + rng.choice(SUFFIXES) for dish in held_out]
+    return questions, other
+
+
+def build(size, term_overlap, seed=7):
+    """A cache of `size` questions: the pairs' cached side, then the fill"""
+    rng = random.Random(seed)
+    questions, other = fill_questions(rng)
+    cache = SemanticCache(HashingEmbedder(), capacity=size, term_overlap=term_overlap)
+    cached = list(dict.fromkeys(question for question, _ in PARAPHRASES + NEAR_MISSES))
+    if size - len(cached) > len(questions):
+        raise SystemExit(f"The fill has only {len(questions) + len(cached)} distinct questions")
+    started = time.perf_counter()
+    for question in cached + questions[:size - len(cached)]:
+        cache.set("recipe", question, question, ttl=3600)
+    return cache, other, time.perf_counter() - started
+
+
+def lookups(cache, threshold, other, count, rng):
+    """Paraphrase hit rate, wrong hit rates, and lookup latencies"""
+    timings = []
+
+    def get(query):
+        started = time.perf_counter()
+        answer = cache.get("recipe", query, threshold)
+        timings.append(time.perf_counter() - started)
+        return answer
+
+    paraphrases = sum(get(query) == cached for cached, query in PARAPHRASES) / len(PARAPHRASES)
+    near_misses = sum(get(query) is not None for _, query in NEAR_MISSES) / len(NEAR_MISSES)
+    others = [rng.choice(other) for _ in range(count)]
+    other_dishes = sum(get(query) is not None for query in others) / len(others)
+    return paraphrases, near_misses, other_dishes, sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.2, help="Cosine threshold (the recipe bot's)")
+    parser.add_argument("--term-overlap", type=float, default=0.75)
+    args = parser.parse_args()
+
+    print(f"threshold {args.threshold}, term overlap {args.term_overlap}")
+    print(f"{'entries':>8}{'matrix MB':>11}{'fill s':>8}{'paraphrases hit':>17}{'near misses hit':>17}"
+          f"{'other dishes hit':>18}{'mean ms':>9}{'p95 ms':>8}")
+    for size in args.sizes:
+        cache, other, fill_seconds = build(size, args.term_overlap)
+        paraphrases, near_misses, other_dishes, timings = lookups(cache, args.threshold, other, args.lookups, random.Random(1))
+        print(f"{cache.stats()['entries']:>8}{cache._vectors.nbytes / 1e6:>11.0f}{fill_seconds:>8.1f}{paraphrases:>17.0%}"
+              f"{near_misses:>17.0%}{other_dishes:>18.1%}{sum(timings) / len(timings) * 1000:>9.2f}"
+              f"{timings[int(len(timings) * 0.95)] * 1000:>8.2f}")
+
+    print(f"\n10000 entries\n{'threshold':>9}{'term overlap':>14}{'paraphrases hit':>17}{'near misses hit':>17}{'other dishes hit':>18}")
+    cache, other, _ = build(10000, args.term_overlap)
+    for threshold in sorted({0.2, 0.3, 0.4, 0.6, args.threshold}):
+        for term_overlap in sorted({0.0, 0.5, 0.65, 0.75, 0.85, 1.0, args.term_overlap}):
+            cache.term_overlap = term_overlap
+            paraphrases, near_misses, other_dishes, _ = lookups(cache, threshold, other, 500, random.Random(1))
+            print(f"{threshold:>9.2f}{term_overlap:>14.2f}{paraphrases:>17.0%}{near_misses:>17.0%}{other_dishes:>18.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Startup cost per bot: module import, bot construction and first LLM use.
+
+Every bot is measured in a fresh interpreter run with `python -X importtime`,
+so each row is a cold start. The heaviest packages the bot module pulled in
+are taken from the importtime report. The "fleet" row loads every bot in a
+single process, the way agent_manager does.
+
+Usage: python all_bot/benchmarks/startup.py [--bots geography health] [--runs 3] [--json startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BOT_TYPE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bot_type'))
+MARKER = "startup-benchmark: loading bots"
+LLM_MARKER = "startup-benchmark: creating LLM clients"
+
+
+def child(modules):
+    # Runs in the measured interpreter; prints timings as JSON on stdout
+    import contextlib
+    import io
+    from bench_utils import load_module
+
+    timings = {"import_ms": 0.0, "init_ms": 0.0, "first_llm_ms": 0.0}
+    print(MARKER, file=sys.stderr, flush=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bots = []
+        for module_name in modules:
+            started = time.perf_counter()
+            bot_class = load_module(module_name)
+            imported = time.perf_counter()
+            bots.append(bot_class())
+            timings["import_ms"] += (imported - started) * 1000
+            timings["init_ms"] += (time.perf_counter() - imported) * 1000
+        print(LLM_MARKER, file=sys.stderr, flush=True)
+        for bot in bots:
+            started = time.perf_counter()
+            bot.llm
+            timings["first_llm_ms"] += (time.perf_counter() - started) * 1000
+    print(json.dumps(timings))
+    # Bots install signal handlers and loop threads; skip interpreter teardown
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def heaviest_imports(importtime_report, count=3):
+    """Top-level packages with the largest cumulative import time while loading the bots"""
+    report = importtime_report.partition(MARKER)[2].partition(LLM_MARKER)[0]
+    packages = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            continue  # nested import, already counted in its parent
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(cumulative) / 1000
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def measure(modules, runs):
+    """Median timings of a cold start that loads the given bot modules"""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark"))
+    samples = []
+    report = ""
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", *modules],
+            capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(modules)} failed to start:\n{result.stderr[-2000:]}")
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        timings["process_ms"] = wall_ms
+        samples.append(timings)
+        report = result.stderr
+    median = {key: sorted(s[key] for s in samples)[len(samples) // 2] for key in samples[0]}
+    median["heaviest_imports"] = heaviest_imports(report)
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bots", nargs="+", default=sorted(f[:-3] for f in os.listdir(BOT_TYPE_DIR) if f.endswith(".py") and not f.startswith("__")))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+
+    results = {}
+    print(f"{'bot':<16}{'import ms':>10}{'init ms':>9}{'1st LLM ms':>11}{'process ms':>11}  heaviest imports")
+    for label, modules in [(bot, [bot]) for bot in args.bots] + [("fleet", args.bots)]:
+        result = measure(modules, args.runs)
+        results[label] = result
+        heaviest = ", ".join(f"{name} {ms:.0f}" for name, ms in result["heaviest_imports"])
+        print(f"{label:<16}{result['import_ms']:>10.0f}{result['init_ms']:>9.0f}{result['first_llm_ms']:>11.0f}{result['process_ms']:>11.0f}  {heaviest}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
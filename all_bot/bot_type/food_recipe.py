@@ -4,7 +4,6 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'base_bot')))
 from dotenv import load_dotenv
 from base_bot.base_bot import BaseBot as _BaseBot
-from langchain_community.chat_models import ChatOpenAI
 
 load_dotenv()
 
@@ -14,10 +13,15 @@ class FoodRecipeBot(_BaseBot):
             "bot_id": "recipe",
             "bot_name": "Food Recipe Bot {id: recipe}",
             "bot_type": "recipe_bot",
-            "autojoin_channel": "general"
+            "autojoin_channel": "general",
+            "mentions": ["@recipe"],
+            "llm_model": "gpt-4-turbo",
+            "llm_temperature": 0.2,
+            "cache_ttl": 86400,  # a day
+            # Low cosine bar: with the default hashing embedder the term overlap
+            # check (SEMANTIC_CACHE_TERM_OVERLAP) tells rewordings from other dishes
+            "semantic_cache_threshold": 0.2  # "butter chicken recipe" ~ "how do I make butter chicken"
         }
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(model_name="gpt-4-turbo", temperature=0.2, openai_api_key=openai_api_key)
         if options:
             default_options.update(options)
         super().__init__(options=default_options)
@@ -47,7 +51,8 @@ class FoodRecipeBot(_BaseBot):
         # Extract the recipe query
         query = content.replace("@recipe", "").strip()
         if not query:
-            return "Please provide a recipe request after @recipe. For example: '@recipe how to make butter chicken'"
+            yield "Please provide a recipe request after @recipe. For example: '@recipe how to make butter chicken'"
+            return
         
         # Create a prompt that emphasizes recipe expertise
         prompt = (
@@ -69,24 +74,13 @@ class FoodRecipeBot(_BaseBot):
         )
         
         try:
-            # First, acknowledge that we're working on the recipe
-            self.socket.emit('message', {
-                "channelId": message.get("channelId"),
-                "content": "🍳 Working on your recipe request..."
-            })
-            
-            # Get response from LLM
-            response = self.llm.invoke(prompt).content
-            
-            # Format the response if needed
-            if not response.strip().startswith("**FoodRecipeBot Answer:**"):
-                response = f"**FoodRecipeBot Answer:**\n{response.strip()}"
-            
-            return response
+            # Stream the recipe into the channel as it is generated
+            async for chunk in self.stream_llm(prompt, heading="**FoodRecipeBot Answer:**", query=query):
+                yield chunk
         except Exception as e:
             error_msg = f"Sorry, I couldn't process your recipe request. Error: {str(e)}"
             print(f"Recipe Bot Error: {error_msg}")  # Log the error
-            return f"**FoodRecipeBot Error:** {error_msg}"
+            yield f"**FoodRecipeBot Error:** {error_msg}"
 
     def should_respond_to(self, message):
         if isinstance(message, dict):
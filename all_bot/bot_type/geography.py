@@ -4,7 +4,6 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'base_bot')))
 from dotenv import load_dotenv
 from base_bot.base_bot import BaseBot as _BaseBot
-from langchain_community.chat_models import ChatOpenAI
 
 load_dotenv()
 
@@ -14,10 +13,13 @@ class GeographyBot(_BaseBot):
             "bot_id": "geography",
             "bot_name": "Geography Bot {id: geography}",
             "bot_type": "geography_bot",
-            "autojoin_channel": "general"
+            "autojoin_channel": "general",
+            "mentions": ["@geography"],
+            "llm_model": "gpt-4-turbo",
+            "llm_temperature": 0.2,
+            "cache_ttl": 604800,  # geography facts rarely change: a week
+            "semantic_cache_threshold": 0.85
         }
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(model_name="gpt-4-turbo", temperature=0.2, openai_api_key=openai_api_key)
         if options:
             default_options.update(options)
         super().__init__(options=default_options)
@@ -65,7 +67,7 @@ class GeographyBot(_BaseBot):
         )
         
         try:
-            response = self.llm.invoke(prompt).content
+            response = await self.ask_llm(prompt, query=content)
             if not response.strip().startswith("**GeographyBot Answer:**"):
                 response = f"**GeographyBot Answer:**\n- {response.strip()}"
             return response
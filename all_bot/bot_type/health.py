@@ -4,7 +4,6 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'base_bot')))
 from dotenv import load_dotenv
 from base_bot.base_bot import BaseBot as _BaseBot
-from langchain_community.chat_models import ChatOpenAI
 
 load_dotenv()
 
@@ -14,10 +13,13 @@ class HealthBot(_BaseBot):
             "bot_id": "health",
             "bot_name": "Health Bot {id: health}",
             "bot_type": "health_bot",
-            "autojoin_channel": "general"
+            "autojoin_channel": "general",
+            "mentions": ["@health"],
+            "llm_model": "gpt-4-turbo",
+            "llm_temperature": 0.2,
+            "llm_priority": 1,  # health questions go first
+            "cache_ttl": 900  # keep health advice fresh: 15 minutes
         }
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(model_name="gpt-4-turbo", temperature=0.2, openai_api_key=openai_api_key)
         if options:
             default_options.update(options)
         super().__init__(options=default_options)
@@ -59,12 +61,11 @@ class HealthBot(_BaseBot):
         )
         
         try:
-            response = self.llm.invoke(prompt).content
-            if not response.strip().startswith("**HealthBot Answer:**"):
-                response = f"**HealthBot Answer:**\n- {response.strip()}"
-            return response
+            # Stream the answer into the channel as it is generated
+            async for chunk in self.stream_llm(prompt, heading="**HealthBot Answer:**", separator="\n- ", query=content):
+                yield chunk
         except Exception as e:
-            return f"**HealthBot Answer:**\n- ❌ Sorry, I couldn't process your health question. Error: {e}"
+            yield f"**HealthBot Answer:**\n- ❌ Sorry, I couldn't process your health question. Error: {e}"
 
     def should_respond_to(self, message):
         if isinstance(message, dict):
@@ -3,37 +3,126 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'base_bot')))
 import re
-import ast
 from dotenv import load_dotenv
 from base_bot.base_bot import BaseBot as _BaseBot
-from langchain_community.chat_models import ChatOpenAI
-import statistics
-import time
-import asyncio
-import json
-import random
+from math_engine.number_parser import parse_numbers
+from math_engine import sandbox, solver
+from math_engine.expression import LimitExceeded
 
 load_dotenv()
 
+# Aggregate name -> keyword pattern in the lower-cased question
+STAT_KEYWORDS = [
+    ("mean", r"average|(?<!geometric )(?<!harmonic )mean"),
+    ("median", r"median"),
+    ("mode", r"\bmode\b"),
+    ("sum", r"\bsum\b|\badd\b|\btotal\b"),
+    ("min", r"\bmin(?:imum)?\b"),
+    ("max", r"\bmax(?:imum)?\b"),
+    ("product", r"product|multiply"),
+    ("range", r"\brange\b"),
+    ("std", r"std|standard deviation"),
+    ("variance", r"variance"),
+    ("geometric_mean", r"geometric"),
+    ("harmonic_mean", r"harmonic"),
+    ("histogram", r"histogram|distribution"),
+]
+
+# Order, label and the text used when the data doesn't define the aggregate
+STAT_LINES = [
+    ("mean", "The average", None),
+    ("median", "The median", None),
+    ("mode", "The mode", None),
+    ("sum", "The sum", None),
+    ("min", "The minimum", None),
+    ("max", "The maximum", None),
+    ("product", "The product", None),
+    ("range", "The range", None),
+    ("std", "The standard deviation", "Standard deviation requires at least two numbers."),
+    ("variance", "The variance", "Variance requires at least two numbers."),
+    ("percentiles", None, None),
+    ("geometric_mean", "The geometric mean", "The geometric mean needs positive numbers."),
+    ("harmonic_mean", "The harmonic mean", "The harmonic mean needs numbers that are not negative."),
+    ("histogram", None, None),
+]
+
+# Equations and requests to solve one: never answered with a sum of their numbers
+EQUATION_PATTERN = re.compile(r"=|\b(?:solve|equations?|roots?|zeros|zeroes)\b")
+
+PERCENTILE_PATTERN = re.compile(r"\bp(\d{1,2}(?:\.\d+)?)\b|\b(\d{1,2}(?:\.\d+)?)(?:st|nd|rd|th)\s+percentile", re.IGNORECASE)
+
+
+def ordinal(number):
+    """Ordinal text of a percentile: 90 -> 90th, 2.5 -> 2.5th"""
+    if number != int(number):
+        return f"{number:g}th"
+    number = int(number)
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
 class MathCalcyBot(_BaseBot):
     def __init__(self, options=None):
         default_options = {
             "bot_id": "math",
             "bot_name": "Math Bot {id: math}",
             "bot_type": "math_bot",
-            "autojoin_channel": "general"
+            "autojoin_channel": "general",
+            "mentions": ["@math"],
+            "llm_model": "gpt-4-turbo",
+            "llm_temperature": 0.2,
+            "cache_ttl": 86400  # a day
         }
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(model_name="gpt-4-turbo", temperature=0.2, openai_api_key=openai_api_key)
         if options:
             default_options.update(options)
         super().__init__(options=default_options)
 
     def parse_numbers_from_text(self, text):
-        # Extract numbers from comma/space separated text
-        numbers = [float(n) for n in re.findall(r'\d+(?:\.\d+)?', text)]
-        return numbers
+        # Signed, scientific and thousands-grouped numbers, parsed block by
+        # block into a compact float64 array
+        return parse_numbers(text)
 
+    def parse_percentiles(self, text):
+        """
+        Find the percentiles a question asks for ("90th percentile", "p95")
+        
+        Returns:
+            tuple: (list of percentiles, text with them removed)
+        """
+        found = [float(a or b) for a, b in PERCENTILE_PATTERN.findall(text)]
+        return found, PERCENTILE_PATTERN.sub(" ", text) if found else text
+    
+    def requested_stats(self, text):
+        """Aggregates (see math_engine.stats) a lower-cased question asks for"""
+        wanted = {name for name, pattern in STAT_KEYWORDS if re.search(pattern, text)}
+        if re.search(r"\bp\d|percentile|quartile", text):
+            wanted.add("percentiles")
+        return wanted
+    
+    def compute_stats(self, numbers, wanted, percentiles=None):
+        """Run the vectorized stats engine over the numbers in one sweep"""
+        # Imported on first use: numpy adds noticeably to the bot's startup
+        from math_engine.stats import describe, DEFAULT_PERCENTILES
+        return describe(numbers, wanted, percentiles or DEFAULT_PERCENTILES)
+    
+    def format_stats(self, stats):
+        """Answer bullets for the aggregates in stats, in a fixed order"""
+        bullets = []
+        for name, label, undefined in STAT_LINES:
+            if name not in stats:
+                continue
+            value = stats[name]
+            if name == "percentiles":
+                bullets.extend(f"- The {ordinal(p)} percentile is: {v}" for p, v in value.items())
+            elif name == "histogram":
+                bullets.append("- Histogram:")
+                bullets.extend(f"  - {low:g} to {high:g}: {count}" for low, high, count in value)
+            elif value is None:
+                bullets.append(f"- {undefined}")
+            else:
+                bullets.append(f"- {label} is: {value}")
+        return bullets
+    
     def is_math_question(self, message):
         """
         Heuristic to detect if a message is a math question.
@@ -64,140 +153,104 @@ class MathCalcyBot(_BaseBot):
 
     def safe_eval(self, expr):
         """
-        Safely evaluate simple math expressions using ast and math module.
+        Safely evaluate simple math expressions using the math module.
+        The expression is validated and compiled once, then served from
+        the process-wide cache (math_engine.expression), under the size
+        limits and worker time budget of math_engine.sandbox.
         """
-        import math
-        allowed_names = {k: v for k, v in math.__dict__.items() if not k.startswith("__")}
-        allowed_names["abs"] = abs
-        allowed_names["round"] = round
-        node = ast.parse(expr, mode='eval')
-        def _eval(node):
-            if isinstance(node, ast.Expression):
-                return _eval(node.body)
-            elif isinstance(node, ast.BinOp):
-                left = _eval(node.left)
-                right = _eval(node.right)
-                if isinstance(node.op, ast.Add): return left + right
-                if isinstance(node.op, ast.Sub): return left - right
-                if isinstance(node.op, ast.Mult): return left * right
-                if isinstance(node.op, ast.Div): return left / right
-                if isinstance(node.op, ast.Pow): return left ** right
-                if isinstance(node.op, ast.Mod): return left % right
-                raise ValueError("Unsupported operator")
-            elif isinstance(node, ast.UnaryOp):
-                operand = _eval(node.operand)
-                if isinstance(node.op, ast.UAdd): return +operand
-                if isinstance(node.op, ast.USub): return -operand
-                raise ValueError("Unsupported unary operator")
-            elif isinstance(node, ast.Num):
-                return node.n
-            elif isinstance(node, ast.Call):
-                func = node.func.id
-                if func in allowed_names:
-                    args = [_eval(arg) for arg in node.args]
-                    return allowed_names[func](*args)
-                raise ValueError(f"Function {func} not allowed")
-            elif isinstance(node, ast.Name):
-                if node.id in allowed_names:
-                    return allowed_names[node.id]
-                raise ValueError(f"Name {node.id} is not allowed")
-            else:
-                raise ValueError("Unsupported expression")
-        return _eval(node)
+        return sandbox.evaluate(expr)
 
+    async def expression_answer(self, expr):
+        """
+        Evaluate an expression in the sandbox
+        
+        Returns:
+            list or None: Answer bullets, or None if it isn't a valid
+                expression. An expression over the sandbox limits is
+                answered as such rather than passed on.
+        """
+        try:
+            # Same as safe_eval, but waits for a sandbox worker off the loop
+            result = await sandbox.aevaluate(expr)
+        except (LimitExceeded, TimeoutError) as e:
+            return [f"- The expression you provided: `{expr}`", f"- It is too large to evaluate ({e})."]
+        except Exception:
+            return None
+        return [
+            f"- The expression you provided: `{expr}`",
+            f"- The result is: {result}"
+        ]
+    
+    async def add_explanation(self, response, content, request):
+        """
+        Append an LLM step-by-step explanation when the user asks "how" or
+        for an explanation or steps
+        
+        Args:
+            response (str): The answer so far
+            content (str): The user's question
+            request (str): What to ask the tutor for
+        """
+        if not re.search(r"\bhow\b(?!\s+(?:many|much)\b)|explain|step", content.lower()):
+            return response
+        prompt = f"You are a helpful math tutor. The user asked: '{content}'. {request}"
+        try:
+            llm_response = await self.ask_llm(prompt)
+            response += "\n\n**Step-by-step Explanation:**\n" + llm_response
+        except Exception as e:
+            response += f"\n\n- (Could not generate explanation: {e})"
+        return response
+    
     async def generate_response(self, message):
         content = message.get("content", "")
-        numbers = self.parse_numbers_from_text(content)
+        # "90th percentile" / "p90" name a percentile, not a data value
+        percentiles, data_text = self.parse_percentiles(content)
+        numbers = self.parse_numbers_from_text(data_text)
         c = content.lower()
-        bullets = []
-        op_detected = False
 
         # 1. Direct statistics/calculation logic
-        if numbers:
-            if "average" in c or "mean" in c:
-                avg = sum(numbers) / len(numbers)
-                bullets.append(f"- The average is: {avg}")
-                op_detected = True
-            if "median" in c:
-                med = statistics.median(numbers)
-                bullets.append(f"- The median is: {med}")
-                op_detected = True
-            if "mode" in c:
-                try:
-                    mode = statistics.mode(numbers)
-                    bullets.append(f"- The mode is: {mode}")
-                except statistics.StatisticsError:
-                    bullets.append("- No unique mode found.")
-                op_detected = True
-            if "sum" in c or "add" in c or "total" in c:
-                bullets.append(f"- The sum is: {sum(numbers)}")
-                op_detected = True
-            if "min" in c or "minimum" in c:
-                bullets.append(f"- The minimum is: {min(numbers)}")
-                op_detected = True
-            if "max" in c or "maximum" in c:
-                bullets.append(f"- The maximum is: {max(numbers)}")
-                op_detected = True
-            if "product" in c or "multiply" in c:
-                prod = 1
-                for n in numbers:
-                    prod *= n
-                bullets.append(f"- The product is: {prod}")
-                op_detected = True
-            if "range" in c:
-                bullets.append(f"- The range is: {max(numbers) - min(numbers)}")
-                op_detected = True
-            if "std" in c or "standard deviation" in c:
-                if len(numbers) > 1:
-                    std = statistics.stdev(numbers)
-                    bullets.append(f"- The standard deviation is: {std}")
-                else:
-                    bullets.append("- Standard deviation requires at least two numbers.")
-                op_detected = True
-            # If no operation keyword, default to sum
-            if not op_detected:
-                bullets.append(f"- The numbers you provided: {', '.join(map(str, numbers))}")
-                bullets.append(f"- The sum of these numbers is: {sum(numbers)}")
-            response = "**MathCalcyBot Answer:**\n" + "\n".join(bullets)
-            # If the user asks "how" or for an explanation, use LLM for a step-by-step explanation
-            if "how" in c or "explain" in c or "step" in c:
-                prompt = (
-                    f"You are a helpful math tutor. The user asked: '{content}'. "
-                    "Provide a step-by-step explanation for the calculation above, in markdown, with clear bullet points."
-                )
-                try:
-                    llm_response = self.llm.invoke(prompt).content
-                    response += "\n\n**Step-by-step Explanation:**\n" + llm_response
-                except Exception as e:
-                    response += f"\n\n- (Could not generate explanation: {e})"
-            return response
+        wanted = self.requested_stats(c) if numbers else None
+        if wanted:
+            stats = self.compute_stats(numbers, wanted, percentiles)
+            response = "**MathCalcyBot Answer:**\n" + "\n".join(self.format_stats(stats))
+            return await self.add_explanation(
+                response, content, "Provide a step-by-step explanation for the calculation above, in markdown, with clear bullet points."
+            )
 
-        # 2. Try to extract and evaluate a math expression
+        # 2. Try to extract and evaluate a math expression, when it is the whole question
         expr_match = re.search(r"([0-9\s+\-*/^%.()]+)", content)
         expr = expr_match.group(1).strip() if expr_match else None
-        if expr:
-            try:
-                result = self.safe_eval(expr)
-                bullets = [
-                    f"- The expression you provided: `{expr}`",
-                    f"- The result is: {result}"
-                ]
-                response = "**MathCalcyBot Answer:**\n" + "\n".join(bullets)
-                if "how" in c or "explain" in c or "step" in c:
-                    prompt = (
-                        f"You are a helpful math tutor. The user asked: '{content}'. "
-                        f"Show a step-by-step solution for the expression `{expr}`."
-                    )
-                    try:
-                        llm_response = self.llm.invoke(prompt).content
-                        response += "\n\n**Step-by-step Explanation:**\n" + llm_response
-                    except Exception as e:
-                        response += f"\n\n- (Could not generate explanation: {e})"
-                return response
-            except Exception:
-                pass  # Fall back to LLM for complex/invalid expressions
-
-        # 3. For anything else, use OpenAI LLM for a smart, conversational answer
+        bullets = None
+        if expr and expr == re.sub(r"@\w+", "", content).strip(" ?=\n"):
+            bullets = await self.expression_answer(expr)
+        if bullets:
+            response = "**MathCalcyBot Answer:**\n" + "\n".join(bullets)
+            return await self.add_explanation(response, content, f"Show a step-by-step solution for the expression `{expr}`.")
+
+        # 3. Exact local engine: equations, percentages, unit conversions and
+        # arithmetic in words or with ^ as power, answered without the LLM
+        bullets = solver.answer(content)
+        if bullets is None:
+            expr = solver.to_expression(content)
+            if expr:
+                bullets = await self.expression_answer(expr)
+        if bullets:
+            response = "**MathCalcyBot Answer:**\n" + "\n".join(bullets)
+            return await self.add_explanation(response, content, "Show a step-by-step solution for the answer above.")
+
+        # 4. Numbers but no operation keyword: default to sum. An equation
+        # the local engine couldn't solve goes to the LLM instead
+        if numbers and not EQUATION_PATTERN.search(c):
+            bullets = [
+                f"- The numbers you provided: {', '.join(map(str, numbers))}",
+                f"- The sum of these numbers is: {self.compute_stats(numbers, ['sum'])['sum']}"
+            ]
+            response = "**MathCalcyBot Answer:**\n" + "\n".join(bullets)
+            return await self.add_explanation(
+                response, content, "Provide a step-by-step explanation for the calculation above, in markdown, with clear bullet points."
+            )
+
+        # 5. For anything else, use OpenAI LLM for a smart, conversational answer
         prompt = (
             "You are a helpful, advanced math assistant. "
             "Always answer in markdown with a bold heading '**MathCalcyBot Answer:**' and bullet points for each step/result, each on a new line. "
@@ -207,7 +260,7 @@ class MathCalcyBot(_BaseBot):
             f"\n\n{content}"
         )
         try:
-            response = self.llm.invoke(prompt).content
+            response = await self.ask_llm(prompt)
             if not response.strip().startswith("**MathCalcyBot Answer:**"):
                 response = f"**MathCalcyBot Answer:**\n- {response.strip()}"
             return response
@@ -228,6 +281,7 @@ class MathCalcyBot(_BaseBot):
         self.print_message("- Basic arithmetic: 2 + 2, 5 * 7, etc.")
         self.print_message("- Scientific calculations: sin(0.5), log(10), sqrt(16), etc.")
         self.print_message("- Statistical queries: average, mean, median, etc.")
+        self.print_message("- Equations, percentages and unit conversions: solve x^2 = 4, 15% of 80, 5 km to miles")
         self.print_message("- Natural language math questions (using AI)")
         self.print_message("Mention me or type a math question to get started!")
 
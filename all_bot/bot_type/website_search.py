@@ -2,9 +2,6 @@ import sys
 import os
 from dotenv import load_dotenv
 from base_bot.base_bot import BaseBot as _BaseBot
-from langchain_community.chat_models import ChatOpenAI
-import requests
-from bs4 import BeautifulSoup
 
 load_dotenv()
 
@@ -14,10 +11,13 @@ class WebsiteSearchBot(_BaseBot):
             "bot_id": "website",
             "bot_name": "Website Search Bot {id: website}",
             "bot_type": "website_search_bot",
-            "autojoin_channel": "general"
+            "autojoin_channel": "general",
+            "mentions": ["@website"],
+            "llm_model": "gpt-4-turbo",
+            "llm_temperature": 0.2,
+            "llm_priority": 9,  # web searches can wait
+            "semantic_cache_threshold": 0.8
         }
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(model_name="gpt-4-turbo", temperature=0.2, openai_api_key=openai_api_key)
         if options:
             default_options.update(options)
         super().__init__(options=default_options)
@@ -52,7 +52,7 @@ class WebsiteSearchBot(_BaseBot):
             )
             
             # Get response from LLM
-            response = self.llm.invoke(prompt).content
+            response = await self.ask_llm(prompt, query=query)
             if not response.strip().startswith("**WebsiteSearchBot Answer:**"):
                 response = f"**WebsiteSearchBot Answer:**\n- {response.strip()}"
             return response
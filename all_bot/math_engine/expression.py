@@ -0,0 +1,225 @@
+import ast
+import math
+import os
+from fractions import Fraction
+from functools import lru_cache
+
+# Compiled expressions kept per process, keyed on the normalized text
+CACHE_SIZE = int(os.getenv("MATH_EXPR_CACHE_SIZE", "1024"))
+# Largest syntax tree an expression may have
+MAX_NODES = int(os.getenv("MATH_MAX_NODES", "200"))
+# Largest integer an expression may produce, in bits (10000 bits is about
+# 3000 digits, still printable with Python's default str() limit)
+MAX_INT_BITS = int(os.getenv("MATH_MAX_INT_BITS", "10000"))
+
+# Names an expression may use, built once: the math module plus abs and round
+ALLOWED_NAMES = {name: value for name, value in math.__dict__.items() if not name.startswith("__")}
+ALLOWED_NAMES["abs"] = abs
+ALLOWED_NAMES["round"] = round
+
+
+class LimitExceeded(ValueError):
+    """An expression or its result is over the sandbox limits"""
+
+
+def _check_bits(bits):
+    if bits > MAX_INT_BITS:
+        raise LimitExceeded("Result too large")
+
+
+def _pow(base, exponent):
+    # Estimate the size of an exact power before computing it: 9**9**9
+    # would otherwise run for minutes. Fractions (see math_engine.solver)
+    # are exact too, with negative exponents as well
+    if isinstance(base, (int, Fraction)) and isinstance(exponent, (int, Fraction)) and exponent.denominator == 1:
+        size = max(abs(base.numerator), base.denominator)
+        if size > 1 and (exponent > 0 or isinstance(base, Fraction)):
+            _check_bits(abs(exponent) * math.log2(size))
+    return base ** exponent
+
+
+def _log2_factorial(n):
+    return math.lgamma(n + 1) / math.log(2)
+
+
+def _factorial(n):
+    if type(n) is int and n > 1:
+        _check_bits(_log2_factorial(n))
+    return math.factorial(n)
+
+
+def _comb(n, k):
+    if type(n) is int and type(k) is int and 0 <= k <= n:
+        _check_bits(_log2_factorial(n) - _log2_factorial(k) - _log2_factorial(n - k))
+    return math.comb(n, k)
+
+
+def _perm(n, k=None):
+    k = n if k is None else k
+    if type(n) is int and type(k) is int and 0 <= k <= n:
+        _check_bits(_log2_factorial(n) - _log2_factorial(n - k))
+    return math.perm(n, k)
+
+
+# Functions whose result grows with their arguments run through a size check
+GUARDED_FUNCTIONS = {"factorial": _factorial, "comb": _comb, "perm": _perm}
+
+# What compiled expressions see as globals
+_NAMESPACE = {"__builtins__": {}, **ALLOWED_NAMES, **GUARDED_FUNCTIONS, "_pow": _pow}
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+
+def normalize(text):
+    """Cache key of an expression: surrounding and repeated whitespace removed"""
+    return " ".join(text.split())
+
+
+def validate(node, variables=()):
+    """
+    Check that a parsed expression only uses numbers, + - * / ** %, unary
+    signs, the allowed names and calls to allowed functions.
+
+    Raises:
+        ValueError: On anything else
+    """
+    if isinstance(node, ast.Expression):
+        validate(node.body, variables)
+    elif isinstance(node, ast.BinOp):
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise ValueError("Unsupported operator")
+        validate(node.left, variables)
+        validate(node.right, variables)
+    elif isinstance(node, ast.UnaryOp):
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ValueError("Unsupported unary operator")
+        validate(node.operand, variables)
+    elif isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float, complex)):
+            raise ValueError("Unsupported constant")
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("Unsupported call")
+        if node.func.id not in ALLOWED_NAMES or not callable(ALLOWED_NAMES[node.func.id]):
+            raise ValueError(f"Function {node.func.id} not allowed")
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                raise ValueError("Unsupported call")
+            validate(arg, variables)
+    elif isinstance(node, ast.Name):
+        if node.id not in ALLOWED_NAMES and node.id not in variables:
+            raise ValueError(f"Name {node.id} is not allowed")
+    else:
+        raise ValueError("Unsupported expression")
+
+
+class _GuardPowers(ast.NodeTransformer):
+    # Rewrite a ** b as _pow(a, b), which checks the size of the result first
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(ast.Call(func=ast.Name(id="_pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node)
+        return node
+
+
+def _checked(result):
+    if type(result) is int and result.bit_length() > MAX_INT_BITS:
+        raise LimitExceeded("Result too large")
+    return result
+
+
+class CompiledExpression:
+    """
+    A validated expression compiled to a Python function of its variables.
+
+    The function runs as CPython bytecode in a namespace that holds only the
+    allowed names and no builtins, so evaluating costs one function call
+    instead of a walk over the syntax tree.
+
+    Evaluation is bounded: the tree may have at most MAX_NODES nodes,
+    integer powers, factorial, comb and perm refuse results over
+    MAX_INT_BITS before computing them, and so does any integer result.
+    """
+
+    def __init__(self, text, variables=()):
+        self.text = text
+        self.variables = tuple(variables)
+        for name in self.variables:
+            if not name.isidentifier() or name.startswith("_"):
+                raise ValueError(f"Invalid variable name {name!r}")
+        tree = ast.parse(text, mode="eval")
+        if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+            raise LimitExceeded("Expression too long")
+        validate(tree, self.variables)
+        tree = _GuardPowers().visit(tree)
+        function = ast.Expression(ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[], args=[ast.arg(arg=name) for name in self.variables],
+                vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[],
+            ),
+            body=tree.body,
+        ))
+        code = compile(ast.fix_missing_locations(function), "<expression>", "eval")
+        self.function = eval(code, _NAMESPACE)
+
+    def __call__(self, *args, **bindings):
+        """Evaluate with variables given by position or by name"""
+        if bindings:
+            args = args + tuple(bindings[name] for name in self.variables[len(args):])
+        return _checked(self.function(*args))
+
+    def batch(self, bindings):
+        """
+        Evaluate the expression once per set of variable values.
+
+        Args:
+            bindings: Either {variable: sequence of values}, with sequences of
+                equal length, or an iterable of rows, each a mapping or a
+                tuple in the order of self.variables
+
+        Returns:
+            list: One result per row
+        """
+        function = self.function
+        if isinstance(bindings, dict):
+            columns = [bindings[name] for name in self.variables]
+            return [_checked(function(*row)) for row in zip(*columns)]
+        results = []
+        for row in bindings:
+            if isinstance(row, dict):
+                row = [row[name] for name in self.variables]
+            results.append(_checked(function(*row)))
+        return results
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile(text, variables):
+    return CompiledExpression(text, variables)
+
+
+def compile_expression(text, variables=()):
+    """
+    Compiled form of an expression, from the LRU cache when it was seen
+    before (see CACHE_SIZE, env MATH_EXPR_CACHE_SIZE)
+
+    Args:
+        text (str): Expression such as "sqrt(x) + 2 * pi"
+        variables: Names the expression takes as arguments
+
+    Raises:
+        SyntaxError: If the text is not an expression
+        ValueError: If it uses anything outside the allowed set or is
+            longer than MAX_NODES
+    """
+    return _compile(normalize(text), tuple(variables))
+
+
+def evaluate(text, **bindings):
+    """Evaluate an expression once, with variables given by keyword"""
+    return compile_expression(text, tuple(sorted(bindings)))(**bindings)
+
+
+def cache_info():
+    """Hits, misses and size of the compiled expression cache"""
+    return _compile.cache_info()
@@ -0,0 +1,198 @@
+import re
+from array import array
+
+BLOCK_SIZE = 1 << 16
+# Characters looked at to guess the number format
+SAMPLE_SIZE = 4096
+
+# Only digits, separators, signs, points and exponents: such a block can go
+# straight to float() after splitting
+_PLAIN_BLOCK = re.compile(r"[^\d\s,;|.eE+\-]")
+_SPLIT_DELIMITERS = str.maketrans({",": " ", ";": " ", "|": " "})
+
+# Commas between digits that are not thousands groups ("1,2", "12,3456")
+_LIST_COMMA = re.compile(r"\d,(?!\d{3}(?!\d))\d")
+# "1.234,56": points group thousands and a comma marks the decimals
+_DECIMAL_COMMA = re.compile(r"\d\.\d{3}(?:\.\d{3})*,\d(?!\d*[.,]\d)")
+_DECIMAL_POINT = re.compile(r"\d,\d{3}\.\d")
+# A comma-grouped number that is clearly one value: it has decimals
+# ("1,234.5"), or sits next to another number across spaces ("1,234,567 89")
+_GROUPED = r"(?<![\d,.])\d{1,3}(?:,\d{3})+"
+_GROUPED_END = r"(?![\d.]|,\d)"
+_GROUPED_DECIMALS = re.compile(rf"{_GROUPED}\.\d+{_GROUPED_END}")
+_GROUPED_IN_ROW = re.compile(
+    rf"{_GROUPED}(?:\.\d+)?{_GROUPED_END}[ \t]+[-+]?\d"
+    rf"|\d[ \t]+[-+]?{_GROUPED}(?:\.\d+)?{_GROUPED_END}"
+)
+
+
+def detect_format(sample):
+    """
+    Guess how numbers are written from a sample of the text. Commas are
+    read as list separators unless the sample shows clear thousands
+    groups, so "100,200,300" stays three values while "1,234.5" and
+    "1,234,567 2,000,000" are grouped.
+
+    Returns:
+        tuple: (thousands separator or None, decimal mark)
+    """
+    if _DECIMAL_COMMA.search(sample) and not _DECIMAL_POINT.search(sample):
+        return ".", ","
+    if not _LIST_COMMA.search(sample) and (_GROUPED_DECIMALS.search(sample) or _GROUPED_IN_ROW.search(sample)):
+        return ",", "."
+    return None, "."
+
+
+def number_pattern(thousands=None, decimal="."):
+    """
+    Regex for one signed number in the given format. A sign only counts at
+    the start of a token, so "5-3" and "2024-01-02" give no negatives.
+
+    The pattern starts with a single character class so the regex engine
+    can skip quickly over text that holds no number.
+    """
+    point = re.escape(decimal)
+    rest = r"\d*"
+    digits = r"\d+"
+    if thousands:
+        group = rf"(?:{re.escape(thousands)}\d{{3}}(?!\d))*"
+        rest, digits = rest + group, digits + group
+    return re.compile(
+        rf"[-+−{point}\d]"
+        # A sign must not follow a word, a point or a closing bracket
+        rf"(?<![\w.)][-+−])"
+        rf"(?:(?<=[-+−])(?:{digits}(?:{point}\d+)?|{point}\d+)"
+        rf"|(?<=\d){rest}(?:{point}\d+)?"
+        # ".5", but not the ".3" of "1.2.3"
+        rf"|(?<={point})(?<!\d{point})\d+)"
+        rf"(?:[eE][-+]?\d+)?"
+    )
+
+
+class NumberParser:
+    """
+    Incremental tokenizer turning text into float64 values.
+
+    Text is fed in chunks of any size; a number split between two chunks
+    is held back until the next one. Values go into compact array('d')
+    buffers (8 bytes per value) instead of lists of strings and floats.
+
+    Understands signs (including the Unicode minus), decimals, exponents
+    and thousands separators ("1,234,567.5", or "1.234.567,5" when the
+    decimal mark is a comma). thousands and decimal default to a guess made
+    from the first SAMPLE_SIZE characters (see detect_format); pass
+    thousands="," to read every "1,500" as one number.
+    """
+
+    def __init__(self, thousands="auto", decimal="auto"):
+        self.thousands = thousands
+        self.decimal = decimal
+        self._pattern = None
+        self._carry = ""
+
+    def _configure(self, sample, truncated=False):
+        if truncated:
+            # Don't let a number cut off at the end of the sample mislead the guess
+            end = max(sample.rfind(" "), sample.rfind("\n"))
+            sample = sample[:end] if end > 0 else sample
+        thousands, decimal = detect_format(sample)
+        if self.thousands == "auto":
+            self.thousands = thousands
+        if self.decimal == "auto":
+            self.decimal = decimal
+        self._pattern = number_pattern(self.thousands, self.decimal)
+        # Characters that never occur inside a number: safe places to split the text
+        self._breaks = [" ", "\n", "\t", ";", "|"] + [c for c in ",." if c not in (self.thousands, self.decimal)]
+
+    def feed(self, text):
+        """
+        Parse the next chunk of text
+
+        Returns:
+            array: Values completed by this chunk
+        """
+        text = self._carry + text
+        if self._pattern is None:
+            if len(text) < SAMPLE_SIZE:
+                self._carry = text
+                return array("d")
+            self._configure(text[:SAMPLE_SIZE], truncated=len(text) > SAMPLE_SIZE)
+        cut = max(text.rfind(c) for c in self._breaks) + 1
+        if cut == 0 and len(text) < BLOCK_SIZE:
+            # No separator yet: the whole chunk may be one number in the making
+            self._carry = text
+            return array("d")
+        if cut == 0:
+            cut = len(text)
+        self._carry = text[cut:]
+        return self._parse(text[:cut])
+
+    def close(self):
+        """Parse whatever is held back; returns the last values"""
+        text, self._carry = self._carry, ""
+        if self._pattern is None:
+            self._configure(text)
+        return self._parse(text)
+
+    def _parse(self, block):
+        if self.thousands != "," and self.decimal == "." and not _PLAIN_BLOCK.search(block):
+            # Plain data: let split() and float() do the work in C
+            try:
+                return array("d", map(float, block.translate(_SPLIT_DELIMITERS).split()))
+            except ValueError:
+                pass  # e.g. "5-3"; the regex decides what is a number
+        tokens = self._pattern.findall(block)
+        if self.thousands:
+            tokens = [token.replace(self.thousands, "") for token in tokens]
+        if self.decimal != ".":
+            tokens = [token.replace(self.decimal, ".") for token in tokens]
+        if "−" in block:
+            tokens = [token.replace("−", "-") for token in tokens]
+        return array("d", map(float, tokens))
+
+
+def iter_chunks(source, block_size=BLOCK_SIZE):
+    """Split a string, or read a text file, in chunks of about block_size characters"""
+    if isinstance(source, str):
+        for start in range(0, len(source), block_size):
+            yield source[start:start + block_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(block_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def parse_numbers(source, thousands="auto", decimal="auto", keep=True, on_values=None, block_size=BLOCK_SIZE):
+    """
+    Parse every number in a text, file or iterable of text chunks
+
+    Args:
+        source: str, text file object or iterable of str
+        thousands (str): Thousands separator, None, or "auto"
+        decimal (str): Decimal mark, or "auto"
+        keep (bool): Collect the values; False for aggregates-only runs
+            that stream through on_values in constant memory
+        on_values (function): Called with each array of new values, e.g.
+            RunningStats.update
+
+    Returns:
+        array: The values (array('d')), empty when keep is False
+    """
+    parser = NumberParser(thousands, decimal)
+    values = array("d")
+    for chunk in iter_chunks(source, block_size):
+        block = parser.feed(chunk)
+        if on_values is not None and block:
+            on_values(block)
+        if keep:
+            values.extend(block)
+    block = parser.close()
+    if on_values is not None and block:
+        on_values(block)
+    if keep:
+        values.extend(block)
+    return values
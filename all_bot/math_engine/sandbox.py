@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from math_engine.expression import LimitExceeded, compile_expression
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+# Wall-clock budget of one evaluation in a worker, in seconds
+EVAL_TIMEOUT = float(os.getenv("MATH_EVAL_TIMEOUT", "2"))
+# Worker processes; 0 evaluates in the calling thread, with only the static
+# limits of math_engine.expression and no wall-clock budget
+EVAL_WORKERS = int(os.getenv("MATH_EVAL_WORKERS", "2"))
+# Address space limit of a worker, in MB (POSIX only)
+WORKER_MEMORY_MB = int(os.getenv("MATH_WORKER_MEMORY_MB", "256"))
+
+_ALL_BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _encode(value):
+    if isinstance(value, complex):
+        return {"complex": [value.real, value.imag]}
+    return {"value": value}
+
+
+def _decode(reply):
+    if "error" in reply:
+        raise (LimitExceeded if reply.get("limit") else ValueError)(reply["error"])
+    if "complex" in reply:
+        return complex(*reply["complex"])
+    return reply["value"]
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    """
+    Worker loop: report ready, then read one JSON-encoded expression per
+    line and answer with one JSON line, {"value": ...}, {"complex": [re,
+    im]} or {"error": ...}
+    """
+    if resource is not None and WORKER_MEMORY_MB:
+        limit = WORKER_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    stdout.write(json.dumps({"ready": True}) + "\n")
+    stdout.flush()
+    for line in stdin:
+        try:
+            reply = _encode(compile_expression(json.loads(line))())
+        except Exception as e:
+            reply = {"error": str(e) or type(e).__name__, "limit": isinstance(e, LimitExceeded)}
+        stdout.write(json.dumps(reply) + "\n")
+        stdout.flush()
+
+
+class EvaluationPool:
+    """
+    A few worker processes that evaluate expressions under a wall-clock
+    budget. A worker that runs past the budget is killed and replaced, so
+    an expression that slips past the static limits in math_engine.expression
+    costs one process restart instead of a core of the bot process.
+
+    Replies are read by one thread per worker and handed over through a
+    queue, so waiting with a timeout works on pipes everywhere (select()
+    only takes sockets on Windows).
+    """
+
+    def __init__(self, workers=2, timeout=EVAL_TIMEOUT):
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self.evaluations = 0
+        self.killed = 0
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = subprocess.Popen(
+            [sys.executable, "-m", "math_engine.sandbox"],
+            cwd=_ALL_BOT_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        worker.replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(worker,), daemon=True).start()
+        # Wait for the interpreter to start so it isn't charged to the first
+        # evaluation's budget
+        if not worker.replies.get():
+            raise RuntimeError("Expression worker failed to start")
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    @staticmethod
+    def _read_replies(worker):
+        for line in worker.stdout:
+            worker.replies.put(line)
+        # End of output: the worker exited or was killed
+        worker.replies.put("")
+
+    def _replace(self, worker):
+        worker.kill()
+        worker.wait()
+        with self._lock:
+            self._workers.discard(worker)
+        self._idle.put(self._spawn())
+
+    def evaluate(self, text, timeout=None):
+        """
+        Evaluate an expression in a worker process.
+
+        Raises:
+            TimeoutError: If no worker was free, or the evaluation ran past
+                the budget (the worker is killed)
+            ValueError, SyntaxError: If the expression was rejected or failed
+        """
+        # Rejected expressions never reach a worker
+        compile_expression(text)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        try:
+            worker = self._idle.get(timeout=timeout or self.timeout)
+        except queue.Empty:
+            raise TimeoutError("No expression worker is free")
+        try:
+            worker.stdin.write(json.dumps(text) + "\n")
+            worker.stdin.flush()
+            line = worker.replies.get(timeout=max(0.0, deadline - time.monotonic()))
+        except (OSError, queue.Empty):
+            line = ""
+        if not line:
+            # Over budget, or the worker died (e.g. hit its memory limit)
+            self.killed += 1
+            self._replace(worker)
+            raise TimeoutError("Expression ran out of time or memory")
+        self._idle.put(worker)
+        self.evaluations += 1
+        return _decode(json.loads(line))
+
+    def stats(self):
+        """Evaluation and kill counts of the pool"""
+        return {"workers": len(self._workers), "evaluations": self.evaluations, "killed": self.killed}
+
+    def close(self):
+        """Stop every worker"""
+        with self._lock:
+            workers, self._workers = list(self._workers), set()
+        for worker in workers:
+            worker.kill()
+            worker.wait()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_evaluation_pool():
+    """
+    Return the process-wide EvaluationPool, started on first use, or None
+    when MATH_EVAL_WORKERS is 0 (configured from MATH_EVAL_WORKERS and
+    MATH_EVAL_TIMEOUT)
+    """
+    global _pool
+    if not EVAL_WORKERS:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = EvaluationPool(EVAL_WORKERS, EVAL_TIMEOUT)
+        return _pool
+
+
+def evaluate(text, timeout=None):
+    """
+    Evaluate an expression under the sandbox limits: in a worker process
+    under the MATH_EVAL_TIMEOUT budget, or in this thread when
+    MATH_EVAL_WORKERS is 0, where only the static limits of
+    math_engine.expression keep it short
+    """
+    pool = get_evaluation_pool()
+    if pool is None:
+        return compile_expression(text)()
+    return pool.evaluate(text, timeout)
+
+
+async def aevaluate(text, timeout=None):
+    """
+    evaluate() for coroutines: starting the pool and waiting for a worker
+    happen in a thread, so neither blocks the loop
+    """
+    if not EVAL_WORKERS:
+        return compile_expression(text)()
+    return await asyncio.to_thread(evaluate, text, timeout)
+
+
+if __name__ == "__main__":
+    serve()
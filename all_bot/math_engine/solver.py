@@ -0,0 +1,347 @@
+import math
+import re
+from fractions import Fraction
+
+from math_engine.expression import ALLOWED_NAMES, compile_expression
+
+# A number as people type it: "12", "-3.5", "1,250", "2e-3"
+NUMBER = r"[-+]?\d[\d,]*(?:\.\d+)?(?:e[-+]?\d+)?|[-+]?\.\d+"
+
+# Words and symbols that stand for Python operators
+_OPERATOR_WORDS = [
+    (r"\^", "**"),
+    (r"[×·]", "*"),
+    (r"÷", "/"),
+    (r"−", "-"),
+    (r"\bto the power of\b", "**"),
+    (r"\bsquared\b", "**2"),
+    (r"\bcubed\b", "**3"),
+    (r"\bplus\b", "+"),
+    (r"\bminus\b", "-"),
+    (r"\b(?:times|multiplied by)\b", "*"),
+    (r"\bdivided by\b", "/"),
+    (r"\bmod(?:ulo)?\b", "%"),
+]
+
+_MENTION = re.compile(r"@\w+")
+# Polite or imperative openings in front of the actual math
+_LEAD_IN = re.compile(r"^(?:please\s+)?(?:(?:how\s+(?:do\s+(?:i|you)|to|would\s+you)|can\s+you|could\s+you|help\s+me)\s+)?(?:what(?:'s|\s+is)|how\s+much\s+is|calculate|compute|evaluate|work\s+out|find|solve)\s+", re.IGNORECASE)
+_GROUPED_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+
+# Points an equation is sampled at to recover and verify its coefficients
+_SAMPLES = [Fraction(0), Fraction(1), Fraction(-1), Fraction(2), Fraction(-3), Fraction(1, 2)]
+
+# Unit alias -> (dimension, size in the dimension's base unit)
+UNITS = {}
+_UNIT_TABLE = [
+    ("length", "1", ["m", "meter", "meters", "metre", "metres"]),
+    ("length", "1000", ["km", "kilometer", "kilometers", "kilometre", "kilometres"]),
+    ("length", "1/100", ["cm", "centimeter", "centimeters", "centimetre", "centimetres"]),
+    ("length", "1/1000", ["mm", "millimeter", "millimeters", "millimetre", "millimetres"]),
+    ("length", "1609.344", ["mi", "mile", "miles"]),
+    ("length", "0.9144", ["yd", "yard", "yards"]),
+    ("length", "0.3048", ["ft", "foot", "feet"]),
+    ("length", "0.0254", ["in", "inch", "inches"]),
+    ("length", "1852", ["nmi", "nautical mile", "nautical miles"]),
+    ("mass", "1", ["kg", "kilogram", "kilograms", "kilo", "kilos"]),
+    ("mass", "1/1000", ["g", "gram", "grams"]),
+    ("mass", "1/1000000", ["mg", "milligram", "milligrams"]),
+    ("mass", "1000", ["t", "tonne", "tonnes", "metric ton", "metric tons"]),
+    ("mass", "0.45359237", ["lb", "lbs", "pound", "pounds"]),
+    ("mass", "0.028349523125", ["oz", "ounce", "ounces"]),
+    ("mass", "6.35029318", ["st", "stone", "stones"]),
+    ("volume", "1", ["l", "liter", "liters", "litre", "litres"]),
+    ("volume", "1/1000", ["ml", "milliliter", "milliliters", "millilitre", "millilitres"]),
+    ("volume", "3.785411784", ["gal", "gallon", "gallons"]),
+    ("volume", "0.946352946", ["qt", "quart", "quarts"]),
+    ("volume", "0.473176473", ["pt", "pint", "pints"]),
+    ("volume", "0.2365882365", ["cup", "cups"]),
+    ("volume", "0.0295735295625", ["fl oz", "fluid ounce", "fluid ounces"]),
+    ("time", "1", ["s", "sec", "secs", "second", "seconds"]),
+    ("time", "1/1000", ["ms", "millisecond", "milliseconds"]),
+    ("time", "60", ["min", "mins", "minute", "minutes"]),
+    ("time", "3600", ["h", "hr", "hrs", "hour", "hours"]),
+    ("time", "86400", ["day", "days"]),
+    ("time", "604800", ["week", "weeks"]),
+    ("time", "31557600", ["year", "years"]),
+    ("speed", "1", ["m/s", "meters per second", "metres per second"]),
+    ("speed", "5/18", ["km/h", "kmh", "kph", "kilometers per hour", "kilometres per hour"]),
+    ("speed", "0.44704", ["mph", "miles per hour"]),
+    ("speed", "1852/3600", ["kn", "knot", "knots"]),
+    ("speed", "0.3048", ["ft/s", "feet per second"]),
+    ("area", "1", ["m2", "m²", "sq m", "square meter", "square meters", "square metre", "square metres"]),
+    ("area", "1000000", ["km2", "km²", "sq km", "square kilometer", "square kilometers", "square kilometre", "square kilometres"]),
+    ("area", "0.09290304", ["ft2", "ft²", "sq ft", "square foot", "square feet"]),
+    ("area", "4046.8564224", ["acre", "acres"]),
+    ("area", "10000", ["ha", "hectare", "hectares"]),
+    ("data", "1", ["b", "byte", "bytes"]),
+    ("data", "1000", ["kb", "kilobyte", "kilobytes"]),
+    ("data", "1000000", ["mb", "megabyte", "megabytes"]),
+    ("data", "1000000000", ["gb", "gigabyte", "gigabytes"]),
+    ("data", "1000000000000", ["tb", "terabyte", "terabytes"]),
+    ("data", "1024", ["kib", "kibibyte", "kibibytes"]),
+    ("data", "1048576", ["mib", "mebibyte", "mebibytes"]),
+    ("data", "1073741824", ["gib", "gibibyte", "gibibytes"]),
+]
+for _dimension, _size, _aliases in _UNIT_TABLE:
+    for _alias in _aliases:
+        UNITS[_alias] = (_dimension, Fraction(_size))
+
+# Temperature scales are affine: alias -> (scale, offset), kelvin = value * scale + offset
+TEMPERATURES = {}
+for _aliases, _scale, _offset in [
+    (["c", "°c", "celsius", "degrees celsius", "degrees c"], Fraction(1), Fraction("273.15")),
+    (["f", "°f", "fahrenheit", "degrees fahrenheit", "degrees f"], Fraction(5, 9), Fraction("459.67") * Fraction(5, 9)),
+    (["k", "kelvin", "kelvins"], Fraction(1), Fraction(0)),
+]:
+    for _alias in _aliases:
+        TEMPERATURES[_alias] = (_scale, _offset)
+
+_UNIT = "|".join(re.escape(alias) for alias in sorted([*UNITS, *TEMPERATURES], key=len, reverse=True))
+_CONVERSION = re.compile(rf"^(?:convert\s+)?({NUMBER})\s*({_UNIT})\s+(?:to|in|into|as)\s+({_UNIT})$")
+_HOW_MANY = re.compile(rf"^how\s+many\s+({_UNIT})\s+(?:are\s+)?(?:there\s+)?(?:in|per)\s+({NUMBER})\s*({_UNIT})$")
+
+_PERCENT_OF = re.compile(rf"^({NUMBER})\s*(?:%|percent)\s+of\s+({NUMBER})$")
+_WHAT_PERCENT = re.compile(rf"^(?:what\s+percent(?:age)?\s+(?:of\s+({NUMBER})\s+is\s+({NUMBER})|is\s+({NUMBER})\s+of\s+({NUMBER}))|({NUMBER})\s+is\s+what\s+percent(?:age)?\s+of\s+({NUMBER}))$")
+_PERCENT_CHANGE = re.compile(rf"^(?:the\s+)?percent(?:age)?\s+(?:change|increase|decrease|difference)\s+from\s+({NUMBER})\s+to\s+({NUMBER})$")
+_ADJUST = re.compile(rf"^({NUMBER})\s*(\+|-|plus|minus|increased\s+by|decreased\s+by|reduced\s+by)\s*({NUMBER})\s*(?:%|percent)$")
+
+_EQUATION_PREFIX = re.compile(r"^(?:the\s+)?(?:roots|zeros|zeroes|solutions?)\s+(?:of\s+)?")
+_FOR_VARIABLE = re.compile(r"\s*,?\s*(?:for|solve\s+for)\s+([a-z])$")
+
+
+def _question(text):
+    # Lower-cased question without mentions, lead-in words or closing punctuation
+    text = _MENTION.sub(" ", text).lower().strip()
+    text = _LEAD_IN.sub("", text)
+    return " ".join(text.rstrip(" ?!.").split())
+
+
+def _fraction(text):
+    return Fraction(text.replace(",", ""))
+
+
+def _number(value):
+    """Display form of a result: exact where it is, at most 10 significant digits otherwise"""
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return str(value.numerator)
+        if value.denominator <= 1000:
+            return f"{value} (≈ {float(value):.10g})"
+        value = float(value)
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    if isinstance(value, complex):
+        if not value.real:
+            return f"{value.imag:.10g}i"
+        return f"{value.real:.10g} {'+' if value.imag >= 0 else '-'} {abs(value.imag):.10g}i"
+    return f"{value:.10g}" if isinstance(value, float) else str(value)
+
+
+def _rounded(value):
+    # Conversions are quoted to 6 significant digits unless they come out whole
+    if value.denominator == 1:
+        return str(value.numerator)
+    return f"{float(value):.6g}"
+
+
+def to_expression(text):
+    """
+    Rewrite a plain arithmetic question ("what is 2^10?", "3 plus 4
+    squared") as an expression math_engine.expression accepts, with ^ as
+    power
+
+    Returns:
+        str or None: The expression, or None if the text isn't one
+    """
+    text = _question(text)
+    for pattern, replacement in _OPERATOR_WORDS:
+        text = re.sub(pattern, replacement, text)
+    text = _GROUPED_THOUSANDS.sub("", text).rstrip(" =")
+    if not text or re.fullmatch(NUMBER, text):
+        return None
+    try:
+        compile_expression(text)
+    except (SyntaxError, ValueError):
+        return None
+    return text
+
+
+def convert_units(text):
+    """
+    Answer "5 km to miles", "convert 100 f to c" or "how many cm in 2 ft"
+
+    Returns:
+        list or None: Answer bullets, or None if the text isn't a conversion
+    """
+    question = _question(text)
+    match = _CONVERSION.match(question)
+    if match:
+        amount, source, target = match.groups()
+    else:
+        match = _HOW_MANY.match(question)
+        if not match:
+            return None
+        target, amount, source = match.groups()
+    value = _fraction(amount)
+    if source in TEMPERATURES and target in TEMPERATURES:
+        scale, offset = TEMPERATURES[source]
+        target_scale, target_offset = TEMPERATURES[target]
+        result = (value * scale + offset - target_offset) / target_scale
+    elif source in UNITS and target in UNITS and UNITS[source][0] == UNITS[target][0]:
+        result = value * UNITS[source][1] / UNITS[target][1]
+    else:
+        return None
+    return [f"- {amount} {source} is: {_rounded(result)} {target}"]
+
+
+def percentage(text):
+    """
+    Answer "15% of 80", "what percent of 80 is 12", "80 + 15%" or "percent
+    change from 80 to 92"
+
+    Returns:
+        list or None: Answer bullets, or None if the text isn't one of those
+    """
+    question = _question(text)
+    match = _PERCENT_OF.match(question)
+    if match:
+        rate, base = map(_fraction, match.groups())
+        return [f"- {match.group(1)}% of {match.group(2)} is: {_number(rate * base / 100)}"]
+    match = _WHAT_PERCENT.match(question)
+    if match:
+        groups = match.groups()
+        if groups[0] is not None:
+            part, whole = groups[1], groups[0]
+        elif groups[2] is not None:
+            part, whole = groups[2], groups[3]
+        else:
+            part, whole = groups[4], groups[5]
+        if not _fraction(whole):
+            return None
+        return [f"- {part} is {_number(_fraction(part) * 100 / _fraction(whole))}% of {whole}"]
+    match = _PERCENT_CHANGE.match(question)
+    if match:
+        start, end = map(_fraction, match.groups())
+        if not start:
+            return None
+        change = (end - start) * 100 / abs(start)
+        return [f"- The change from {match.group(1)} to {match.group(2)} is: {'+' if change > 0 else ''}{_number(change)}%"]
+    match = _ADJUST.match(question)
+    if match:
+        base, operation, rate = match.group(1), match.group(2), match.group(3)
+        sign = 1 if operation in ("+", "plus") or operation.startswith("increased") else -1
+        result = _fraction(base) * (1 + sign * _fraction(rate) / 100)
+        return [f"- {base} {'plus' if sign > 0 else 'minus'} {rate}% is: {_number(result)}"]
+    return None
+
+
+def _coefficients(function):
+    # Recover a, b, c of a*x**2 + b*x + c from three samples, then check the
+    # rest: anything that isn't a polynomial of degree two or less fails
+    values = [function(x) for x in _SAMPLES]
+    c = values[0]
+    b = (values[1] - values[2]) / 2
+    a = (values[1] + values[2]) / 2 - c
+    if not isinstance(a, Fraction) and abs(a) <= 1e-12 * max(1, abs(b), abs(c)):
+        a = 0  # float noise, e.g. 0.1x + 0.2 = 0.3
+    for x, value in zip(_SAMPLES[3:], values[3:]):
+        expected = a * x * x + b * x + c
+        if not isinstance(value, (int, float, Fraction)) or abs(value - expected) > 1e-9 * max(1, abs(expected)):
+            return None
+    return a, b, c
+
+
+def _roots(a, b, c):
+    # Solutions of a*x**2 + b*x + c = 0, exact when the coefficients are
+    if not a:
+        if not b:
+            return "every" if not c else "none"
+        return [-c / b]
+    exact = all(isinstance(k, (int, Fraction)) for k in (a, b, c))
+    center = Fraction(-b) / (2 * a) if exact else -b / (2 * a)
+    spread = (b * b - 4 * a * c) / (4 * a * a)
+    if not spread:
+        return [center]
+    if exact:
+        numerator, denominator = spread.numerator, spread.denominator
+        root_n, root_d = math.isqrt(abs(numerator)), math.isqrt(denominator)
+        if root_n * root_n == abs(numerator) and root_d * root_d == denominator:
+            offset = Fraction(root_n, root_d)
+            if spread > 0:
+                return [center - offset, center + offset]
+            return [complex(center, -offset), complex(center, offset)]
+    offset = math.sqrt(abs(spread))
+    if spread > 0:
+        return [float(center) - offset, float(center) + offset]
+    return [complex(center, -offset), complex(center, offset)]
+
+
+def solve_equation(text):
+    """
+    Solve a linear or quadratic equation in one variable: "solve x^2 = 4",
+    "2x + 3 = 7", "roots of x^2 - 5x + 6". Coefficients are recovered by
+    evaluating the equation at a few points with exact fractions, so the
+    answer is exact for exact input.
+
+    Returns:
+        list or None: Answer bullets, or None if the text isn't such an
+            equation
+    """
+    question = _EQUATION_PREFIX.sub("", _question(text))
+    # "solve x^2 - 4" and "roots of ..." mean "... = 0"
+    implied_zero = re.search(r"\b(?:solve|roots?|zeros|zeroes)\b", text.lower())
+    requested = _FOR_VARIABLE.search(question)
+    if requested:
+        question = question[:requested.start()]
+    shown = [side.strip() for side in question.split("=")]
+    for pattern, replacement in _OPERATOR_WORDS:
+        question = re.sub(pattern, replacement, question)
+    sides = question.split("=")
+    if len(sides) == 1 and implied_zero:
+        sides.append("0")
+        shown.append("0")
+    if len(sides) != 2 or len(shown) != 2 or not all(side.strip() for side in sides):
+        return None
+    names = set(re.findall(r"[a-z_]\w*", question)) - set(ALLOWED_NAMES)
+    if len(names) != 1 or (requested and requested.group(1) not in names):
+        return None
+    variable = names.pop()
+    if len(variable) != 1:
+        return None
+    # Implicit products: "2x", "3(x + 1)", "(x - 1)(x + 2)", "x(x + 1)"
+    implicit = re.compile(rf"(?<=[\d.)])\s*(?=(?:{variable}(?!\w)|\())|(?<=\b{variable})\s*(?=\()")
+    left, right = (implicit.sub("*", side.strip()) for side in sides)
+    try:
+        function = compile_expression(f"({left}) - ({right})", (variable,))
+        coefficients = _coefficients(function)
+    except (SyntaxError, ValueError, ArithmeticError, TypeError):
+        return None
+    if coefficients is None:
+        return None
+    roots = _roots(*coefficients)
+    bullets = [f"- The equation: `{shown[0]} = {shown[1]}`"]
+    if roots == "every":
+        bullets.append(f"- Every value of {variable} is a solution.")
+    elif roots == "none":
+        bullets.append("- The equation has no solution.")
+    elif len(roots) == 1:
+        bullets.append(f"- The solution is: {variable} = {_number(roots[0])}")
+    else:
+        bullets.append(f"- The solutions are: {variable} = {_number(roots[0])} or {variable} = {_number(roots[1])}")
+    return bullets
+
+
+def answer(text):
+    """
+    Try each exact local method on a question: equations, percentages and
+    unit conversions
+
+    Returns:
+        list or None: Answer bullets, or None when none of them applies
+    """
+    for method in (solve_equation, percentage, convert_units):
+        bullets = method(text)
+        if bullets:
+            return bullets
+    return None
@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+
+# Every aggregate describe() knows
+AGGREGATES = (
+    "count", "mean", "median", "mode", "sum", "min", "max", "product", "range", "std",
+    "variance", "percentiles", "geometric_mean", "harmonic_mean", "histogram",
+)
+
+DEFAULT_PERCENTILES = (25.0, 50.0, 75.0)
+
+# Aggregates that need the values in order
+_ORDERED = {"median", "mode", "percentiles"}
+_MOMENTS = {"mean", "std", "variance"}
+
+
+def as_array(values):
+    """
+    View values as a float64 NumPy array. Buffers such as array('d') are
+    wrapped without copying.
+    """
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    try:
+        return np.frombuffer(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter(values, dtype=np.float64)
+
+
+def describe(values, wanted=AGGREGATES, percentiles=DEFAULT_PERCENTILES, bins=None):
+    """
+    Compute the requested aggregates of a list of numbers in one sweep.
+
+    The values are sorted at most once, and only when an order statistic
+    is asked for. Median, mode, percentiles, min and max all come from that
+    one sort; sum, mean and variance share one vectorized pass.
+
+    Args:
+        values: Sequence, array('d') or NumPy array of numbers
+        wanted: Names from AGGREGATES
+        percentiles: Percentiles (0-100) for "percentiles"
+        bins (int): Histogram bin count (default: square root of the
+            value count, at most 10)
+
+    Returns:
+        dict: count plus each wanted aggregate. Values are Python floats,
+            except percentiles ({percentile: value}) and histogram
+            ([(low, high, count)]). Aggregates the data doesn't define (std
+            of one value, geometric mean of non-positive values, anything
+            of no values) are None. The mode is the most frequent value,
+            the one seen first on ties.
+    """
+    data = as_array(values)
+    wanted = set(wanted)
+    n = len(data)
+    result = {"count": n}
+    if n == 0:
+        return {name: None for name in wanted} | result
+
+    ordered = None
+    if wanted & _ORDERED:
+        if "mode" in wanted:
+            # A stable argsort keeps each value's first position, so ties
+            # resolve to the value seen first (like statistics.mode)
+            order = np.argsort(data, kind="stable")
+            ordered = data[order]
+            starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+            counts = np.diff(np.append(starts, n))
+            best = np.flatnonzero(counts == counts.max())
+            first_seen = order[starts[best]]
+            result["mode"] = float(data[first_seen.min()])
+        else:
+            ordered = np.sort(data)
+
+    if "min" in wanted or "range" in wanted:
+        result["min"] = float(ordered[0] if ordered is not None else data.min())
+    if "max" in wanted or "range" in wanted:
+        result["max"] = float(ordered[-1] if ordered is not None else data.max())
+    if "range" in wanted:
+        result["range"] = result["max"] - result["min"]
+
+    if "sum" in wanted or wanted & _MOMENTS:
+        total = float(data.sum())
+        result["sum"] = total
+        mean = total / n
+        if wanted & _MOMENTS:
+            result["mean"] = mean
+        if "std" in wanted or "variance" in wanted:
+            if n > 1:
+                deviations = data - mean
+                variance = float(np.dot(deviations, deviations)) / (n - 1)
+                result["variance"] = variance
+                result["std"] = math.sqrt(variance)
+            else:
+                result["variance"] = result["std"] = None
+
+    if "product" in wanted:
+        with np.errstate(over="ignore", under="ignore", invalid="ignore"):
+            # Overflows to inf like a float product in Python
+            result["product"] = float(np.prod(data))
+
+    if "median" in wanted or "percentiles" in wanted:
+        points = _percentiles(ordered, [50.0, *percentiles])
+        result["median"] = points[0]
+        if "percentiles" in wanted:
+            result["percentiles"] = dict(zip(percentiles, points[1:]))
+
+    if "geometric_mean" in wanted:
+        result["geometric_mean"] = float(np.exp(np.log(data).mean())) if (data > 0).all() else None
+    if "harmonic_mean" in wanted:
+        if (data < 0).any():
+            result["harmonic_mean"] = None
+        elif (data == 0).any():
+            result["harmonic_mean"] = 0.0
+        else:
+            result["harmonic_mean"] = float(n / np.reciprocal(data).sum())
+
+    if "histogram" in wanted:
+        counts, edges = np.histogram(data, bins=bins or min(10, math.ceil(math.sqrt(n))))
+        result["histogram"] = [(float(edges[i]), float(edges[i + 1]), int(counts[i])) for i in range(len(counts))]
+
+    return {name: value for name, value in result.items() if name in wanted or name == "count"}
+
+
+def _percentiles(ordered, points):
+    # Linear interpolation between the closest ranks, as numpy.percentile does;
+    # the 50th percentile equals statistics.median
+    n = len(ordered)
+    positions = (n - 1) * np.clip(np.asarray(points, dtype=np.float64), 0.0, 100.0) / 100.0
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    fraction = positions - lower
+    values = ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+    return [float(value) for value in values]
+
+
+class RunningStats:
+    """
+    Aggregates updated block by block, in constant memory: count, sum,
+    mean, min, max, range, product, variance and std. Blocks are merged
+    with Chan's parallel update, so the variance stays accurate over long
+    streams.
+    """
+
+    AGGREGATES = frozenset({"count", "sum", "mean", "min", "max", "range", "product", "variance", "std"})
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.product = 1.0
+
+    def update(self, values):
+        """Add a block of values (list, array('d') or NumPy array)"""
+        data = as_array(values)
+        n = len(data)
+        if not n:
+            return
+        block_total = float(data.sum())
+        block_mean = block_total / n
+        deviations = data - block_mean
+        block_m2 = float(np.dot(deviations, deviations))
+        delta = block_mean - self.mean
+        combined = self.count + n
+        self.m2 += block_m2 + delta * delta * self.count * n / combined
+        self.mean += delta * n / combined
+        self.count = combined
+        self.total += block_total
+        self.min = min(self.min, float(data.min()))
+        self.max = max(self.max, float(data.max()))
+        with np.errstate(over="ignore", under="ignore", invalid="ignore"):
+            self.product *= float(np.prod(data))
+
+    def result(self, wanted=AGGREGATES):
+        """The wanted aggregates, in the same form as describe()"""
+        if not self.count:
+            return {name: None for name in wanted} | {"count": 0}
+        variance = self.m2 / (self.count - 1) if self.count > 1 else None
+        values = {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "range": self.max - self.min,
+            "product": self.product,
+            "variance": variance,
+            "std": math.sqrt(variance) if variance is not None else None,
+        }
+        return {name: value for name, value in values.items() if name in wanted or name == "count"}
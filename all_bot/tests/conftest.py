@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The bots import their packages relative to all_bot (see bot_type/*.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,77 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from base_bot.admin import AdminServer
+
+
+class FakeBot:
+    def __init__(self, bot_id):
+        self.config = {"bot_id": bot_id, "bot_name": f"{bot_id} bot"}
+        self.state = {"is_connected": True, "current_channel_id": None, "channel_states": {}}
+        self.commands = []
+
+    def process_command(self, command):
+        self.commands.append(command)
+        if command.startswith("/join "):
+            self.state["current_channel_id"] = command.split(" ", 1)[1]
+
+    def channel_details(self):
+        return {"id": self.state["current_channel_id"]}
+
+
+@pytest.fixture
+def admin():
+    bots = [FakeBot("math"), FakeBot("recipe")]
+    server = AdminServer(bots, port=0, token="secret").start()
+    yield server, bots
+    server.stop()
+
+
+def request(server, method, path, body=None, token="secret"):
+    host, port = server.address
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"http://{host}:{port}{path}", data, headers, method=method)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_token_is_required(admin):
+    server, _ = admin
+    assert request(server, "GET", "/bots", token=None)[0] == 401
+    assert request(server, "GET", "/bots", token="wrong")[0] == 401
+
+
+def test_list_and_describe_bots(admin):
+    server, _ = admin
+    status, bots = request(server, "GET", "/bots")
+    assert status == 200
+    assert [bot["bot_id"] for bot in bots] == ["math", "recipe"]
+    status, bot = request(server, "GET", "/bots/math")
+    assert status == 200 and bot["name"] == "math bot" and bot["channel"] == {"id": None}
+    assert request(server, "GET", "/bots/nobody")[0] == 404
+    assert request(server, "GET", "/nowhere")[0] == 404
+
+
+def test_command_runs_on_the_listed_bots(admin):
+    server, bots = admin
+    status, result = request(server, "POST", "/command", {"command": "/join general", "bots": ["math"]})
+    assert status == 200
+    assert result["bots"]["math"]["current_channel"] == "general"
+    assert bots[0].commands == ["/join general"]
+    assert bots[1].commands == []
+    status, result = request(server, "POST", "/command", {"command": "/info"})
+    assert result["bots"] == {"math": {"id": "general"}, "recipe": {"id": None}}
+
+
+def test_bad_commands(admin):
+    server, bots = admin
+    assert request(server, "POST", "/command", {"command": "join general"})[0] == 400
+    assert request(server, "POST", "/command", {"command": "/exit"})[0] == 400
+    assert request(server, "POST", "/command", {"command": "/leave", "bots": ["nobody"]})[0] == 404
+    assert all(not bot.commands for bot in bots)
@@ -0,0 +1,55 @@
+import asyncio
+
+from base_bot.batcher import MicroBatcher
+
+
+class RecordingLLM:
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    async def abatch(self, prompts, return_exceptions=False):
+        self.batches.append(list(prompts))
+        return [ValueError(prompt) if prompt == self.fail_on else f"answer to {prompt}" for prompt in prompts]
+
+
+def submit_all(batcher, llm, prompts):
+    async def main():
+        return await asyncio.gather(*(batcher.submit(llm, prompt) for prompt in prompts), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_full_batches_go_out_at_once():
+    llm = RecordingLLM()
+    batcher = MicroBatcher(window=10, max_size=2)
+    results = submit_all(batcher, llm, ["a", "b", "c", "d"])
+    assert results == ["answer to a", "answer to b", "answer to c", "answer to d"]
+    assert llm.batches == [["a", "b"], ["c", "d"]]
+    assert batcher.stats()["full"] == 2
+
+
+def test_window_sends_a_partial_batch():
+    llm = RecordingLLM()
+    batcher = MicroBatcher(window=0.01, max_size=8)
+    assert submit_all(batcher, llm, ["a", "b", "c"]) == ["answer to a", "answer to b", "answer to c"]
+    assert llm.batches == [["a", "b", "c"]]
+    assert batcher.stats() == {"batches": 1, "items": 3, "full": 0, "timed_out": 1, "mean_size": 3.0}
+
+
+def test_errors_go_to_their_own_caller():
+    llm = RecordingLLM(fail_on="b")
+    results = submit_all(MicroBatcher(window=0.01), llm, ["a", "b"])
+    assert results[0] == "answer to a"
+    assert isinstance(results[1], ValueError)
+
+
+def test_clients_are_batched_separately():
+    first, second = RecordingLLM(), RecordingLLM()
+    batcher = MicroBatcher(window=0.01)
+
+    async def main():
+        return await asyncio.gather(batcher.submit(first, "a"), batcher.submit(second, "b"), batcher.submit(first, "c"))
+
+    asyncio.run(main())
+    assert first.batches == [["a", "c"]]
+    assert second.batches == [["b"]]
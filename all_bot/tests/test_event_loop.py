@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+
+from base_bot.event_loop import SharedEventLoop
+
+
+@pytest.fixture
+def shared_loop():
+    loop = SharedEventLoop(max_concurrency=2, name="test-loop").start()
+    yield loop
+    loop.stop()
+
+
+def test_coroutines_from_many_threads_share_one_loop(shared_loop):
+    async def loop_thread():
+        return threading.current_thread().name
+
+    names = []
+    threads = [threading.Thread(target=lambda: names.append(shared_loop.run(loop_thread(), timeout=5))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert names == ["test-loop"] * 4
+
+
+def test_concurrency_is_bounded_and_the_rest_queue(shared_loop):
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+
+    futures = [shared_loop.submit(blocked()) for _ in range(5)]
+    for _ in range(100):
+        stats = shared_loop.stats()
+        if stats["running"] == 2:
+            break
+        threading.Event().wait(0.01)
+    assert stats["running"] == 2
+    assert stats["queued"] == 3
+    assert stats["max_queued"] >= 3
+
+    shared_loop.call_soon(release.set)
+    for future in futures:
+        future.result(5)
+    stats = shared_loop.stats()
+    assert (stats["submitted"], stats["completed"], stats["running"], stats["queued"]) == (5, 5, 0, 0)
+
+
+def test_failures_are_counted_and_raised(shared_loop):
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        shared_loop.run(fail(), timeout=5)
+    assert shared_loop.stats()["failed"] == 1
+
+
+def test_run_from_the_loop_thread_is_refused(shared_loop):
+    async def nested():
+        coro = asyncio.sleep(0)
+        try:
+            shared_loop.run(coro)
+        finally:
+            coro.close()
+
+    with pytest.raises(RuntimeError):
+        shared_loop.run(nested(), timeout=5)
+
+
+def test_stop_and_restart():
+    shared_loop = SharedEventLoop(max_concurrency=1).start()
+    shared_loop.stop()
+    assert not shared_loop.stats()["alive"]
+    assert shared_loop.run(asyncio.sleep(0, result="again"), timeout=5) == "again"
+    shared_loop.stop()
@@ -0,0 +1,46 @@
+import io
+import json
+
+from base_bot.json_log import JsonLogger, parse_sample
+
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_lines():
+    stream = io.StringIO()
+    logger = JsonLogger(stream, flush_interval=10)
+    logger.log("info", "reply", "sent", bot="math", chars=12)
+    logger.log("debug", "reply", "below the level")
+    logger.close()
+    [record] = records(stream)
+    assert record["event"] == "reply" and record["msg"] == "sent"
+    assert record["bot"] == "math" and record["chars"] == 12
+    assert record["ts"].endswith("+00:00")
+
+
+def test_sampling_spares_warnings():
+    stream = io.StringIO()
+    logger = JsonLogger(stream, sample={"message_seen": 0.25}, flush_interval=10)
+    for _ in range(8):
+        logger.log("info", "message_seen")
+    logger.log("warning", "message_seen", "kept")
+    logger.close()
+    assert len(records(stream)) == 3
+    assert logger.stats()["sampled_out"] == 6
+
+
+def test_full_buffer_drops_the_oldest_records():
+    stream = io.StringIO()
+    logger = JsonLogger(stream, max_buffer=3, batch_size=100, flush_interval=10)
+    for i in range(5):
+        logger.log("info", "tick", str(i))
+    logger.close()
+    assert [record["msg"] for record in records(stream)] == ["2", "3", "4"]
+    assert logger.stats()["dropped"] == 2
+
+
+def test_parse_sample():
+    assert parse_sample("message_seen=0.01, reply=0.5,bad") == {"message_seen": 0.01, "reply": 0.5}
+    assert parse_sample(None) == {}
@@ -0,0 +1,52 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    from bot_type.math_calcy import MathCalcyBot
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = MathCalcyBot()
+    prompts = []
+
+    async def ask_llm(prompt, query=None):
+        prompts.append(prompt)
+        return "**MathCalcyBot Answer:**\n- from the LLM"
+
+    bot.ask_llm = ask_llm
+    bot.prompts = prompts
+    return bot
+
+
+def answer(bot, content):
+    return asyncio.run(bot.generate_response({"content": content}))
+
+
+@pytest.mark.parametrize("content", ["@math solve x^3 = 8", "@math x^3 + 2x = 5", "@math find the roots of x^4 - 16"])
+def test_unsolved_equation_goes_to_llm(bot, content):
+    response = answer(bot, content)
+    assert "sum of these numbers" not in response
+    assert "from the LLM" in response
+    assert len(bot.prompts) == 1
+
+
+def test_local_engine_answers_without_llm(bot):
+    assert "x = -2 or x = 2" in answer(bot, "@math solve x^2 = 4")
+    assert "is: 12" in answer(bot, "@math what is 15% of 80?")
+    assert bot.prompts == []
+
+
+def test_plain_numbers_default_to_sum(bot):
+    assert "The sum of these numbers is: 10.0" in answer(bot, "@math 1 2 3 4")
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("@math average 100,200,300", "The average is: 200"),
+    ("@math mean 250,300,450,600", "400"),
+])
+def test_comma_lists_are_separate_values(bot, content, expected):
+    assert expected in answer(bot, content)
@@ -0,0 +1,55 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from base_bot.metrics import BotMetrics, Histogram, MetricsServer, render_prometheus
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["cumulative"] == [2, 3, 4]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(3.65)
+
+
+def test_bot_metrics_snapshot():
+    metrics = BotMetrics("math", "Math Bot")
+    metrics.count("replies_sent")
+    metrics.count("replies_sent", 2)
+    with metrics.span("llm"):
+        pass
+    metrics.gauge("queue_depth", lambda: 3)
+    metrics.gauge("broken", lambda: 1 / 0)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["replies_sent"] == 3
+    assert snapshot["histograms"]["llm"]["count"] == 1
+    # A gauge that fails to read is left out rather than failing the scrape
+    assert snapshot["gauges"] == {"queue_depth": 3.0}
+
+
+def test_prometheus_text():
+    metrics = BotMetrics("math", 'Math "calc" Bot')
+    metrics.count("llm_requests")
+    metrics.observe("llm", 0.2)
+    text = render_prometheus([metrics.snapshot()])
+    assert "# TYPE smarthub_bot_llm_requests_total counter" in text
+    assert 'smarthub_bot_llm_requests_total{bot_id="math",bot="Math \\"calc\\" Bot"} 1' in text
+    assert 'smarthub_bot_stage_seconds_bucket{bot_id="math",bot="Math \\"calc\\" Bot",stage="llm",le="0.25"} 1' in text
+    assert 'le="+Inf"} 1' in text
+    assert text.count("# TYPE smarthub_bot_stage_seconds histogram") == 1
+
+
+def test_metrics_endpoint():
+    server = MetricsServer(lambda: "smarthub_bot_up 1\n", port=0).start()
+    host, port = server.address
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert response.read() == b"smarthub_bot_up 1\n"
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://{host}:{port}/other")
+    finally:
+        server.stop()
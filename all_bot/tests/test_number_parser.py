@@ -0,0 +1,37 @@
+import pytest
+
+from math_engine.number_parser import NumberParser, parse_numbers
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Commas between 3-digit values are a pasted list unless grouping is clear
+    ("@math average 100,200,300", [100.0, 200.0, 300.0]),
+    ("@math mean 250,300,450,600", [250.0, 300.0, 450.0, 600.0]),
+    ("@math sum 1,500", [1.0, 500.0]),
+    ("@math what is 1,234,567.5", [1234567.5]),
+    ("1,234,567 2,000,000 15", [1234567.0, 2000000.0, 15.0]),
+    ("100,200.5,300", [100.0, 200.5, 300.0]),
+    ("1.234,5", [1234.5]),
+    ("1, 2, 3", [1.0, 2.0, 3.0]),
+    ("-5, 3, 1e2", [-5.0, 3.0, 100.0]),
+])
+def test_short_text(text, expected):
+    assert list(parse_numbers(text)) == expected
+
+
+def test_thousands_opt_in():
+    assert list(parse_numbers("@math sum 1,500 and 2,000", thousands=",")) == [1500.0, 2000.0]
+
+
+def test_number_split_between_chunks():
+    parser = NumberParser()
+    values = list(parser.feed("1,234.5 " * 1000 + "98"))
+    values += list(parser.feed("7,654.25"))
+    values += list(parser.close())
+    assert values == [1234.5] * 1000 + [987654.25]
+
+
+def test_sample_cut_inside_a_number():
+    # The format sample ends in "1,23", which alone looks like a list
+    text = "    " + "1,234.5 " * 600
+    assert list(parse_numbers(text, block_size=1000)) == [1234.5] * 600
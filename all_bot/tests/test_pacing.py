@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+import pytest
+
+from base_bot.pacing import HumanlikePacing, NoPacing, make_pacing
+
+
+def waited(pacing, work=0.0):
+    async def reply():
+        pace = pacing.begin({"message": "hi"})
+        await asyncio.sleep(work)
+        started = time.monotonic()
+        await pace.wait()
+        return time.monotonic() - started
+
+    return asyncio.run(reply())
+
+
+def test_humanlike_delay_is_drawn_from_the_range():
+    assert 0.05 <= waited(HumanlikePacing(0.08, 0.1)) <= 0.2
+
+
+def test_generation_time_counts_towards_the_delay():
+    assert waited(HumanlikePacing(0.1, 0.1), work=0.15) < 0.02
+
+
+def test_make_pacing():
+    assert isinstance(make_pacing("none"), NoPacing)
+    assert isinstance(make_pacing(""), NoPacing)
+    pacing = make_pacing("humanlike", 2, 1)
+    assert (pacing.min_delay, pacing.max_delay) == (2, 2)
+    with pytest.raises(ValueError):
+        make_pacing("slow")
@@ -0,0 +1,34 @@
+import pytest
+
+from base_bot import rate_limiter
+from base_bot.rate_limiter import get_rate_limiter, process_share
+
+
+@pytest.mark.parametrize("limit, processes, share", [
+    (500, 1, 500),
+    (500, 4, 125),
+    (30000, 3, 10000),
+    (2, 5, 1),   # never rounds down to 0, which would mean unlimited
+    (0, 4, 0),   # unlimited stays unlimited
+])
+def test_process_share(limit, processes, share):
+    assert process_share(limit, processes) == share
+
+
+def test_limits_are_split_between_processes(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setenv("LLM_RPM", "600")
+    monkeypatch.setenv("LLM_TPM", "40000")
+    monkeypatch.setenv("LLM_LIMIT_PROCESSES", "4")
+    limiter = get_rate_limiter("key", "model")
+    assert limiter.requests.capacity == 150
+    assert limiter.tokens.capacity == 10000
+
+
+def test_unlimited_unless_configured(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    for name in ("LLM_RPM", "LLM_TPM", "LLM_LIMIT_PROCESSES"):
+        monkeypatch.delenv(name, raising=False)
+    limiter = get_rate_limiter("key", "model")
+    assert limiter.requests is None
+    assert limiter.tokens is None
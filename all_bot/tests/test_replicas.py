@@ -0,0 +1,91 @@
+import asyncio
+from collections import Counter
+
+from base_bot.replicas import (
+    HashAssignment, LocalCoordinator, ServerCoordinator, SQLiteCoordinator, message_key, rendezvous_owner,
+)
+
+KEYS = [f"message-{i}" for i in range(3000)]
+
+
+def test_message_key():
+    assert message_key({"id": 42, "content": "hi"}) == "42"
+    message = {"channelId": "general", "senderId": "u1", "timestamp": 1, "content": "hi"}
+    assert message_key(message) == message_key(dict(message))
+    assert message_key(message) != message_key({**message, "content": "hello"})
+
+
+def test_rendezvous_spreads_claims_evenly():
+    owners = Counter(rendezvous_owner(key, 3) for key in KEYS)
+    assert set(owners) == {0, 1, 2}
+    assert all(800 < count < 1200 for count in owners.values())
+
+
+def test_adding_a_replica_only_moves_its_own_keys():
+    moved = [key for key in KEYS if rendezvous_owner(key, 3) != rendezvous_owner(key, 4)]
+    assert all(rendezvous_owner(key, 4) == 3 for key in moved)
+    assert 500 < len(moved) < 1000
+
+
+def test_hash_assignment_gives_each_key_one_owner():
+    replicas = [HashAssignment(i, 3) for i in range(3)]
+    assert all(sum(replica.owns(key) for replica in replicas) == 1 for key in KEYS[:300])
+
+
+def claims(coordinator, key, replicas):
+    async def main():
+        return [await coordinator.claim("math", key, replica) for replica in replicas]
+    return asyncio.run(main())
+
+
+def test_local_coordinator_grants_a_message_once():
+    coordinator = LocalCoordinator()
+    assert claims(coordinator, "m1", ["r1", "r2", "r1"]) == [True, False, True]
+    assert claims(coordinator, "m2", ["r2", "r1"]) == [True, False]
+
+
+def test_expired_claims_can_be_taken_over():
+    coordinator = LocalCoordinator(ttl=-1)
+    assert claims(coordinator, "m1", ["r1", "r2"]) == [True, True]
+
+
+def test_sqlite_coordinator_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "claims.db")
+    first, second = SQLiteCoordinator(path), SQLiteCoordinator(path)
+    assert claims(first, "m1", ["r1"]) == [True]
+    assert claims(second, "m1", ["r2"]) == [False]
+    assert claims(second, "m2", ["r2"]) == [True]
+
+
+class SilentServerBot:
+    """A bot whose server never acknowledges claim_message"""
+
+    def __init__(self, replica_index, replica_count):
+        self.replica_assignment = HashAssignment(replica_index, replica_count)
+        self.emitted = []
+
+    async def socket_emit_async(self, event, data, callback=None):
+        self.emitted.append((event, data))
+
+
+class AnsweringServerBot(SilentServerBot):
+    async def socket_emit_async(self, event, data, callback=None):
+        await super().socket_emit_async(event, data, callback)
+        callback({"granted": data["replicaId"] == "r1"})
+
+
+def test_server_coordinator_uses_the_servers_answer():
+    bot = AnsweringServerBot(0, 2)
+    coordinator = ServerCoordinator(bot)
+    assert claims(coordinator, "m1", ["r1", "r2"]) == [True, False]
+    assert bot.emitted[0] == ("claim_message", {"botId": "math", "messageId": "m1", "replicaId": "r1"})
+
+
+def test_server_coordinator_falls_back_to_the_hash_split():
+    key = KEYS[0]
+    owner = rendezvous_owner(key, 2)
+    results = [
+        claims(ServerCoordinator(SilentServerBot(index, 2), timeout=0.01), key, [f"r{index}"])[0]
+        for index in range(2)
+    ]
+    assert results == [index == owner for index in range(2)]
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from base_bot.response_cache import ResponseCache
+
+
+def test_prompts_are_normalized_and_kept_per_bot():
+    cache = ResponseCache()
+    cache.set("recipe", "Butter  Chicken ", "answer", ttl=60)
+    assert cache.get("recipe", "butter chicken") == "answer"
+    assert cache.get("health", "butter chicken") is None
+    assert cache.stats("recipe")["hits"] == 1
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache()
+    cache.set("recipe", "soup", "answer", ttl=0)
+    cache.set("recipe", "stew", "answer", ttl=0.05)
+    assert cache.get("recipe", "soup") is None
+    assert cache.get("recipe", "stew") == "answer"
+    time.sleep(0.06)
+    assert cache.get("recipe", "stew") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("recipe", "a", "1", ttl=60)
+    cache.set("recipe", "b", "2", ttl=60)
+    cache.get("recipe", "a")
+    cache.set("recipe", "c", "3", ttl=60)
+    assert cache.get("recipe", "b") is None
+    assert cache.get("recipe", "a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(db_path=path)
+    cache.set("recipe", "soup", "answer", ttl=60)
+    cache.set("recipe", "old", "answer", ttl=0.05)
+    cache.flush()
+    time.sleep(0.06)
+
+    restarted = ResponseCache(db_path=path)
+    assert asyncio.run(restarted.aget("recipe", "soup")) == "answer"
+    assert restarted.stats()["entries"] == 1  # promoted to memory
+    assert asyncio.run(restarted.aget("recipe", "old")) is None
+
+
+def test_clear_reaches_the_sqlite_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(db_path=path)
+    cache.set("recipe", "soup", "answer", ttl=60)
+    cache.set("health", "walking", "answer", ttl=60)
+    cache.clear("recipe")
+    cache.flush()
+    assert cache.stats()["db_entries"] == 1
+    assert ResponseCache(db_path=path).get("health", "walking") == "answer"
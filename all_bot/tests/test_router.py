@@ -0,0 +1,108 @@
+import threading
+
+from base_bot.router import MentionIndex, MessageRouter
+
+
+class FakeMetrics:
+    def count(self, name):
+        pass
+
+
+class FakeBot:
+    """The parts of BaseBot the router uses"""
+
+    def __init__(self, bot_id, mentions=(), accepts=True):
+        self.config = {"bot_id": bot_id, "bot_name": bot_id, "mentions": list(mentions)}
+        self.state = {"is_connected": True, "channel_states": {}}
+        self.metrics = FakeMetrics()
+        self.router = None
+        self.accepts = accepts
+        self.delivered = []
+        self.listening = []
+        self._exit_flag = threading.Event()
+
+    def should_respond_to(self, message):
+        return self.accepts
+
+    def extract_json_block(self, text):
+        return None
+
+    def deliver(self, message):
+        self.delivered.append(message["content"])
+
+    def listen_to_channel(self, channel_id):
+        self.listening.append(channel_id)
+
+
+def test_mention_index():
+    math, mathbot, recipe = FakeBot("math"), FakeBot("mathbot"), FakeBot("recipe")
+    index = MentionIndex()
+    index.add("@math", math)
+    index.add("@MathBot", mathbot)
+    index.add("@recipe", recipe)
+    assert index.match("hey @RECIPE") == {recipe}
+    # The longest mention wins the scan, but "@mathbot" also mentions "@math"
+    assert index.match("@mathbot 2+2") == {math, mathbot}
+    assert index.match("@math and @recipe") == {math, recipe}
+    assert index.match("no mention") == set()
+    index.remove_bot(math)
+    assert index.match("@math 2+2") == set()
+
+
+def router_with(*bots):
+    router = MessageRouter()
+    for bot in bots:
+        router.attach(bot)
+    return router
+
+
+def test_messages_go_to_mentioned_bots_only():
+    math, recipe, logger = FakeBot("math", ["@math"]), FakeBot("recipe", ["@recipe"]), FakeBot("logger")
+    router = router_with(math, recipe, logger)
+    router.ingest({"id": 1, "content": "@math 2+2", "senderId": "user"})
+    assert math.delivered == ["@math 2+2"]
+    assert recipe.delivered == []
+    # Bots without mentions see every message
+    assert logger.delivered == ["@math 2+2"]
+
+
+def test_duplicates_and_own_messages_are_skipped():
+    math, picky = FakeBot("math", ["@math"]), FakeBot("picky", ["@math"], accepts=False)
+    router = router_with(math, picky)
+    message = {"id": 1, "content": "@math 2+2", "senderId": "user"}
+    assert router.ingest(message) == [math]
+    assert router.ingest(dict(message)) == []
+    assert router.ingest({"id": 2, "content": "@math: 4", "senderId": "math"}) == []
+    assert math.delivered == ["@math 2+2"]
+    assert router.stats["duplicates"] == 1
+
+
+def test_muted_bots_still_receive_their_messages():
+    math, recipe = FakeBot("math", ["@math"]), FakeBot("recipe", ["@recipe"])
+    router = router_with(math, recipe)
+    assert router.should_listen(math, "general") is True
+    assert router.should_listen(recipe, "general") is False  # joins muted
+    # The channel's messages arrive on the listener's socket only
+    router.ingest({"id": 1, "content": "@recipe pancakes", "senderId": "user", "channelId": "general"})
+    assert recipe.delivered == ["@recipe pancakes"]
+    assert router.listeners() == {"general": "math"}
+
+
+def test_listening_passes_to_another_member():
+    math, recipe = FakeBot("math", ["@math"]), FakeBot("recipe", ["@recipe"])
+    router = router_with(math, recipe)
+    router.should_listen(math, "general")
+    router.should_listen(recipe, "general")
+    router.leave(math, "general")
+    assert recipe.listening == ["general"]
+    assert router.listeners() == {"general": "recipe"}
+    # A disconnected listener is replaced by the next bot that joins
+    recipe.state["is_connected"] = False
+    assert router.should_listen(math, "general") is True
+
+
+def test_channel_state_reaches_muted_bots():
+    math, recipe = FakeBot("math", ["@math"]), FakeBot("recipe", ["@recipe"])
+    router = router_with(math, recipe)
+    router.set_channel_state("general", False)
+    assert recipe.state["channel_states"] == {"general": False}
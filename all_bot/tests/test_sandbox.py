@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+
+from math_engine import sandbox
+from math_engine.sandbox import EvaluationPool
+
+
+def test_default_pool_has_workers():
+    assert sandbox.EVAL_WORKERS > 0
+    assert sandbox.get_evaluation_pool() is not None
+    assert sandbox.evaluate("2 ** 10 + sqrt(16)") == 1028.0
+
+
+def test_runaway_evaluation_is_killed(monkeypatch):
+    # Without the static size limit only the wall-clock budget stops 9**9**9
+    monkeypatch.setenv("MATH_MAX_INT_BITS", str(10 ** 12))
+    pool = EvaluationPool(workers=1, timeout=0.3)
+    try:
+        with pytest.raises(TimeoutError):
+            pool.evaluate("9 ** 9 ** 9")
+        assert pool.stats()["killed"] == 1
+        assert pool.evaluate("1 + 1") == 2
+    finally:
+        pool.close()
+
+
+def test_aevaluate_starts_the_pool_off_the_loop(monkeypatch):
+    monkeypatch.setattr(sandbox, "_pool", None)
+    callers = []
+    get_pool = sandbox.get_evaluation_pool
+
+    def recording_get_pool():
+        callers.append(threading.current_thread())
+        return get_pool()
+
+    monkeypatch.setattr(sandbox, "get_evaluation_pool", recording_get_pool)
+
+    async def run():
+        return await sandbox.aevaluate("6 * 7"), threading.current_thread()
+
+    try:
+        result, loop_thread = asyncio.run(run())
+    finally:
+        if sandbox._pool is not None:
+            sandbox._pool.close()
+    assert result == 42
+    assert callers and loop_thread not in callers
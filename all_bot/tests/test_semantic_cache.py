@@ -0,0 +1,49 @@
+import pytest
+
+from base_bot.semantic_cache import SemanticCache, content_terms
+
+DISHES = ["spicy tofu", "greek lentil", "lemon cod", "honey duck", "miso noodle", "garlic shrimp", "herb quiche", "thai beef"]
+TEMPLATES = ["how do I make {}", "{} recipe", "easy {} recipe", "how to cook {}", "homemade {}"]
+
+
+@pytest.fixture
+def cache():
+    # Common request words ("make", "recipe") need many cached questions to
+    # weigh less than the words naming a dish
+    cache = SemanticCache(capacity=100)
+    for dish in DISHES:
+        for template in TEMPLATES:
+            cache.set("recipe", template.format(dish), template.format(dish), ttl=60)
+    cache.set("recipe", "butter chicken recipe please", "butter chicken", ttl=60)
+    cache.set("recipe", "how to make chicken soup", "chicken soup", ttl=60)
+    return cache
+
+
+def test_content_terms():
+    assert content_terms("@recipe How do I make the Pancakes?") == {"make", "pancake"}
+
+
+def test_paraphrase_hits(cache):
+    assert cache.get("recipe", "how do I make butter chicken", 0.2) == "butter chicken"
+
+
+@pytest.mark.parametrize("query", ["how to make chicken curry", "butter paneer recipe please", "spicy lentil recipe"])
+def test_different_question_misses(cache, query):
+    assert cache.get("recipe", query, 0.2) is None
+
+
+def test_other_bot_and_expired_entries_miss(cache):
+    assert cache.get("math", "butter chicken recipe please", 0.2) is None
+    cache.set("recipe", "banana bread recipe", "banana bread", ttl=-1)
+    assert cache.get("recipe", "banana bread recipe", 0.2) is None
+
+
+def test_full_cache_evicts_least_recently_used():
+    cache = SemanticCache(capacity=2, term_overlap=0)
+    cache.set("recipe", "pancake recipe", "pancakes", ttl=60)
+    cache.set("recipe", "waffle recipe", "waffles", ttl=60)
+    assert cache.get("recipe", "pancake recipe", 0.9) == "pancakes"
+    cache.set("recipe", "crepe recipe", "crepes", ttl=60)
+    assert cache.get("recipe", "waffle recipe", 0.9) is None
+    assert cache.get("recipe", "pancake recipe", 0.9) == "pancakes"
+    assert cache.stats()["evictions"] == 1
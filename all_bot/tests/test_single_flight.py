@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from base_bot.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_request():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("prompt", call) for _ in range(5)), flight.do("other", call))
+
+    assert asyncio.run(main()) == ["answer"] * 6
+    assert len(calls) == 2
+    assert flight.stats() == {"upstream": 2, "saved": 4, "in_flight": 0}
+
+
+def test_later_calls_send_a_new_request():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return await flight.do("prompt", call), await flight.do("prompt", call)
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(flight.do("prompt", call), flight.do("prompt", call), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("prompt", call))
+        second = asyncio.ensure_future(flight.do("prompt", call))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "answer"
+
+
+def test_late_stream_follower_gets_every_chunk():
+    flight = SingleFlight()
+
+    async def chunks():
+        for chunk in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in flight.stream("prompt", chunks)]
+
+    async def main():
+        return await asyncio.gather(collect(0), collect(0.015))
+
+    assert asyncio.run(main()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert flight.stats()["upstream"] == 1
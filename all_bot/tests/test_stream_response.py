@@ -0,0 +1,76 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    from base_bot.base_bot import BaseBot
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = BaseBot({"bot_id": "test", "stream_update_interval": 60, "stream_update_chars": 10})
+    bot.emitted = []
+    bot.message_id = "m1"
+
+    async def socket_emit_async(event, data=None, callback=None):
+        bot.emitted.append((event, dict(data)))
+        if callback is not None:
+            callback({"id": bot.message_id})
+
+    bot.socket_emit_async = socket_emit_async
+    return bot
+
+
+async def chunks(*pieces, error=None):
+    for piece in pieces:
+        await asyncio.sleep(0)
+        yield piece
+    if error is not None:
+        raise error
+
+
+def stream(bot, pieces, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(bot.stream_response({"channelId": "general"}, pieces, **kwargs))
+
+
+def test_first_text_is_sent_then_updated(bot):
+    reply = stream(bot, chunks("", "Hello", " there,", " this is a longer", " reply"))
+    assert reply == "Hello there, this is a longer reply"
+    assert bot.emitted[0] == ("message", {"channelId": "general", "content": "Hello"})
+    # Updates wait for stream_update_chars of new text
+    assert [data["content"] for event, data in bot.emitted[1:-1]] == ["Hello there, this is a longer"]
+    assert bot.emitted[-1] == ("update_message", {"channelId": "general", "messageId": "m1", "content": reply, "done": True})
+
+
+def test_without_a_message_id_the_full_reply_is_sent_again(bot):
+    bot.message_id = None
+    reply = stream(bot, chunks("Hello", " there, this is a longer reply"))
+    assert [event for event, _ in bot.emitted] == ["message", "message"]
+    assert bot.emitted[-1][1]["content"] == reply
+
+
+def test_interrupted_stream_reports_the_error(bot):
+    reply = stream(bot, chunks("Partial answer", error=RuntimeError("connection lost")))
+    assert reply.startswith("Partial answer")
+    assert "Response interrupted: connection lost" in reply
+    assert bot.emitted[-1][1]["done"] is True
+
+
+def test_first_message_waits_for_pacing(bot):
+    order = []
+
+    class Pace:
+        async def wait(self):
+            order.append("pace")
+
+    async def recorded(*pieces):
+        async for piece in chunks(*pieces):
+            order.append("chunk")
+            yield piece
+
+    stream(bot, recorded("Hi"), pace=Pace())
+    assert order == ["chunk", "pace"]
+    assert bot.emitted[0][0] == "message"
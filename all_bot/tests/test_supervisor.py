@@ -0,0 +1,95 @@
+import threading
+import time
+
+from agent_manager import BotSupervisor
+
+
+class FakeSocket:
+    connected = False
+
+
+class FakeBot:
+    def __init__(self, bot_id, failures=0):
+        self.config = {"bot_id": bot_id, "bot_name": bot_id}
+        self.socket = FakeSocket()
+        self.failures = failures
+        self.handlers = {}
+        self.starts = 0
+        self.stopped = False
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def start(self):
+        self.starts += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("server down")
+        self.socket.connected = True
+
+    def disconnect_socket(self):
+        self.socket.connected = False
+
+    def shutdown(self):
+        self.stopped = True
+
+
+def test_failed_start_is_retried_with_backoff():
+    bot = FakeBot("math", failures=2)
+    supervisor = BotSupervisor([bot], base_backoff=10, max_backoff=60)
+    record = supervisor.records[0]
+    supervisor._start(record)
+    assert record.status == "backoff"
+    assert 5 <= record.retry_at - time.time() <= 10
+    supervisor._run_due_timers()
+    assert bot.starts == 1  # not due yet
+
+    record.retry_at = time.time()
+    supervisor._run_due_timers()
+    # The second failure doubles the delay
+    assert record.failures == 2
+    assert 10 <= record.retry_at - time.time() <= 20
+
+    record.retry_at = time.time()
+    supervisor._run_due_timers()
+    assert record.status == "running"
+    assert record.failures == 0
+
+
+def test_lost_connection_is_restarted_after_the_grace_period():
+    bot = FakeBot("math")
+    supervisor = BotSupervisor([bot], reconnect_grace=30)
+    record = supervisor.records[0]
+    supervisor._start(record)
+    supervisor._handle_event("disconnected", record)
+    assert record.status == "reconnecting"
+    supervisor._run_due_timers()
+    assert record.restarts == 0
+
+    record.down_since -= 31
+    supervisor._run_due_timers()
+    assert record.restarts == 1
+    assert bot.starts == 2
+    assert record.status == "running"
+
+
+def test_reconnecting_on_its_own_avoids_a_restart():
+    bot = FakeBot("math")
+    supervisor = BotSupervisor([bot], reconnect_grace=30)
+    record = supervisor.records[0]
+    supervisor._start(record)
+    bot.handlers["disconnected"]()
+    bot.handlers["connected"]()
+    for _ in range(2):
+        supervisor._handle_event(*supervisor._events.get_nowait())
+    assert record.status == "running"
+    assert record.down_since is None
+
+
+def test_run_until_stopped():
+    bots = [FakeBot("math"), FakeBot("recipe")]
+    supervisor = BotSupervisor(bots)
+    threading.Timer(0.05, supervisor.request_stop).start()
+    supervisor.run()
+    assert all(bot.starts == 1 and bot.stopped for bot in bots)
+    assert [entry["status"] for entry in supervisor.status()] == ["stopped", "stopped"]
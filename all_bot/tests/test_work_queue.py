@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from base_bot.work_queue import WorkQueue
+
+
+def run_queue(policy, messages, max_size=2, workers=1):
+    """Hold the first message in the handler, queue the rest, then let everything drain"""
+    handled = []
+    rejected = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def handler(message):
+            handled.append(message["id"])
+            await release.wait()
+
+        queue = WorkQueue(handler, max_size=max_size, workers=workers, policy=policy, on_reject=lambda m: rejected.append(m["id"]))
+        accepted = [queue.put(messages[0])]
+        await asyncio.sleep(0)  # the worker takes the first message
+        accepted += [queue.put(message) for message in messages[1:]]
+        stats = queue.stats()
+        release.set()
+        while queue.stats()["depth"] or queue.stats()["active"]:
+            await asyncio.sleep(0)
+        queue.cancel()
+        return accepted, stats
+
+    accepted, stats = asyncio.run(main())
+    return handled, rejected, accepted, stats
+
+
+def message(i, sender="a", channel="general"):
+    return {"id": i, "senderId": sender, "channelId": channel}
+
+
+def test_queue_is_bounded_and_drops_oldest():
+    handled, _, accepted, stats = run_queue("drop_oldest", [message(i, sender=str(i)) for i in range(5)])
+    assert all(accepted)
+    assert handled == [0, 3, 4]
+    assert stats["depth"] == 2
+    assert stats["dropped_oldest"] == 2
+
+
+def test_reject_turns_new_messages_away():
+    handled, rejected, accepted, stats = run_queue("reject", [message(i, sender=str(i)) for i in range(5)])
+    assert accepted == [True, True, True, False, False]
+    assert handled == [0, 1, 2]
+    assert rejected == [3, 4]
+    assert stats["rejected"] == 2
+
+
+def test_coalesce_keeps_a_senders_latest_message():
+    messages = [message(0), message(1, sender="b"), message(2, sender="c"), message(3, sender="b"), message(4, sender="c", channel="other")]
+    handled, _, _, stats = run_queue("coalesce", messages, max_size=3)
+    # b's second message takes the place of its first; c in another channel is a new entry
+    assert handled == [0, 3, 2, 4]
+    assert stats["coalesced"] == 1
+
+
+def test_workers_handle_messages_concurrently():
+    handled, _, _, stats = run_queue("drop_oldest", [message(i) for i in range(3)], max_size=10, workers=3)
+    assert sorted(handled) == [0, 1, 2]
+    assert stats["enqueued"] == 3
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        WorkQueue(lambda message: None, policy="lifo")
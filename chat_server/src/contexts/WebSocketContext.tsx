@@ -105,6 +105,11 @@ export function WebSocketProvider({ children }: { children: React.ReactNode }) {
       setMessages(prev => [...prev, message]);
     });
 
+    // Handle partial updates of streamed bot replies
+    newSocket.on('message_updated', (update: Partial<Message> & { id: string }) => {
+      setMessages(prev => prev.map(m => (m.id === update.id ? { ...m, ...update } : m)));
+    });
+
     // Handle channel status updates
     newSocket.on('channel_status', (status: ChannelStatus) => {
       setChannelStatus(status);
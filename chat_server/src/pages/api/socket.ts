@@ -5,7 +5,7 @@ import type { Socket } from 'socket.io';
 import fs from 'fs';
 import path from 'path';
 import { promises as fsPromises } from 'fs';
-import { createChatMessage, processMessage } from '../../utils/messageProcessor';
+import { createChatMessage, processMessage, updateMessage } from '../../utils/messageProcessor';
 import { SharedDataRepository } from '../../data/models/SharedData';
 import { SharedData, SharedDataMetadata } from '../../types/shared-data';
 // The MessageRepository is now imported and used within messageProcessor.ts
@@ -89,6 +89,10 @@ const clients = new Map<string, {
 // Make clients available globally
 (global as any).clients = clients;
 
+// Message claims of replicated bots: the first replica to claim a message handles it
+const CLAIM_TTL_MS = 10 * 60 * 1000;
+const messageClaims = new Map<string, { replicaId: string; expiresAt: number }>();
+
 // Create a global map to store shared data (for backward compatibility)
 const sharedDataStore = new Map<string, SharedData>();
 // Make data store available globally
@@ -238,9 +242,15 @@ export default function handler(req: NextApiRequest, res: SocketIONextApiRespons
       });
 
       // Join channel
-      socket.on('join_channel', (channelId: string) => {
+      // options.listen = false joins as a participant without receiving the channel's
+      // broadcasts (bots in one process that share a listening connection)
+      socket.on('join_channel', (channelId: string, options?: { listen?: boolean }) => {
         console.log(`${socket.data.name || socket.id} joining channel: ${channelId}`);
-        socket.join(`channel:${channelId}`);
+        if (options?.listen === false) {
+          socket.leave(`channel:${channelId}`);
+        } else {
+          socket.join(`channel:${channelId}`);
+        }
         
         // Get channel or create if doesn't exist
         if (!channels.has(channelId)) {
@@ -349,7 +359,7 @@ export default function handler(req: NextApiRequest, res: SocketIONextApiRespons
       });
 
       // Chat message
-      socket.on('message', async (message: { channelId: string; content: string, senderName: string, senderId: string }) => {
+      socket.on('message', async (message: { channelId: string; content: string, senderName: string, senderId: string }, callback?: (data: { id: string }) => void) => {
         console.log(`Message from ${socket.data.name || socket.id}:`, message.content);
         
         const channelId = message.channelId;
@@ -401,6 +411,65 @@ export default function handler(req: NextApiRequest, res: SocketIONextApiRespons
         
         // Broadcast to all in the channel
         io.to(`channel:${channelId}`).emit('new_message', enrichedMessage);
+        
+        // Let the sender know the message id (used by bots that stream their replies)
+        if (typeof callback === 'function') {
+          callback({ id: enrichedMessage.id });
+        }
+      });
+
+      // Replicated bots: grant a message to exactly one replica of a bot
+      socket.on('claim_message', (data: { botId: string; messageId: string; replicaId: string }, callback?: (data: { granted: boolean }) => void) => {
+        const now = Date.now();
+        const key = `${data.botId}:${data.messageId}`;
+        const existing = messageClaims.get(key);
+        const granted = !existing || existing.expiresAt < now || existing.replicaId === data.replicaId;
+        
+        if (granted) {
+          messageClaims.set(key, { replicaId: data.replicaId, expiresAt: now + CLAIM_TTL_MS });
+        }
+        
+        // Drop expired claims once the map grows
+        if (messageClaims.size > 10000) {
+          messageClaims.forEach((claim, claimKey) => {
+            if (claim.expiresAt < now) {
+              messageClaims.delete(claimKey);
+            }
+          });
+        }
+        
+        if (typeof callback === 'function') {
+          callback({ granted });
+        }
+      });
+
+      // Streamed reply: replace the content of a message this participant sent earlier
+      socket.on('update_message', async (data: { channelId: string; messageId: string; content: string; done?: boolean }) => {
+        const channel = channels.get(data.channelId);
+        if (!channel) {
+          return;
+        }
+        
+        const message = await updateMessage(
+          channel,
+          data.messageId,
+          socket.data.botId || socket.id,
+          data.content,
+          !!data.done
+        );
+        if (!message) {
+          return;
+        }
+        
+        io.to(`channel:${data.channelId}`).emit('message_updated', {
+          id: message.id,
+          channelId: data.channelId,
+          content: message.content,
+          displayContent: message.displayContent,
+          jsonData: message.jsonData,
+          tags: message.tags,
+          done: !!data.done
+        });
       });
 
       // Data sharing event
@@ -299,4 +299,60 @@ export async function processMessage(
   }
   
   return message;
-} 
\ No newline at end of file
+}
+
+/**
+ * Replace the content of a message already in the channel history
+ * Used by bots that stream their replies as a series of partial updates
+ * 
+ * @param channel Channel object holding the message
+ * @param messageId ID of the message to update
+ * @param senderId Sender ID; only the original sender may update a message
+ * @param content New (complete) message content
+ * @param done Whether this is the final update of the stream
+ * @returns The updated message object, or null if no matching message was found
+ */
+export async function updateMessage(
+  channel: any,
+  messageId: string,
+  senderId: string,
+  content: string,
+  done: boolean = false
+): Promise<any | null> {
+  const message = channel?.messages?.find((m: any) => m.id === messageId);
+  if (!message || message.senderId !== senderId) {
+    return null;
+  }
+  
+  const { 
+    tags, 
+    dataId, 
+    requestId, 
+    parentRequestId, 
+    status, 
+    jsonData, 
+    displayContent 
+  } = processMessageContent(content);
+  
+  Object.assign(message, {
+    content,
+    displayContent,
+    jsonData,
+    tags,
+    dataId,
+    requestId,
+    parentRequestId,
+    status
+  });
+  
+  // Only the final content of logged messages is written to the database
+  if (done && (message.requestId || message.parentRequestId)) {
+    try {
+      await messageRepository.saveMessage(message);
+    } catch (error) {
+      console.error(`Error logging message to database:`, error);
+    }
+  }
+  
+  return message;
+}